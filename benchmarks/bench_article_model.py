@@ -0,0 +1,127 @@
+"""
+記事の読み取り経路 (一覧表示) の転送量とメモリ量の計測
+
+同じ記事を次の3通りで読み込み、1件あたりの転送量の見積もりとメモリ量を表示する
+  before:     全フィールドを読み、従来の dataclass の Article を生成
+  after-full: 全フィールドを読み、__slots__ の Article を生成
+  after-list: ARTICLE_LIST_FIELDS のみ射影して読み、__slots__ の Article を生成 (本文は遅延読み込み)
+
+転送量は Firestore のドキュメントサイズの計算方法 (文字列はUTF-8のバイト数+1 など) による見積もり
+
+    python benchmarks/bench_article_model.py --articles 100000 --content-chars 2000
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+import argparse
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_access.models import ARTICLE_LIST_FIELDS, Article  # noqa: E402
+
+@dataclass
+class LegacyArticle:
+    """変更前の Article (dataclass)"""
+    id: str
+    company_id: str
+    title: str
+    url: str
+    published_at: datetime
+    content: Optional[str]
+    image_url: Optional[str]
+    source: str
+    created_at: datetime
+    updated_at: datetime
+
+class Snapshot:
+    """DocumentSnapshot の代わり"""
+    __slots__ = ('id', '_data', 'reference')
+
+    def __init__(self, doc_id: str, data: Dict[str, Any]):
+        self.id = doc_id
+        self._data = data
+        self.reference = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._data)
+
+def field_size(value: Any) -> int:
+    if value is None:
+        return 1
+    if isinstance(value, str):
+        return len(value.encode('utf-8')) + 1
+    if isinstance(value, datetime):
+        return 8
+    return 8
+
+def document_size(doc_id: str, data: Dict[str, Any]) -> int:
+    # ドキュメント名 (コレクション名 + ID) + フィールド名 + 値 + 32バイト
+    name = len('articles'.encode()) + 1 + len(doc_id.encode()) + 1 + 16
+    return name + sum(len(k.encode()) + 1 + field_size(v) for k, v in data.items()) + 32
+
+def make_documents(count: int, content_chars: int):
+    now = datetime(2024, 12, 1)
+    body = 'プレスリリース本文' * (content_chars // 9 + 1)
+    for n in range(count):
+        yield f"{n:064x}", {
+            'company_id': f"B{n % 300:08d}",
+            'title': f"新サービス「サンプル{n}」の提供を開始",
+            'url': f"https://prtimes.jp/main/html/rd/p/{n:09d}.{n % 5000:09d}.html",
+            'published_at': now - timedelta(minutes=n),
+            'content': body[:content_chars],
+            'image_url': f"https://prtimes.jp/i/{n % 5000}/{n}/thumb/118x78/{n}.jpg",
+            'source': 'prtimes',
+            'status': 'active',
+            'created_at': now,
+            'updated_at': now
+        }
+
+def build(snapshots, factory):
+    tracemalloc.start()
+    start = time.perf_counter()
+    objects = [factory(snapshot) for snapshot in snapshots]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objects, current, elapsed
+
+def legacy_from_snapshot(snapshot: Snapshot) -> LegacyArticle:
+    data = snapshot.to_dict()
+    return LegacyArticle(
+        id=snapshot.id, company_id=data['company_id'], title=data['title'], url=data['url'],
+        published_at=data['published_at'], content=data.get('content'), image_url=data.get('image_url'),
+        source=data['source'], created_at=data.get('created_at'), updated_at=data.get('updated_at')
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100_000)
+    parser.add_argument('--content-chars', type=int, default=2000, help='本文の文字数')
+    args = parser.parse_args()
+
+    documents = list(make_documents(args.articles, args.content_chars))
+    full = [Snapshot(doc_id, data) for doc_id, data in documents]
+    projected = [Snapshot(doc_id, {k: data[k] for k in ARTICLE_LIST_FIELDS}) for doc_id, data in documents]
+    full_bytes = sum(document_size(doc_id, data) for doc_id, data in documents)
+    list_bytes = sum(document_size(doc_id, snapshot.to_dict()) for (doc_id, _), snapshot in zip(documents, projected))
+
+    # スナップショット自体 (本文の文字列を含む) は計測に含めない
+    rows = [
+        ('before', full, legacy_from_snapshot, full_bytes),
+        ('after-full', full, Article.from_snapshot, full_bytes),
+        ('after-list', projected, Article.from_snapshot, list_bytes),
+    ]
+    print(f"articles={args.articles} content_chars={args.content_chars}")
+    print(f"{'variant':<12} {'bytes/doc':>10} {'object bytes/article':>21} {'build':>10}")
+    for name, snapshots, factory, transferred in rows:
+        objects, memory, elapsed = build(snapshots, factory)
+        print(f"{name:<12} {transferred / args.articles:>10,.0f} {memory / args.articles:>21,.0f} "
+              f"{args.articles / elapsed:>8,.0f}/s")
+        del objects
+
+if __name__ == '__main__':
+    main()
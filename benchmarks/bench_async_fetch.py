@@ -0,0 +1,137 @@
+"""
+非同期取得エンジンのスループット計測
+
+ローカルのスタブHTTPサーバー (応答遅延あり) に対して
+従来の ThreadPoolExecutor(max_workers=4) + 同期 get_news と
+AsyncFetcher + get_news_async のページ/秒を比較する
+
+    python benchmarks/bench_async_fetch.py --pages 200 --latency 0.05
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.scrapers.async_fetcher import AsyncFetcher  # noqa: E402
+from src.scrapers.session_pool import configure_session_pool, get_connection_stats  # noqa: E402
+from src.scrapers.http_cache import ValidatorStore  # noqa: E402
+from src.scrapers.prtimes_scraper import PRTimesScraper  # noqa: E402
+from src.scrapers.rate_limiter import HostRateLimiter  # noqa: E402
+
+# 取得エンジン自体の計測なのでレート制限は実質無効にする
+UNLIMITED = HostRateLimiter(rate=1e9, burst=10 ** 9)
+
+ARTICLE_HTML = """
+<article class="list-article">
+  <h2 class="list-article_title"><a href="/main/html/rd/p/{n}.html">記事タイトル {n}</a></h2>
+  <time>2024年12月01日 12:34</time>
+  <p class="list-article__summary">サマリー {n}</p>
+</article>
+"""
+
+def build_listing(articles: int = 40) -> str:
+    body = "".join(ARTICLE_HTML.format(n=n) for n in range(articles))
+    return f"<html><body>{body}</body></html>"
+
+class StubServer:
+    """
+    固定の一覧ページを遅延付きで返すスタブサーバー (別スレッドで動作)
+    """
+
+    def __init__(self, latency: float, port: int = 0):
+        self.latency = latency
+        self.port = port
+        self.page = build_listing()
+        self._loop = asyncio.new_event_loop()
+        self._runner = None
+        self._ready = threading.Event()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+        return web.Response(text=self.page, content_type='text/html')
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', self.port, backlog=1024)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._start())
+        self._ready.set()
+        self._loop.run_forever()
+
+    def __enter__(self) -> 'StubServer':
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def urls(self, pages: int):
+        return [f"http://127.0.0.1:{self.port}/company/{n}" for n in range(pages)]
+
+def cold_store() -> ValidatorStore:
+    """
+    条件付きGETが効かないよう計測毎に空の検証子ストアを使う
+    """
+    return ValidatorStore(tempfile.mktemp(suffix='.json'))
+
+def bench_sync(urls, workers: int) -> float:
+    store = cold_store()
+    configure_session_pool(workers)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda u: PRTimesScraper(validator_store=store, rate_limiter=UNLIMITED).get_news(u), urls))
+    elapsed = time.perf_counter() - start
+    assert all(len(r) > 0 for r in results)
+    return elapsed
+
+async def _bench_async(urls, max_concurrency: int, per_host: int) -> float:
+    start = time.perf_counter()
+    scraper = PRTimesScraper(validator_store=cold_store(), rate_limiter=UNLIMITED)
+    async with AsyncFetcher(max_concurrency=max_concurrency, per_host_limit=per_host) as fetcher:
+        results = await asyncio.gather(*(scraper.get_news_async(u, fetcher) for u in urls))
+    elapsed = time.perf_counter() - start
+    assert all(len(r) > 0 for r in results)
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='スタブサーバーの応答遅延(秒)')
+    parser.add_argument('--sync-workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--per-host', type=int, default=32,
+                        help='スタブは単一ホストなので本番設定より大きめにする')
+    args = parser.parse_args()
+
+    with StubServer(args.latency) as server:
+        urls = server.urls(args.pages)
+        sync_elapsed = bench_sync(urls, args.sync_workers)
+        async_elapsed = asyncio.run(_bench_async(urls, args.concurrency, args.per_host))
+
+    print(f"pages={args.pages} latency={args.latency * 1000:.0f}ms")
+    print(f"sync  (threads={args.sync_workers}):  {sync_elapsed:.2f}s  {args.pages / sync_elapsed:.1f} pages/s")
+    print(f"async (global={args.concurrency}, per_host={args.per_host}): "
+          f"{async_elapsed:.2f}s  {args.pages / async_elapsed:.1f} pages/s")
+    stats = get_connection_stats()
+    print(f"sync connections: requests={stats.requests} handshakes={stats.new_connections} "
+          f"reuse={stats.reuse_ratio:.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Firestoreの遅延ごとの収集パイプライン (NewsCollector) の処理時間と読み書き数の計測
+
+FakeFirestore (メモリ上のFirestore) に操作ごとの遅延を入れ、FirestoreClient と NewsCollector の
+最高水位の読み取り → 重複除外 → 保存 (BulkWriter・カウンタ・フィード) → 最高水位の更新 を実行する
+取得段はネットワークに出ず、企業ごとに合成した記事を返す (一部は保存済みの記事と重複させる)
+
+遅延 (中央値ミリ秒) ごとに、処理時間・記事/秒・読み書き数・操作数を表示する
+保存段のワーカー数を変えて、遅延に対して必要なワーカー数を見積もる
+
+    python benchmarks/bench_firestore_latency.py --companies 200 --articles 20 --latency 5 200 --persist-workers 2 8
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# run_script は src を基準に import する
+sys.path.insert(0, str(ROOT / 'src'))
+
+from data_access.fake_firestore import FakeFirestore, Latency  # noqa: E402
+from data_access.firestore_client import FirestoreClient, clear_stats_cache  # noqa: E402
+from run_script import CompanyCrawl, NewsCollector  # noqa: E402
+
+class NullNotifier:
+    """Slackに送らない通知"""
+
+    def notify_new_articles_digest(self, groups):
+        pass
+
+    def notify_scraping_result(self, results, stage_stats=None):
+        pass
+
+def synthetic_articles(company_id: str, count: int, newest: datetime) -> List[Dict[str, Any]]:
+    return [{
+        'title': f"{company_id} のお知らせ {n}",
+        'url': f"https://prtimes.jp/main/html/rd/p/{company_id}-{n}.html",
+        'published_at': newest - timedelta(minutes=n),
+        'content': 'サマリー ' * 20,
+        'source': 'prtimes'
+    } for n in range(count)]
+
+class SyntheticCollector(NewsCollector):
+    """
+    取得段だけを合成記事に差し替えた NewsCollector (最高水位の読み取りはFirestoreに対して行う)
+    """
+
+    def __init__(self, db: FirestoreClient, articles_per_company: int, newest: datetime):
+        super().__init__(db=db, notifier=NullNotifier())
+        self.articles_per_company = articles_per_company
+        self.newest = newest
+
+    async def _crawl_stage(self, batch, fetcher, parse_pool) -> List[CompanyCrawl]:
+        crawls = []
+        for company in batch:
+            crawl = CompanyCrawl(company=company, scraper=self._create_scraper())
+            await asyncio.to_thread(self.db.get_watermark, company['id'], 'prtimes')
+            crawl.articles = synthetic_articles(company['id'], self.articles_per_company, self.newest)
+            crawls.append(crawl)
+        return crawls
+
+def build_client(args, latency_ms: float) -> FakeFirestore:
+    db = FakeFirestore(seed=args.seed)
+    client = FirestoreClient(db=db)
+    client.config['url_filter'] = {'enabled': False}
+    clear_stats_cache()
+
+    # 遅延を入れる前に、一部の記事を保存済みにしてフィードを作っておく
+    newest = datetime.now()
+    existing = int(args.articles * args.existing)
+    for n in range(args.companies):
+        articles = synthetic_articles(f"company{n}", args.articles, newest)[args.articles - existing:]
+        client.insert_articles([{**article, 'company_id': f"company{n}"} for article in articles])
+    client.rebuild_latest_feeds()
+
+    db.latency = {op: Latency(latency_ms, latency_ms * args.tail) for op in ('get', 'query', 'aggregate', 'write', 'commit')}
+    db.errors = {'commit': args.error_rate} if args.error_rate else {}
+    db.reset_stats()
+    return client, newest
+
+def run(args, latency_ms: float, persist_workers: int) -> Dict[str, Any]:
+    client, newest = build_client(args, latency_ms)
+    collector = SyntheticCollector(client, args.articles, newest)
+    scraping = collector.config.setdefault('scraping', {})
+    scraping['parse'] = {'workers': 0}
+    scraping['pipeline'] = {**scraping.get('pipeline', {}), 'persist': {'workers': persist_workers}}
+    collector.config['companies'] = [
+        {'id': f"company{n}", 'name': f"Company {n}", 'prtimes': {'url': f"https://prtimes.jp/company/{n}"}}
+        for n in range(args.companies)
+    ]
+
+    start = time.perf_counter()
+    results = asyncio.run(collector._collect_all())
+    elapsed = time.perf_counter() - start
+    return {
+        'elapsed': elapsed,
+        'failed': sum(1 for result in results if not result.success),
+        'stats': client.db.stats.to_dict()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--companies', type=int, default=100)
+    parser.add_argument('--articles', type=int, default=20, help='企業ごとの取得記事数')
+    parser.add_argument('--existing', type=float, default=0.5, help='保存済みの記事の割合')
+    parser.add_argument('--latency', type=float, nargs='+', default=[5, 200], help='操作ごとの遅延の中央値 (ミリ秒)')
+    parser.add_argument('--tail', type=float, default=3.0, help='99パーセンタイル / 中央値')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='送信 (commit) の失敗率')
+    parser.add_argument('--persist-workers', type=int, nargs='+', default=[2])
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    total = args.companies * args.articles
+    print(f"companies={args.companies} articles={total} existing={args.existing:.0%} tail={args.tail}x")
+    for latency_ms in args.latency:
+        for workers in args.persist_workers:
+            result = run(args, latency_ms, workers)
+            stats = result['stats']
+            print(f"latency={latency_ms:g}ms persist_workers={workers}: {result['elapsed']:.2f}s "
+                  f"{total / result['elapsed']:.0f} articles/s  reads={stats['reads']} writes={stats['writes']} "
+                  f"errors={stats['errors']} failed_companies={result['failed']}")
+            print(f"  ops={stats['ops']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+パース用プロセスプールのワーカー数毎のスループット計測
+
+tests/fixtures/ の一覧ページを指定件数分パースし、ワーカー数毎の pages/s を表示する
+workers=0 はプロセスを使わずスレッドでパースする (従来相当)
+
+    python benchmarks/bench_parse_pool.py --pages 400 --parser html.parser
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.scrapers.parse_pool import ParsePool  # noqa: E402
+from src.scrapers.prtimes_scraper import PRTimesScraper  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / 'tests' / 'fixtures'
+
+async def _bench(scraper: PRTimesScraper, pages, workers: int, queue_depth: int) -> float:
+    async with ParsePool(workers=workers, queue_depth=queue_depth) as pool:
+        # プロセス起動とワーカー側の初期化を計測から除く
+        await asyncio.gather(*(scraper._extract_articles_async(pages[0], pool) for _ in range(max(workers, 1))))
+        start = time.perf_counter()
+        results = await asyncio.gather(*(scraper._extract_articles_async(page, pool) for page in pages))
+        elapsed = time.perf_counter() - start
+    assert all(len(r) > 0 for r in results)
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=400)
+    parser.add_argument('--parser', default='html.parser', help='パーサーバックエンド')
+    parser.add_argument('--queue-depth', type=int, default=64)
+    args = parser.parse_args()
+
+    fixtures = [p.read_text(encoding='utf-8') for p in sorted(FIXTURES_DIR.glob('prtimes_listing.html'))]
+    pages = (fixtures * args.pages)[:args.pages]
+    scraper = PRTimesScraper(parser_backend=args.parser)
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({0, 1, 2, 4, cpus})
+
+    print(f"pages={args.pages} parser={scraper.parser.name} cpus={cpus}")
+    for workers in worker_counts:
+        elapsed = asyncio.run(_bench(scraper, pages, workers, args.queue_depth))
+        print(f"workers={workers:<3} {elapsed:.2f}s  {args.pages / elapsed:.1f} pages/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+一覧ページのパーサーバックエンド毎の速度・メモリ計測
+
+tests/fixtures/ の一覧ページを各バックエンド (および埋め込みJSON抽出) でパースし、
+1ページあたりのパース時間(ms)とピークメモリを表示する
+メモリは tracemalloc (Pythonヒープ) と ru_maxrss の増分 (libxml2等のCヒープ込み) の両方を出す
+各バックエンドは別プロセスで計測する
+
+    python benchmarks/bench_parsers.py --iterations 200
+"""
+from pathlib import Path
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.scrapers.embedded_json import extract_listing_records  # noqa: E402
+from src.scrapers.parsers import PARSER_BACKENDS, get_parser  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / 'tests' / 'fixtures'
+
+def load_fixtures():
+    return [p.read_text(encoding='utf-8') for p in sorted(FIXTURES_DIR.glob('prtimes_listing*.html'))]
+
+def _full_tree(text: str):
+    """従来の実装 (全体をhtml.parserで木構造化してから記事要素を探す)"""
+    return BeautifulSoup(text, 'html.parser').find_all('article', class_='list-article')
+
+def _measure(backend: str, iterations: int, queue):
+    pages = load_fixtures()
+    if backend == 'baseline':
+        parse = _full_tree
+    elif backend == 'embedded-json':
+        # 埋め込みJSONを持つページのみ対象
+        pages = [p for p in pages if extract_listing_records(p) is not None]
+        parse = extract_listing_records
+    else:
+        parse = get_parser(backend).parse
+    parse(pages[0])  # ウォームアップ
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for page in pages:
+            parse(page)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    queue.put({
+        'backend': backend,
+        'ms_per_page': elapsed * 1000 / (iterations * len(pages)),
+        'py_peak_kb': peak / 1024,
+        'rss_growth_kb': rss_after - rss_before
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    # 未インストールでフォールバックしたバックエンドは除外
+    backends = ['baseline'] + [name for name in PARSER_BACKENDS if get_parser(name).name == name] + ['embedded-json']
+    ctx = multiprocessing.get_context('spawn')
+    print(f"fixtures={len(load_fixtures())} iterations={args.iterations}")
+    print(f"{'backend':<14} {'ms/page':>9} {'py peak KB':>11} {'rss +KB':>9}")
+    for backend in backends:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_measure, args=(backend, args.iterations, queue))
+        proc.start()
+        result = queue.get()
+        proc.join()
+        print(f"{result['backend']:<14} {result['ms_per_page']:>9.3f} "
+              f"{result['py_peak_kb']:>11.1f} {result['rss_growth_kb']:>9}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+保存済み記事URLフィルタ (mmap Bloomフィルタ) の計測
+
+指定件数のURLでフィルタを構築し、構築時間・検索速度・実測の偽陽性率・ファイルサイズを表示する
+比較として同じURLをPythonのsetで保持した場合のメモリ量も表示する
+
+    python benchmarks/bench_url_filter.py --urls 1000000 --fp 0.001
+"""
+from pathlib import Path
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_access.url_filter import SeenUrlFilter  # noqa: E402
+
+def article_urls(start: int, count: int):
+    return (f"https://prtimes.jp/main/html/rd/p/{n:09d}.{n % 5000:09d}.html" for n in range(start, start + count))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=1_000_000)
+    parser.add_argument('--fp', type=float, default=0.001, help='設定する偽陽性率')
+    parser.add_argument('--probes', type=int, default=100_000, help='検索する件数 (保存済み/未保存それぞれ)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seen = SeenUrlFilter(str(Path(tmp) / 'seen.bloom'), capacity=args.urls, false_positive_rate=args.fp)
+        start = time.perf_counter()
+        seen.open(populate=lambda: article_urls(0, args.urls))
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        hits = sum(seen.might_contain(url) for url in article_urls(0, args.probes))
+        seen_lookup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        false_positives = sum(seen.might_contain(url) for url in article_urls(args.urls, args.probes))
+        unseen_lookup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        seen.add_many(article_urls(args.urls, 10_000))
+        add = time.perf_counter() - start
+        seen.close()
+
+    tracemalloc.start()
+    url_set = set(article_urls(0, args.urls))
+    set_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del url_set
+
+    print(f"urls={args.urls} target_fp={args.fp} bits={seen.bits} hashes={seen.hashes}")
+    print(f"file size:        {seen.size_bytes / 1024 / 1024:.2f} MB (python set: {set_bytes / 1024 / 1024:.1f} MB)")
+    print(f"build:            {build:.2f}s ({args.urls / build:,.0f} urls/s)")
+    print(f"lookup (seen):    {args.probes / seen_lookup:,.0f} urls/s  hits={hits}/{args.probes}")
+    print(f"lookup (unseen):  {args.probes / unseen_lookup:,.0f} urls/s  "
+          f"false positive rate={false_positives / args.probes:.5f}")
+    print(f"add_many:         {10_000 / add:,.0f} urls/s")
+
+if __name__ == '__main__':
+    main()
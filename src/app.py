@@ -9,6 +9,7 @@ from datetime import datetime
 
 from slack_bot.handlers import SlackEventHandler
 from data_access.firestore_client import FirestoreClient
+from data_access.models import ARTICLE_LIST_FIELDS
 from run_script import NewsCollector
 
 app = Flask(__name__)
@@ -88,10 +89,13 @@ def run_scraping():
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({
+    health = {
         'status': 'healthy',
         'timestamp': datetime.now().isoformat()
-    })
+    }
+    if event_handler.mirror is not None:
+        health['hot_cache'] = event_handler.mirror.stats()
+    return jsonify(health)
 
 @app.route('/stats', methods=['GET'])
 def get_stats():
@@ -101,7 +105,7 @@ def get_stats():
             'total_articles': db.get_total_articles_count(),
             'articles_by_company': db.get_articles_count_by_company(),
             'articles_by_source': db.get_articles_count_by_source(),
-            'latest_articles': db.get_latest_articles(limit=5)
+            'latest_articles': db.get_latest_articles(limit=5, fields=ARTICLE_LIST_FIELDS)
         }
         return jsonify(stats)
     except Exception as e:
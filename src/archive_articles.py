@@ -0,0 +1,40 @@
+"""
+公開から一定期間を過ぎた記事を Firestore からコールドアーカイブ (公開月ごとの Parquet ファイル) に移す
+Firestore には重複判定・カウンタ用の墓標 (status=archived) が残る
+途中で止まっても、再実行すれば残りの記事から続けられる
+
+    python archive_articles.py --dry-run                       # 対象の記事数を数えるだけ
+    python archive_articles.py --older-than-days 365
+    python archive_articles.py --path gs://bucket/articles     # 保存先を指定 (省略時は ARCHIVE_PATH / 設定ファイル)
+"""
+import argparse
+import logging
+
+from data_access.firestore_client import FirestoreClient
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--older-than-days', type=int, default=None, help='移す記事の経過日数 (省略時は設定ファイル)')
+    parser.add_argument('--path', default=None, help='保存先のディレクトリまたはURI')
+    parser.add_argument('--dry-run', action='store_true', help='対象の記事数を数えるだけで書き込まない')
+    args = parser.parse_args()
+
+    client = FirestoreClient()
+    archive = None if args.dry_run else client.cold_archive(args.path)
+    if archive is None and not args.dry_run:
+        parser.error("archive path is not configured (use --path, ARCHIVE_PATH or archive.path)")
+
+    result = client.archive_articles(args.older_than_days, archive=archive, dry_run=args.dry_run)
+    if args.dry_run:
+        logger.info(f"{result['archived']} articles would be archived (dry run, nothing written)")
+    else:
+        logger.info(f"Archived {result['archived']} articles into {result['files']} files ({result['failed']} failed)")
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,4 @@
-    """
-    Data Access Package
-    Firebase Firestoreのデータ管理をするパッケージ
-    """
-    
\ No newline at end of file
+"""
+Data Access Package
+Firebase Firestoreのデータ管理をするパッケージ
+"""
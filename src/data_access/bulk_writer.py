@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Set
+import logging
+import threading
+from google.cloud.firestore_v1.bulk_writer import BulkRetry, BulkWriterOptions, SendMode
+
+logger = logging.getLogger(__name__)
+
+# 再試行するgRPCステータス (ABORTED, UNAVAILABLE, RESOURCE_EXHAUSTED, DEADLINE_EXCEEDED, INTERNAL)
+RETRYABLE_CODES = {10, 14, 8, 4, 13}
+ALREADY_EXISTS = 6
+
+@dataclass
+class BulkWriteError:
+    """再試行しても成功しなかった書き込み"""
+    path: str
+    code: int
+    message: str
+    attempts: int
+
+@dataclass
+class BulkWriteStats:
+    """書き込み結果の集計"""
+    succeeded: int = 0
+    failed: int = 0
+    retried: int = 0
+    already_exists: int = 0
+    succeeded_paths: Set[str] = field(default_factory=set)
+    errors: Dict[str, BulkWriteError] = field(default_factory=dict)
+
+class BulkPersistence:
+    """
+    Firestore の BulkWriter による大量書き込み
+
+    20件単位のバッチ分割・並列送信・500/50/5 ルールでの段階的なスロットリングは BulkWriter が行う
+    書き込み毎に再試行の可否を判断し、最終的に失敗したものは on_failure に通知する
+    バッチ書き込みは原子的ではないため、create は1件ずつ「存在しない場合のみ作成」になる
+
+        with BulkPersistence(db) as writer:
+            writer.create(ref, data)
+        writer.stats.succeeded_paths
+    """
+
+    def __init__(
+        self,
+        db: Any,
+        initial_ops_per_second: int = 500,
+        max_ops_per_second: int = 5000,
+        max_attempts: int = 5,
+        on_failure: Optional[Callable[[BulkWriteError], None]] = None
+    ):
+        self.db = db
+        self.initial_ops_per_second = initial_ops_per_second
+        self.max_ops_per_second = max_ops_per_second
+        self.max_attempts = max_attempts
+        self.on_failure = on_failure
+        self.stats = BulkWriteStats()
+        self._lock = threading.Lock()
+        self._writer = None
+
+    def __enter__(self) -> 'BulkPersistence':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        if self._writer is not None:
+            return
+        self._writer = self.db.bulk_writer(options=BulkWriterOptions(
+            initial_ops_per_second=self.initial_ops_per_second,
+            max_ops_per_second=self.max_ops_per_second,
+            mode=SendMode.parallel,
+            retry=BulkRetry.exponential
+        ))
+        self._writer.on_write_result(self._on_result)
+        self._writer.on_write_error(self._on_error)
+
+    def close(self):
+        """
+        未送信の書き込みを全て送信し終えてから閉じる
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def flush(self):
+        """
+        ここまでの書き込みが完了するまで待つ (後続の書き込みより先に反映させたい場合に使う)
+        """
+        if self._writer is not None:
+            self._writer.flush()
+
+    def create(self, reference: Any, data: Dict[str, Any]):
+        self.open()
+        self._writer.create(reference, data)
+
+    def set(self, reference: Any, data: Dict[str, Any], merge: bool = False):
+        self.open()
+        self._writer.set(reference, data, merge=merge)
+
+    def update(self, reference: Any, data: Dict[str, Any]):
+        self.open()
+        self._writer.update(reference, data)
+
+    def delete(self, reference: Any):
+        self.open()
+        self._writer.delete(reference)
+
+    def _on_result(self, reference: Any, result: Any, writer: Any):
+        with self._lock:
+            self.stats.succeeded += 1
+            self.stats.succeeded_paths.add(reference.path)
+
+    def _on_error(self, failure: Any, writer: Any) -> bool:
+        """
+        Trueを返すと BulkWriter がバックオフ後に再試行する
+        """
+        path = failure.operation.reference.path
+        with self._lock:
+            if failure.code == ALREADY_EXISTS:
+                # create-if-absent の「既に存在する」は失敗として扱わない
+                self.stats.already_exists += 1
+                return False
+            if failure.code in RETRYABLE_CODES and failure.attempts < self.max_attempts:
+                self.stats.retried += 1
+                return True
+            error = BulkWriteError(path, failure.code, failure.message, failure.attempts)
+            self.stats.failed += 1
+            self.stats.errors[path] = error
+        logger.error(f"Bulk write failed for {path} after {error.attempts} attempts: {error.message}")
+        if self.on_failure is not None:
+            self.on_failure(error)
+        return False
@@ -0,0 +1,175 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+import os
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# アーカイブした記事のホット側 (Firestore) に残す墓標のステータス
+ARCHIVED_STATUS = 'archived'
+
+# 墓標に残すフィールド (重複判定・カウンタの数え直しに使う)
+TOMBSTONE_FIELDS = ('company_id', 'url', 'source', 'published_at')
+
+# アーカイブファイルの列 (id はFirestoreのドキュメントID)
+STRING_COLUMNS = ('id', 'company_id', 'title', 'url', 'content', 'image_url', 'source', 'status')
+TIMESTAMP_COLUMNS = ('published_at', 'created_at', 'updated_at', 'archived_at')
+
+Month = Tuple[int, int]
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    naiveな日時はUTCとして扱う (Firestoreと同じ)
+    """
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+def _month(value: datetime) -> Month:
+    value = _utc(value).astimezone(timezone.utc)
+    return value.year, value.month
+
+def _import_pyarrow():
+    """
+    pyarrow は任意依存のため、アーカイブを使う時に読み込む
+    """
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.fs
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("pyarrow is required for the cold archive (pip install pyarrow)") from e
+    return pyarrow
+
+class ColdArchive:
+    """
+    古い記事を公開月ごとに分けた Parquet ファイルに保存するコールドアーカイブ
+
+    {root}/year=YYYY/month=MM/part-{作成日時}-{uuid}.parquet に書き、既存のファイルは書き換えない
+    root はローカルのディレクトリ、または pyarrow が扱えるURI (gs://bucket/prefix など)
+    読み取りは月のパーティション単位で新しい順に行い、期間外の月のファイルは開かない
+    同じ記事を2回アーカイブした場合 (墓標を書く前に止まって再実行した場合など) は読み取り時に1件にまとめる
+    """
+
+    def __init__(self, root: str, compression: str = 'zstd'):
+        pa = _import_pyarrow()
+        self._pa = pa
+        if '://' not in root:
+            root = os.path.abspath(root)
+        self.filesystem, self.base = pa.fs.FileSystem.from_uri(root)
+        self.compression = compression
+        self.schema = pa.schema(
+            [(name, pa.string()) for name in STRING_COLUMNS]
+            + [(name, pa.timestamp('us', tz='UTC')) for name in TIMESTAMP_COLUMNS]
+        )
+
+    def _month_dir(self, month: Month) -> str:
+        return f"{self.base}/year={month[0]:04d}/month={month[1]:02d}"
+
+    def write(self, articles: Iterable[Dict[str, Any]], archived_at: Optional[datetime] = None) -> List[str]:
+        """
+        記事を公開月ごとに1ファイルずつ書き込む
+
+        Args:
+            articles (Iterable[Dict[str, Any]]): id を含む記事のデータ
+            archived_at (datetime): アーカイブした日時 (省略時は現在)
+
+        Returns:
+            List[str]: 書き込んだファイルのパス
+        """
+        archived_at = archived_at or datetime.now(timezone.utc)
+        by_month: Dict[Month, List[Dict[str, Any]]] = {}
+        for article in articles:
+            by_month.setdefault(_month(article['published_at']), []).append(article)
+
+        paths = []
+        stamp = archived_at.strftime('%Y%m%d%H%M%S')
+        for month, rows in sorted(by_month.items()):
+            columns = {name: [row.get(name) for row in rows] for name in STRING_COLUMNS}
+            for name in TIMESTAMP_COLUMNS:
+                columns[name] = [_utc(row.get(name)) for row in rows]
+            columns['archived_at'] = [_utc(archived_at)] * len(rows)
+            table = self._pa.table(columns, schema=self.schema)
+
+            directory = self._month_dir(month)
+            self.filesystem.create_dir(directory, recursive=True)
+            path = f"{directory}/part-{stamp}-{uuid.uuid4().hex[:8]}.parquet"
+            self._pa.parquet.write_table(table, path, filesystem=self.filesystem, compression=self.compression)
+            paths.append(path)
+        logger.info(f"Archived {sum(len(rows) for rows in by_month.values())} articles into {len(paths)} files")
+        return paths
+
+    def months(self) -> List[Month]:
+        """
+        アーカイブにある月の一覧 (古い順)
+        """
+        months = set()
+        for year in self._list_dirs(self.base, 'year='):
+            for month in self._list_dirs(f"{self.base}/year={year}", 'month='):
+                months.add((int(year), int(month)))
+        return sorted(months)
+
+    def _list_dirs(self, path: str, prefix: str) -> List[str]:
+        """
+        path 直下の prefix で始まるディレクトリの値 (prefix より後ろ) の一覧
+        """
+        selector = self._pa.fs.FileSelector(path, allow_not_found=True)
+        return [
+            info.base_name[len(prefix):] for info in self.filesystem.get_file_info(selector)
+            if info.type == self._pa.fs.FileType.Directory and info.base_name.startswith(prefix)
+        ]
+
+    def iter_articles(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        company_id: Optional[str] = None,
+        statuses: Optional[Iterable[str]] = ('active',)
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        アーカイブの記事を公開日時の新しい順に返す (保持するのは1か月分のみ)
+
+        Args:
+            start (datetime): この日時以降に公開された記事 (省略時は全て)
+            end (datetime): この日時より前に公開された記事 (省略時は全て)
+            company_id (str): 企業ID (省略時は全企業)
+            statuses (Iterable[str]): アーカイブした時点のステータス (Noneの場合は全て)
+
+        Returns:
+            Iterator[Dict[str, Any]]: id を含む記事のデータ
+        """
+        pc = self._pa.compute
+        start, end = _utc(start), _utc(end)
+        column = self._pa.dataset.field
+        conditions = []
+        if start is not None:
+            conditions.append(column('published_at') >= self._pa.scalar(start, self.schema.field('published_at').type))
+        if end is not None:
+            conditions.append(column('published_at') < self._pa.scalar(end, self.schema.field('published_at').type))
+        if company_id:
+            conditions.append(column('company_id') == company_id)
+        if statuses is not None:
+            conditions.append(column('status').isin(list(statuses)))
+        condition = None
+        for expression in conditions:
+            condition = expression if condition is None else condition & expression
+
+        for month in reversed(self.months()):
+            if (start is not None and month < _month(start)) or (end is not None and month > _month(end)):
+                continue
+            dataset = self._pa.dataset.dataset(
+                self._month_dir(month), filesystem=self.filesystem, format='parquet', schema=self.schema
+            )
+            table = dataset.to_table(filter=condition)
+            if table.num_rows == 0:
+                continue
+            # 同じ記事が複数回アーカイブされている場合は最後のものを使う
+            table = table.sort_by([('id', 'ascending'), ('archived_at', 'descending')])
+            ids = table.column('id')
+            keep = pc.not_equal(ids.slice(1), ids.slice(0, len(ids) - 1))
+            table = table.filter(self._pa.concat_arrays([self._pa.array([True]), keep.combine_chunks()]))
+            table = table.sort_by([('published_at', 'descending'), ('id', 'descending')])
+            yield from table.to_pylist()
@@ -0,0 +1,85 @@
+from typing import Any, Dict, Iterable, Optional
+import threading
+from cachetools import TTLCache
+
+# 存在しない企業もキャッシュし、同じIDで繰り返し読まないようにする
+_MISSING: Any = object()
+
+# app.py はリクエスト毎に FirestoreClient を生成するため、キャッシュはモジュールで共有する
+_cache: Optional[TTLCache] = None
+_cache_lock = threading.Lock()
+# invalidate の度に増やし、読み込み中に書き込まれた企業の古い内容をキャッシュしないようにする
+_generation = 0
+
+def _shared_cache(ttl: float, maxsize: int) -> TTLCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None or _cache.ttl != ttl or _cache.maxsize != maxsize:
+            _cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        return _cache
+
+def clear_company_cache():
+    """
+    企業情報のキャッシュを破棄する
+    """
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        if _cache is not None:
+            _cache.clear()
+
+class CompanyRegistry:
+    """
+    企業情報の読み取りキャッシュ (TTL付き・件数上限を超えたら最も使われていないものから捨てる)
+
+    キャッシュに無い企業は get_all でまとめて1回で読み、存在しない企業も期限まで覚えておく
+    save_company_info で書き込んだ企業は invalidate で捨て、次の参照で読み直す
+    """
+
+    def __init__(self, db: Any, collection: str = 'companies', ttl: float = 300, maxsize: int = 1024):
+        self.db = db
+        self.collection = collection
+        self._cache = _shared_cache(ttl, maxsize)
+
+    def get(self, company_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([company_id]).get(company_id)
+
+    def get_many(self, company_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        複数企業の情報を取得
+
+        Args:
+            company_ids (Iterable[str]): 企業ID
+
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: {企業ID: 企業情報 (存在しない場合はNone)}
+        """
+        result: Dict[str, Optional[Dict[str, Any]]] = {}
+        misses = []
+        with _cache_lock:
+            generation = _generation
+            for company_id in dict.fromkeys(company_ids):
+                cached = self._cache.get(company_id)
+                if cached is None:
+                    misses.append(company_id)
+                else:
+                    result[company_id] = None if cached is _MISSING else dict(cached)
+
+        if misses:
+            companies = self.db.collection(self.collection)
+            loaded: Dict[str, Any] = {company_id: _MISSING for company_id in misses}
+            for snapshot in self.db.get_all([companies.document(company_id) for company_id in misses]):
+                if snapshot.exists:
+                    loaded[snapshot.id] = snapshot.to_dict()
+            with _cache_lock:
+                if generation == _generation:
+                    self._cache.update(loaded)
+            for company_id, data in loaded.items():
+                result[company_id] = None if data is _MISSING else dict(data)
+        return result
+
+    def invalidate(self, company_id: str):
+        global _generation
+        with _cache_lock:
+            _generation += 1
+            self._cache.pop(company_id, None)
@@ -0,0 +1,693 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import cmp_to_key
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import copy
+import itertools
+import math
+import random
+import threading
+import time
+import uuid
+from google.api_core import exceptions
+from google.cloud.firestore_v1 import transforms
+
+# 遅延・エラーを注入する操作の種類
+OP_GET = 'get'              # ドキュメントの読み取り (get / get_all)
+OP_QUERY = 'query'          # クエリ (stream / get)
+OP_AGGREGATE = 'aggregate'  # count() 集計クエリ
+OP_WRITE = 'write'          # ドキュメント単体の書き込み (set / update / create / delete)
+OP_COMMIT = 'commit'        # バッチ・トランザクション・BulkWriter の1回の送信
+OPS = (OP_GET, OP_QUERY, OP_AGGREGATE, OP_WRITE, OP_COMMIT)
+
+# BulkWriter が1回に送る書き込み数と、並行して送るバッチ数
+BULK_BATCH_SIZE = 20
+BULK_CONCURRENCY = 10
+
+# gRPCステータス
+CODE_ALREADY_EXISTS = 6
+CODE_NOT_FOUND = 5
+CODE_UNAVAILABLE = 14
+
+ASCENDING = 'ASCENDING'
+DESCENDING = 'DESCENDING'
+# order_by / start_after でドキュメントIDを指すフィールド (FieldPath.document_id())
+DOCUMENT_ID = '__name__'
+
+# 99パーセンタイルの標準正規分布の値
+_Z_99 = 2.3263
+
+@dataclass(frozen=True)
+class Latency:
+    """
+    1回の操作の遅延 (ミリ秒)
+    p99_ms を指定すると中央値 median_ms・99パーセンタイル p99_ms の対数正規分布、省略すると固定値
+    """
+    median_ms: float = 0.0
+    p99_ms: Optional[float] = None
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        遅延を1つ選ぶ
+
+        Returns:
+            float: 遅延 (秒)
+        """
+        if self.median_ms <= 0:
+            return 0.0
+        if self.p99_ms is None or self.p99_ms <= self.median_ms:
+            return self.median_ms / 1000
+        sigma = math.log(self.p99_ms / self.median_ms) / _Z_99
+        return rng.lognormvariate(math.log(self.median_ms), sigma) / 1000
+
+@dataclass
+class FakeFirestoreStats:
+    """操作数・課金対象の読み書き数・注入した遅延の集計"""
+    ops: Dict[str, int] = field(default_factory=lambda: {op: 0 for op in OPS})
+    latency_seconds: Dict[str, float] = field(default_factory=lambda: {op: 0.0 for op in OPS})
+    reads: int = 0
+    writes: int = 0
+    deletes: int = 0
+    errors: int = 0
+    aborted: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'reads': self.reads,
+            'writes': self.writes,
+            'deletes': self.deletes,
+            'errors': self.errors,
+            'aborted': self.aborted,
+            'ops': dict(self.ops),
+            'latency_seconds': {op: round(seconds, 3) for op, seconds in self.latency_seconds.items()}
+        }
+
+def _normalize(value: Any) -> Any:
+    """
+    Firestoreと同じく、naiveなdatetimeはそのままの値をUTCとして扱う (読み取り時はtz付きで返る)
+    """
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+def _type_rank(value: Any) -> int:
+    """
+    異なる型の値の並び順 (null < bool < 数値 < 日時 < 文字列 < bytes < 配列 < map)
+    """
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, list):
+        return 7
+    return 8
+
+def _compare(a: Any, b: Any) -> int:
+    rank_a, rank_b = _type_rank(a), _type_rank(b)
+    if rank_a != rank_b:
+        return -1 if rank_a < rank_b else 1
+    if rank_a in (0, 8):
+        return 0
+    return (a > b) - (a < b)
+
+_MISSING: Any = object()
+
+def _get_field(data: Dict[str, Any], path: str) -> Any:
+    value: Any = data
+    for part in path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+def _order_value(doc: Tuple[Optional[str], Dict[str, Any]], path: str) -> Any:
+    if path == DOCUMENT_ID:
+        return doc[0] if doc[0] is not None else _MISSING
+    return _get_field(doc[1], path)
+
+def _matches(value: Any, op: str, expected: Any) -> bool:
+    if value is _MISSING:
+        return False
+    if op == '==':
+        return _compare(value, expected) == 0
+    if op == '!=':
+        return value is not None and _compare(value, expected) != 0
+    if op == 'in':
+        return any(_compare(value, item) == 0 for item in expected)
+    if op == 'not-in':
+        return value is not None and all(_compare(value, item) != 0 for item in expected)
+    if op == 'array-contains':
+        return isinstance(value, list) and any(_compare(item, expected) == 0 for item in value)
+    if op == 'array-contains-any':
+        return isinstance(value, list) and any(_compare(item, e) == 0 for item in value for e in expected)
+    # 範囲の比較は同じ型の値のみ対象になる
+    if _type_rank(value) != _type_rank(expected):
+        return False
+    result = _compare(value, expected)
+    return {'<': result < 0, '<=': result <= 0, '>': result > 0, '>=': result >= 0}[op]
+
+class FakeFirestore:
+    """
+    FirestoreClient が使う範囲の Firestore API をメモリ上で再現したフェイク (負荷試験用)
+
+    collection / document の get・set・update・create・delete、where・order_by・limit・select・start_after のクエリ、
+    count() 集計、batch、get_all、transaction (firestore.transactional)、bulk_writer を扱う
+    操作の種類ごとに遅延の分布 (Latency) とエラーの発生率を設定でき、操作数と読み書き数を stats に数える
+    on_snapshot は無いため、RecentArticlesMirror は poll モードで使う
+
+        db = FakeFirestore(latency={'commit': Latency(20, 80)}, errors={'commit': 0.01}, seed=1)
+        client = FirestoreClient(db=db)
+        db.stats.to_dict()
+    """
+
+    def __init__(
+        self,
+        latency: Union[Latency, Dict[str, Latency], None] = None,
+        errors: Optional[Dict[str, float]] = None,
+        seed: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        if isinstance(latency, Latency):
+            latency = {op: latency for op in OPS}
+        self.latency: Dict[str, Latency] = latency or {}
+        self.errors: Dict[str, float] = errors or {}
+        self.stats = FakeFirestoreStats()
+        self._sleep = sleep
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._documents: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # 書き込みの度に増やし、トランザクションで読んだ後に変更されたドキュメントを検出する
+        self._versions: Dict[str, int] = {}
+        self._version_counter = itertools.count(1)
+
+    # ------------------------------------------------------------------
+    # Firestore クライアントのAPI
+    # ------------------------------------------------------------------
+
+    def collection(self, name: str) -> 'FakeCollectionReference':
+        return FakeCollectionReference(self, name)
+
+    def batch(self) -> 'FakeWriteBatch':
+        return FakeWriteBatch(self)
+
+    def transaction(self, max_attempts: int = 5, read_only: bool = False) -> 'FakeTransaction':
+        return FakeTransaction(self, max_attempts, read_only)
+
+    def bulk_writer(self, options: Any = None) -> 'FakeBulkWriter':
+        return FakeBulkWriter(self)
+
+    def get_all(
+        self,
+        references: Iterable['FakeDocumentReference'],
+        field_paths: Optional[List[str]] = None,
+        transaction: Optional['FakeTransaction'] = None
+    ) -> Iterator['FakeDocumentSnapshot']:
+        references = list(references)
+        self._call(OP_GET)
+        with self._lock:
+            snapshots = [self._snapshot(reference, field_paths, transaction) for reference in references]
+            self.stats.reads += len(snapshots)
+        return iter(snapshots)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = FakeFirestoreStats()
+
+    def document_count(self, collection: str) -> int:
+        with self._lock:
+            return len(self._documents.get(collection, {}))
+
+    # ------------------------------------------------------------------
+    # 遅延・エラーの注入
+    # ------------------------------------------------------------------
+
+    def _call(self, op: str):
+        """
+        操作の遅延を待ち、設定された確率でエラーにする (待つ間はロックを持たない)
+        """
+        with self._lock:
+            delay = self.latency[op].sample(self._rng) if op in self.latency else 0.0
+            failed = self._rng.random() < self.errors.get(op, 0.0)
+            self.stats.ops[op] += 1
+            self.stats.latency_seconds[op] += delay
+            if failed:
+                self.stats.errors += 1
+        if delay:
+            self._sleep(delay)
+        if failed:
+            raise exceptions.ServiceUnavailable(f"Injected {op} failure")
+
+    # ------------------------------------------------------------------
+    # 保存データの操作 (ロックを持って呼ぶ)
+    # ------------------------------------------------------------------
+
+    def _split(self, path: str) -> Tuple[str, str]:
+        collection, doc_id = path.rsplit('/', 1)
+        return collection, doc_id
+
+    def _read(self, path: str) -> Optional[Dict[str, Any]]:
+        collection, doc_id = self._split(path)
+        return self._documents.get(collection, {}).get(doc_id)
+
+    def _snapshot(
+        self,
+        reference: 'FakeDocumentReference',
+        field_paths: Optional[List[str]] = None,
+        transaction: Optional['FakeTransaction'] = None
+    ) -> 'FakeDocumentSnapshot':
+        if transaction is not None:
+            transaction._read_versions[reference.path] = self._versions.get(reference.path, 0)
+        data = self._read(reference.path)
+        return FakeDocumentSnapshot(reference, copy.deepcopy(data), field_paths)
+
+    def _apply(self, kind: str, reference: 'FakeDocumentReference', data: Optional[Dict[str, Any]], merge: bool):
+        """
+        1件の書き込みを反映する (前提条件は _commit で確認済み)
+        """
+        collection, doc_id = self._split(reference.path)
+        documents = self._documents.setdefault(collection, {})
+        current = documents.get(doc_id)
+        if kind == 'delete':
+            if documents.pop(doc_id, None) is not None:
+                self.stats.deletes += 1
+            self._versions[reference.path] = next(self._version_counter)
+            return
+
+        if kind == 'update':
+            updated = copy.deepcopy(current)
+            for path, value in data.items():
+                parts = path.split('.')
+                target = updated
+                for part in parts[:-1]:
+                    target = target.setdefault(part, {})
+                self._set_value(target, parts[-1], value)
+        elif kind == 'set' and merge and current is not None:
+            updated = copy.deepcopy(current)
+            self._merge(updated, data)
+        else:
+            updated = {}
+            self._merge(updated, data)
+        documents[doc_id] = updated
+        self._versions[reference.path] = next(self._version_counter)
+        self.stats.writes += 1
+
+    def _merge(self, target: Dict[str, Any], data: Dict[str, Any]):
+        for key, value in data.items():
+            if isinstance(value, dict) and isinstance(target.get(key), dict):
+                self._merge(target[key], value)
+            else:
+                self._set_value(target, key, value)
+
+    def _set_value(self, target: Dict[str, Any], key: str, value: Any):
+        """
+        書き込む値を反映する (SERVER_TIMESTAMP・Increment・DELETE_FIELD はサーバー側と同じく解決する)
+        """
+        if value is transforms.DELETE_FIELD:
+            target.pop(key, None)
+        elif value is transforms.SERVER_TIMESTAMP:
+            target[key] = datetime.now(timezone.utc)
+        elif isinstance(value, transforms.Increment):
+            current = target.get(key)
+            target[key] = (current if isinstance(current, (int, float)) else 0) + value.value
+        elif isinstance(value, transforms.ArrayUnion):
+            current = list(target.get(key) or [])
+            target[key] = current + [item for item in _normalize(value.values) if item not in current]
+        elif isinstance(value, transforms.ArrayRemove):
+            removed = _normalize(value.values)
+            target[key] = [item for item in target.get(key) or [] if item not in removed]
+        elif isinstance(value, dict):
+            nested: Dict[str, Any] = {}
+            self._merge(nested, value)
+            target[key] = nested
+        else:
+            target[key] = _normalize(copy.deepcopy(value))
+
+    def _commit(self, writes: List[Tuple[str, 'FakeDocumentReference', Any, bool]], read_versions: Dict[str, int]):
+        """
+        複数の書き込みを原子的に反映する (途中で失敗した場合は何も反映しない)
+        """
+        with self._lock:
+            for path, version in read_versions.items():
+                if self._versions.get(path, 0) != version:
+                    self.stats.aborted += 1
+                    raise exceptions.Aborted(f"Document changed during transaction: {path}")
+            # 失敗するのは create・update の前提条件のみのため、反映する前に全て確認する
+            exists: Dict[str, bool] = {}
+            for kind, reference, _, _ in writes:
+                found = exists.get(reference.path, self._read(reference.path) is not None)
+                if kind == 'create' and found:
+                    raise exceptions.AlreadyExists(f"Document already exists: {reference.path}")
+                if kind == 'update' and not found:
+                    raise exceptions.NotFound(f"No document to update: {reference.path}")
+                exists[reference.path] = kind != 'delete'
+            for kind, reference, data, merge in writes:
+                self._apply(kind, reference, data, merge)
+
+    def _run_query(self, query: 'FakeQuery') -> List['FakeDocumentSnapshot']:
+        with self._lock:
+            docs = [
+                (doc_id, data) for doc_id, data in self._documents.get(query._collection, {}).items()
+                if all(_matches(_get_field(data, path), op, value) for path, op, value in query._filters)
+            ]
+            # 並び順のフィールドが無いドキュメントは結果に含まれない
+            docs = [doc for doc in docs if all(_order_value(doc, path) is not _MISSING for path, _ in query._orders)]
+            docs.sort(key=cmp_to_key(query._compare_docs))
+            if query._start_after is not None:
+                docs = [doc for doc in docs if query._compare_docs(doc, query._start_after) > 0]
+            if query._limit is not None:
+                docs = docs[:query._limit]
+            self.stats.reads += max(len(docs), 1)
+            return [
+                FakeDocumentSnapshot(
+                    FakeDocumentReference(self, query._collection, doc_id), copy.deepcopy(data), query._fields
+                )
+                for doc_id, data in docs
+            ]
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference: 'FakeDocumentReference', data: Optional[Dict[str, Any]], field_paths: Optional[List[str]] = None):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        # start_after のカーソルには射影前の値を使う
+        self._full = data
+        if data is not None and field_paths is not None:
+            data = {path: data[path] for path in field_paths if path in data}
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path: str) -> Any:
+        value = _get_field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+class FakeDocumentReference:
+    def __init__(self, db: FakeFirestore, collection: str, doc_id: str):
+        self._db = db
+        self.id = doc_id
+        self.path = f"{collection}/{doc_id}"
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, FakeDocumentReference) and other.path == self.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def get(self, field_paths: Optional[List[str]] = None, transaction: Optional['FakeTransaction'] = None) -> FakeDocumentSnapshot:
+        self._db._call(OP_GET)
+        with self._db._lock:
+            self._db.stats.reads += 1
+            return self._db._snapshot(self, field_paths, transaction)
+
+    def _write(self, kind: str, data: Optional[Dict[str, Any]] = None, merge: bool = False):
+        self._db._call(OP_WRITE)
+        self._db._commit([(kind, self, data, merge)], {})
+
+    def set(self, document_data: Dict[str, Any], merge: bool = False):
+        self._write('set', document_data, merge)
+
+    def create(self, document_data: Dict[str, Any]):
+        self._write('create', document_data)
+
+    def update(self, field_updates: Dict[str, Any]):
+        self._write('update', field_updates)
+
+    def delete(self):
+        self._write('delete')
+
+class FakeAggregationResult:
+    def __init__(self, alias: str, value: int):
+        self.alias = alias
+        self.value = value
+
+class FakeAggregationQuery:
+    def __init__(self, query: 'FakeQuery', alias: str):
+        self._query = query
+        self._alias = alias
+
+    def get(self) -> List[List[FakeAggregationResult]]:
+        db = self._query._db
+        db._call(OP_AGGREGATE)
+        with db._lock:
+            reads = db.stats.reads
+            count = len(db._run_query(self._query))
+            # 集計クエリはインデックス1000件ごとに1回の読み取りとして課金される
+            db.stats.reads = reads + max(1, math.ceil(count / 1000))
+        return [[FakeAggregationResult(self._alias, count)]]
+
+class FakeQuery:
+    def __init__(self, db: FakeFirestore, collection: str):
+        self._db = db
+        self._collection = collection
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._orders: List[Tuple[str, str]] = []
+        self._limit: Optional[int] = None
+        self._fields: Optional[List[str]] = None
+        # (ドキュメントID, フィールドの値)。値のみを指定したカーソルはドキュメントIDがNone
+        self._start_after: Optional[Tuple[Optional[str], Dict[str, Any]]] = None
+
+    def _copy(self) -> 'FakeQuery':
+        query = FakeQuery(self._db, self._collection)
+        query._filters = list(self._filters)
+        query._orders = list(self._orders)
+        query._limit = self._limit
+        query._fields = self._fields
+        query._start_after = self._start_after
+        return query
+
+    def where(self, field_path: Optional[str] = None, op_string: Optional[str] = None, value: Any = None, filter: Any = None) -> 'FakeQuery':
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        query = self._copy()
+        query._filters.append((field_path, op_string, _normalize(value)))
+        return query
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> 'FakeQuery':
+        query = self._copy()
+        query._orders.append((field_path, direction))
+        return query
+
+    def limit(self, count: int) -> 'FakeQuery':
+        query = self._copy()
+        query._limit = count
+        return query
+
+    def select(self, field_paths: Iterable[str]) -> 'FakeQuery':
+        query = self._copy()
+        query._fields = list(field_paths)
+        return query
+
+    def start_after(self, document: Union[FakeDocumentSnapshot, Dict[str, Any]]) -> 'FakeQuery':
+        query = self._copy()
+        if isinstance(document, dict):
+            doc_id = document.get(DOCUMENT_ID)
+            query._start_after = (getattr(doc_id, 'id', doc_id), _normalize(document))
+        else:
+            query._start_after = (document.id, document._full or {})
+        return query
+
+    def count(self, alias: Optional[str] = None) -> FakeAggregationQuery:
+        return FakeAggregationQuery(self, alias or 'count')
+
+    def _compare_docs(self, a: Tuple[str, Dict[str, Any]], b: Tuple[str, Dict[str, Any]]) -> int:
+        """
+        order_by のフィールド順、同じ値の場合はドキュメントID (最後の order_by と同じ向き) で比較する
+        """
+        for path, direction in self._orders:
+            result = _compare(_order_value(a, path), _order_value(b, path))
+            if result:
+                return -result if direction == DESCENDING else result
+        if a[0] is None or b[0] is None:
+            return 0
+        result = (a[0] > b[0]) - (a[0] < b[0])
+        return -result if self._orders and self._orders[-1][1] == DESCENDING else result
+
+    def stream(self, transaction: Optional['FakeTransaction'] = None) -> Iterator[FakeDocumentSnapshot]:
+        self._db._call(OP_QUERY)
+        return iter(self._db._run_query(self))
+
+    def get(self, transaction: Optional['FakeTransaction'] = None) -> List[FakeDocumentSnapshot]:
+        return list(self.stream(transaction))
+
+    def on_snapshot(self, callback: Callable) -> Any:
+        raise NotImplementedError("FakeFirestore does not support listeners; use hot_cache mode 'poll'")
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, db: FakeFirestore, name: str):
+        super().__init__(db, name)
+        self.id = name
+
+    def document(self, document_id: Optional[str] = None) -> FakeDocumentReference:
+        return FakeDocumentReference(self._db, self._collection, document_id or uuid.uuid4().hex[:20])
+
+class FakeWriteBatch:
+    def __init__(self, db: FakeFirestore):
+        self._db = db
+        self._writes: List[Tuple[str, FakeDocumentReference, Any, bool]] = []
+
+    def set(self, reference: FakeDocumentReference, document_data: Dict[str, Any], merge: bool = False):
+        self._writes.append(('set', reference, document_data, merge))
+
+    def create(self, reference: FakeDocumentReference, document_data: Dict[str, Any]):
+        self._writes.append(('create', reference, document_data, False))
+
+    def update(self, reference: FakeDocumentReference, field_updates: Dict[str, Any]):
+        self._writes.append(('update', reference, field_updates, False))
+
+    def delete(self, reference: FakeDocumentReference):
+        self._writes.append(('delete', reference, None, False))
+
+    def commit(self) -> List[Any]:
+        self._db._call(OP_COMMIT)
+        self._db._commit(self._writes, {})
+        writes, self._writes = self._writes, []
+        return [None] * len(writes)
+
+class FakeTransaction(FakeWriteBatch):
+    """
+    firestore.transactional から使えるトランザクション
+    読んだドキュメントが commit までに他から変更されていた場合は Aborted になり、transactional が再実行する
+    """
+
+    def __init__(self, db: FakeFirestore, max_attempts: int = 5, read_only: bool = False):
+        super().__init__(db)
+        # firestore.transactional (_Transactional) が参照する属性
+        self._max_attempts = max_attempts
+        self._read_only = read_only
+        self._id: Optional[bytes] = None
+        self._read_versions: Dict[str, int] = {}
+
+    @property
+    def in_progress(self) -> bool:
+        return self._id is not None
+
+    def _clean_up(self):
+        self._writes = []
+        self._read_versions = {}
+        self._id = None
+
+    def _begin(self, retry_id: Optional[bytes] = None):
+        self._id = uuid.uuid4().bytes
+
+    def _commit(self) -> List[Any]:
+        try:
+            self._db._call(OP_COMMIT)
+            self._db._commit(self._writes, self._read_versions)
+            return [None] * len(self._writes)
+        finally:
+            self._clean_up()
+
+    def _rollback(self):
+        self._clean_up()
+
+    def commit(self) -> List[Any]:
+        return self._commit()
+
+@dataclass
+class _BulkOperation:
+    kind: str
+    reference: FakeDocumentReference
+    data: Optional[Dict[str, Any]]
+    merge: bool = False
+    attempts: int = 0
+
+@dataclass
+class _BulkFailure:
+    """BulkWriter の on_write_error に渡す失敗 (BulkWriteFailure と同じ属性)"""
+    operation: _BulkOperation
+    code: int
+    message: str
+
+    @property
+    def attempts(self) -> int:
+        return self.operation.attempts
+
+class FakeBulkWriter:
+    """
+    BulkWriter のフェイク
+    書き込みを BULK_BATCH_SIZE 件ずつのバッチに分けて並行に送り、書き込み毎に結果・エラーのコールバックを呼ぶ
+    エラーのコールバックがTrueを返した書き込みは、もう1回の送信として再試行する
+    """
+
+    def __init__(self, db: FakeFirestore):
+        self._db = db
+        self._operations: List[_BulkOperation] = []
+        self._on_result: Optional[Callable] = None
+        self._on_error: Optional[Callable] = None
+
+    def on_write_result(self, callback: Callable):
+        self._on_result = callback
+
+    def on_write_error(self, callback: Callable):
+        self._on_error = callback
+
+    def create(self, reference: FakeDocumentReference, document_data: Dict[str, Any]):
+        self._operations.append(_BulkOperation('create', reference, document_data))
+
+    def set(self, reference: FakeDocumentReference, document_data: Dict[str, Any], merge: bool = False):
+        self._operations.append(_BulkOperation('set', reference, document_data, merge))
+
+    def update(self, reference: FakeDocumentReference, field_updates: Dict[str, Any]):
+        self._operations.append(_BulkOperation('update', reference, field_updates))
+
+    def delete(self, reference: FakeDocumentReference):
+        self._operations.append(_BulkOperation('delete', reference, None))
+
+    def flush(self):
+        operations, self._operations = self._operations, []
+        batches = [operations[i:i + BULK_BATCH_SIZE] for i in range(0, len(operations), BULK_BATCH_SIZE)]
+        if not batches:
+            return
+        with ThreadPoolExecutor(max_workers=min(BULK_CONCURRENCY, len(batches))) as executor:
+            list(executor.map(self._send, batches))
+
+    def close(self):
+        self.flush()
+
+    def _send(self, batch: List[_BulkOperation]):
+        while batch:
+            retry = []
+            try:
+                self._db._call(OP_COMMIT)
+                injected = None
+            except exceptions.GoogleAPICallError as e:
+                injected = e
+            for operation in batch:
+                operation.attempts += 1
+                error = injected
+                if error is None:
+                    try:
+                        self._db._commit([(operation.kind, operation.reference, operation.data, operation.merge)], {})
+                    except exceptions.GoogleAPICallError as e:
+                        error = e
+                if error is None:
+                    if self._on_result is not None:
+                        self._on_result(operation.reference, None, self)
+                    continue
+                failure = _BulkFailure(operation, self._error_code(error), error.message)
+                if self._on_error is not None and self._on_error(failure, self):
+                    retry.append(operation)
+            batch = retry
+
+    def _error_code(self, error: Exception) -> int:
+        if isinstance(error, exceptions.AlreadyExists):
+            return CODE_ALREADY_EXISTS
+        if isinstance(error, exceptions.NotFound):
+            return CODE_NOT_FOUND
+        return CODE_UNAVAILABLE
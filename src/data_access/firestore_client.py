@@ -1,25 +1,79 @@
 # src/data_access/firestore_client.py
 
-from typing import List, Any, Dict, Optional
+from typing import List, Any, Callable, Dict, Iterable, Iterator, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import heapq
 import firebase_admin
 from firebase_admin import credentials, firestore
 import yaml
 import os
 import logging
+import threading
+from cachetools import TTLCache
+
+from .bulk_writer import BulkPersistence, BulkWriteError
+from .cold_archive import ARCHIVED_STATUS, TOMBSTONE_FIELDS, ColdArchive
+from .company_cache import CompanyRegistry
+from .hot_cache import MODE_POLL, RecentArticlesMirror
+from .keys import article_doc_id
+from .latest_feed import GLOBAL_FEED_ID, LatestFeed, article_summary
+from .stats_counters import StatsCounters, count_articles, status_change_deltas
+from .url_filter import SeenUrlFilter
+from .models import ARTICLE_LIST_FIELDS, Article, ScrapingResult
+
+# `in` クエリに渡せる値の上限と、並行して発行するクエリ数
+IN_QUERY_LIMIT = 30
+QUERY_CONCURRENCY = 8
+
+# /stats の集計結果のキャッシュ
+# app.py はリクエスト毎に FirestoreClient を生成するため、インスタンスではなくモジュールで共有する
+STATS_CACHE_TTL = 300
+_stats_cache: TTLCache = TTLCache(maxsize=64, ttl=STATS_CACHE_TTL)
+_stats_cache_lock = threading.Lock()
+
+def clear_stats_cache():
+    """
+    /stats の集計結果のキャッシュを破棄する
+    """
+    with _stats_cache_lock:
+        _stats_cache.clear()
 
-from .models import Article, ScrapingResult
+@firestore.transactional
+def _update_status_in_transaction(transaction: Any, ref: Any, status: str, counters: StatsCounters) -> Dict[str, Any]:
+    """
+    記事のステータスとカウンタを1つのトランザクションで更新し、変更前の記事 (一覧用のフィールド) を返す
+    同じ記事を並行して変更した場合は再実行されるため、カウンタが二重に加算されない
+    """
+    snapshot = ref.get(field_paths=['status', *ARTICLE_LIST_FIELDS], transaction=transaction)
+    previous = snapshot.to_dict() if snapshot.exists else {}
+    transaction.update(ref, {
+        'status': status,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    })
+    counters.add_increments(transaction, status_change_deltas(previous.get('status'), status))
+    return previous
 
 class FirestoreClient:
     """
     Firestore接続とデータ操作を行うクラス
     """
 
-    def __init__(self):
-        self._initialize_firebase()
-        self.db = firestore.client()
+    def __init__(self, db: Any = None):
+        """
+        Args:
+            db (Any): 使用するFirestoreクライアント (省略時はFirebase Admin SDKで接続する。負荷試験では FakeFirestore を渡す)
+        """
+        if db is None:
+            self._initialize_firebase()
+            db = firestore.client()
+        self.db = db
         self.config = self._load_config()
         self.logger = logging.getLogger(__name__)
+        self._url_filter: Optional[SeenUrlFilter] = None
+        self._url_filter_lock = threading.Lock()
+        # 記事数カウンタの加算に失敗し、reconcile_stats.py で数え直す必要がある
+        self._stats_drifted = False
 
     def _initialize_firebase(self):
         """
@@ -50,38 +104,225 @@ class FirestoreClient:
     def save_articles(self, articles: List[Dict[str, Any]], company_id: str) -> List[str]:
         """
         新規記事をデータベースに保存する
+        ドキュメントIDは正規化したURLのハッシュで、存在しない場合のみ作成する (重複確認の読み取りは行わない)
 
         Args:
             articles (List[Dict[str, Any]]): 保存する記事 (dict形式)
             company_id (str): 企業ID
 
         Returns:
-            List[str]: 保存した記事のドキュメントIDリスト
+            List[str]: 新規に保存された記事のURLリスト (既に存在した記事は含まない)
+        """
+        return self.insert_articles([{**article, 'company_id': company_id} for article in articles])
+
+    def insert_articles(
+        self,
+        articles: List[Dict[str, Any]],
+        on_failure: Optional[Callable[[Dict[str, Any], BulkWriteError], None]] = None
+    ) -> List[str]:
+        """
+        複数企業の記事をまとめて保存する (存在しない場合のみ作成)
+        作成はサーバー側で判定されるため、並行して動く他のワーカーとも競合しない
+        書き込みは BulkWriter で分割・並列送信し、再試行しても失敗した記事は on_failure に通知する
+        BulkWriter の書き込みは原子的ではないため、記事数カウンタは作成できた記事の分を後から別のバッチで加算する
+        (記事の作成とカウンタの加算は同じトランザクションではない。加算に失敗した場合は stats_need_reconcile がTrueになる)
+
+        Args:
+            articles (List[Dict[str, Any]]): 保存する記事 (company_id を含むdict形式)
+            on_failure (Callable): 保存に失敗した記事とエラーを受け取るコールバック
+
+        Returns:
+            List[str]: 新規に保存された記事のURLリスト
         """
-        saved_ids = []
-        batch = self.db.batch()
         collection = self.db.collection(self.config['collections']['articles']['name'])
 
+        # 同じ呼び出し内で同じ記事が複数回現れた場合は1回だけ書き込む
+        unique: Dict[str, Dict[str, Any]] = {}
         for article in articles:
-            if not self._is_duplicate(article['url']):
-                doc_ref = collection.document()
-                article_data = {
-                    'company_id': company_id,
-                    'title': article['title'],
-                    'url': article['url'],
-                    'published_at': article['published_at'],
-                    'content': article.get('content'),
-                    'image_url': article.get('image_url'),
-                    'source': article['source'],
-                    'status': 'active',
-                    'created_at': firestore.SERVER_TIMESTAMP,
-                    'updated_at': firestore.SERVER_TIMESTAMP
-                }
-                batch.set(doc_ref, article_data)
-                saved_ids.append(doc_ref.id)
+            unique.setdefault(article_doc_id(article['url']), article)
+        if not unique:
+            return []
+
+        # フィルタで「保存済みかもしれない」記事のみFirestoreを確認する
+        # IDではなくURLで照合するため、決定的IDへ移行前の記事も重複として扱える
+        url_filter = self._seen_url_filter()
+        candidates = [
+            article['url'] for article in unique.values()
+            if url_filter is None or url_filter.might_contain(article['url'])
+        ]
+        existing = self.find_existing_urls(candidates)
+
+        pending: Dict[str, Dict[str, Any]] = {}
+        failed = (lambda error: on_failure(pending[error.path], error)) if on_failure else None
+        with self.bulk_writer(on_failure=failed) as writer:
+            for doc_id, article in unique.items():
+                if article['url'] in existing:
+                    continue
+                doc_ref = collection.document(doc_id)
+                pending[doc_ref.path] = article
+                writer.create(doc_ref, self._article_data(article, article['company_id']))
+
+        if url_filter is not None:
+            url_filter.add_many(
+                article['url'] for path, article in pending.items() if path not in writer.stats.errors
+            )
+        inserted = {path: article for path, article in pending.items() if path in writer.stats.succeeded_paths}
+        self._increment_stats(count_articles(inserted.values()))
+        self._update_latest_feeds(added=[
+            article_summary(path.rsplit('/', 1)[-1], article) for path, article in inserted.items()
+        ])
+        return [article['url'] for article in inserted.values()]
+
+    def bulk_writer(self, on_failure: Optional[Callable[[BulkWriteError], None]] = None) -> BulkPersistence:
+        """
+        設定ファイル (batch) のスロットリング・再試行回数で BulkPersistence を生成
+        """
+        batch_config = self.config.get('batch', {})
+        return BulkPersistence(
+            self.db,
+            initial_ops_per_second=batch_config.get('initial_ops_per_second', 500),
+            max_ops_per_second=batch_config.get('max_ops_per_second', 5000),
+            max_attempts=batch_config.get('max_retry', 3),
+            on_failure=on_failure
+        )
+
+    def stats_counters(self) -> StatsCounters:
+        """
+        設定ファイル (collections.article_stats) のコレクション・シャード数で StatsCounters を生成
+        """
+        stats_config = self.config['collections'].get('article_stats', {})
+        return StatsCounters(
+            self.db,
+            collection=stats_config.get('name', 'article_stats'),
+            shards=stats_config.get('shards', 10)
+        )
+
+    def _increment_stats(self, deltas: Dict[Any, int]):
+        """
+        記事数カウンタを加算する
+        失敗しても記事の保存は成功しているため例外は投げず、数え直しが必要な状態として記録する
+        """
+        if not deltas:
+            return
+        try:
+            self.stats_counters().increment(deltas)
+        except Exception as e:
+            self._stats_drifted = True
+            self.logger.error(f"Error updating stats counters; run reconcile_stats.py to fix them: {str(e)}")
+
+    def stats_need_reconcile(self) -> bool:
+        """
+        このクライアントで記事数カウンタの加算に失敗したか (Trueの場合は reconcile_stats.py で数え直す)
+        """
+        return self._stats_drifted
+
+    def latest_feed(self) -> LatestFeed:
+        """
+        設定ファイル (collections.latest_feeds) のコレクション・件数で LatestFeed を生成
+        """
+        feed_config = self.config['collections'].get('latest_feeds', {})
+        return LatestFeed(
+            self.db,
+            collection=feed_config.get('name', 'latest_feeds'),
+            size=feed_config.get('size', 50)
+        )
+
+    def rebuild_latest_feeds(self) -> Dict[str, int]:
+        """
+        全企業と全体の最新記事フィードをクエリで作り直す
+
+        Returns:
+            Dict[str, int]: {フィードID: 記事数}
+        """
+        feed = self.latest_feed()
+        articles = self.db.collection(self.config['collections']['articles']['name'])
+        active = articles.where('status', '==', 'active')
+        counts = {GLOBAL_FEED_ID: feed.rebuild(GLOBAL_FEED_ID, active)}
+        for company_id in self._company_ids():
+            counts[company_id] = feed.rebuild(company_id, active.where('company_id', '==', company_id))
+        return counts
+
+    def _update_latest_feeds(self, added: List[Dict[str, Any]] = (), removed: List[Dict[str, Any]] = ()):
+        """
+        最新記事フィードを更新する
+        記事の保存は成功しているため例外は投げず、更新できなかったフィードは reconcile_stats.py --feeds で作り直す
+        """
+        if not added and not removed:
+            return
+        try:
+            self.latest_feed().apply(added, removed)
+        except Exception as e:
+            self.logger.error(f"Error updating latest feeds: {str(e)}")
+
+    def find_existing_urls(self, urls: Iterable[str]) -> Set[str]:
+        """
+        保存済みのURLをまとめて確認する
+        `in` クエリ (1回あたり最大30件) に分割して並行に発行し、url フィールドのみを取得する
+
+        Args:
+            urls (Iterable[str]): 確認するURL
+
+        Returns:
+            Set[str]: 保存済みのURL
+        """
+        unique = list(dict.fromkeys(urls))
+        if not unique:
+            return set()
+        articles = self.db.collection(self.config['collections']['articles']['name'])
+        chunks = [unique[i:i + IN_QUERY_LIMIT] for i in range(0, len(unique), IN_QUERY_LIMIT)]
 
-        batch.commit()
-        return saved_ids
+        def query(chunk: List[str]) -> Set[str]:
+            docs = articles.where('url', 'in', chunk).select(['url']).stream()
+            return {doc.to_dict().get('url') for doc in docs}
+
+        with ThreadPoolExecutor(max_workers=min(QUERY_CONCURRENCY, len(chunks))) as executor:
+            found = set().union(*executor.map(query, chunks))
+        return found & set(unique)
+
+    def _seen_url_filter(self) -> Optional[SeenUrlFilter]:
+        """
+        保存済み記事URLのフィルタを取得 (初回はファイルが無ければFirestoreから構築する)
+        """
+        filter_config = self.config.get('url_filter', {})
+        if not filter_config.get('enabled', False):
+            return None
+        with self._url_filter_lock:
+            if self._url_filter is None:
+                url_filter = SeenUrlFilter(
+                    path=filter_config.get('path'),
+                    capacity=filter_config.get('capacity', 1_000_000),
+                    false_positive_rate=filter_config.get('false_positive_rate', 0.001)
+                )
+                url_filter.open(populate=self._iter_article_urls)
+                self._url_filter = url_filter
+            return self._url_filter
+
+    def _iter_article_urls(self):
+        """
+        保存済み記事のURLを全件列挙する (url フィールドのみ取得)
+        """
+        articles = self.db.collection(self.config['collections']['articles']['name'])
+        for doc in articles.select(['url']).stream():
+            url = doc.to_dict().get('url')
+            if url:
+                yield url
+
+    def _article_data(self, article: Dict[str, Any], company_id: str) -> Dict[str, Any]:
+        """
+        記事のドキュメントデータを生成
+        """
+        return {
+            'company_id': company_id,
+            'title': article['title'],
+            'url': article['url'],
+            'published_at': article['published_at'],
+            'content': article.get('content'),
+            'image_url': article.get('image_url'),
+            'source': article['source'],
+            'status': 'active',
+            'created_at': firestore.SERVER_TIMESTAMP,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        }
 
     def _is_duplicate(self, url: str) -> bool:
         """
@@ -97,7 +338,13 @@ class FirestoreClient:
         existing = articles.where('url', '==', url).limit(1).get()
         return len(existing) > 0
 
-    def get_recent_articles(self, company_id: Optional[str] = None, days: int = 7, limit: int = 100) -> List[Article]:
+    def get_recent_articles(
+        self,
+        company_id: Optional[str] = None,
+        days: int = 7,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> List[Article]:
         """
         指定期間内の記事を取得する
 
@@ -105,37 +352,104 @@ class FirestoreClient:
             company_id (str): 企業ID（省略時は全企業）
             days (int): 取得する日数
             limit (int): 取得する最大件数
+            fields (List[str]): 読み込むフィールド（省略時は全て。models.ARTICLE_LIST_FIELDS で一覧用に絞れる）
 
         Returns:
             List[Article]: 取得した記事をリストで返す
         """
         cutoff = datetime.now() - timedelta(days=days)
-        articles_ref = self.db.collection(self.config['collections']['articles']['name'])
+        # 一覧用のフィールドのみで足りる場合は、最新記事フィードの1ドキュメントで答えられるか試す
+        if self._served_by_feed(fields):
+            items = self.latest_feed().read(company_id or GLOBAL_FEED_ID, cutoff, limit)
+            if items is not None:
+                collection = self.db.collection(self.config['collections']['articles']['name'])
+                return [Article.from_dict(item['id'], item, collection.document(item['id'])) for item in items]
+
+        query = self._recent_articles_query(company_id, cutoff, fields)
+        query = query.order_by('published_at', direction=firestore.Query.DESCENDING).limit(limit)
+        return [Article.from_snapshot(doc) for doc in query.get()]
+
+    def iter_recent_articles(
+        self,
+        company_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        page_size: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[Article]:
+        """
+        指定日時以降の記事を新しい順に1件ずつ返す
+        page_size 件ずつ start_after カーソルで読み進めるため、期間が長くても保持するのは1ページ分のみ
 
-        query = articles_ref.where('status', '==', 'active').where('published_at', '>=', cutoff)
+        Args:
+            company_id (str): 企業ID（省略時は全企業）
+            since (datetime): この日時以降に公開された記事（省略時は7日前）
+            page_size (int): 1回のクエリで読む件数
+            fields (List[str]): 読み込むフィールド（省略時は全て）
 
-        if company_id:
-            query = query.where('company_id', '==', company_id)
+        Returns:
+            Iterator[Article]: 公開日時の新しい順の記事
+        """
+        since = since or datetime.now() - timedelta(days=7)
+        query = self._recent_articles_query(company_id, since, fields)
+        for doc in self._iter_pages(query.order_by('published_at', direction=firestore.Query.DESCENDING), page_size):
+            yield Article.from_snapshot(doc)
 
-        query = query.order_by('published_at', direction=firestore.Query.DESCENDING).limit(limit)
+    def _iter_pages(self, query: Any, page_size: int) -> Iterator[Any]:
+        """
+        並び順を指定したクエリを page_size 件ずつ start_after カーソルで読み進め、ドキュメントを1件ずつ返す
+        """
+        query = query.limit(page_size)
+        last_doc = None
+        while True:
+            page = query.start_after(last_doc) if last_doc is not None else query
+            docs = list(page.stream())
+            yield from docs
+            if len(docs) < page_size:
+                return
+            last_doc = docs[-1]
+
+    def count_recent_articles(self, company_id: Optional[str] = None, since: Optional[datetime] = None) -> int:
+        """
+        指定日時以降の記事数を count() 集計クエリで取得
+        """
+        since = since or datetime.now() - timedelta(days=7)
+        result = self._recent_articles_query(company_id, since).count(alias='count').get()
+        return int(result[0][0].value)
 
-        results = []
-        for doc in query.get():
-            data = doc.to_dict()
-            results.append(Article(
-                id=doc.id,
-                company_id=data['company_id'],
-                title=data['title'],
-                url=data['url'],
-                published_at=data['published_at'],
-                content=data.get('content'),
-                image_url=data.get('image_url'),
-                source=data['source'],
-                created_at=data.get('created_at'),
-                updated_at=data.get('updated_at')
-            ))
+    def recent_articles_mirror(self) -> Optional[RecentArticlesMirror]:
+        """
+        設定ファイル (hot_cache) から直近の記事のプロセス内キャッシュを生成 (無効の場合はNone)
+        開始 (start) は呼び出し側で行う
+        """
+        cache_config = self.config.get('hot_cache', {})
+        if not cache_config.get('enabled'):
+            return None
+        mode = cache_config.get('mode', 'listen')
+        # on_snapshot のクエリには射影を付けない
+        fields = ARTICLE_LIST_FIELDS if mode == MODE_POLL else None
+        return RecentArticlesMirror(
+            lambda since: self._recent_articles_query(None, since, fields),
+            days=cache_config.get('days', 30),
+            max_articles=cache_config.get('max_articles', 20000),
+            mode=mode,
+            poll_interval=cache_config.get('poll_interval', 60),
+            max_staleness=cache_config.get('max_staleness', 300)
+        )
+
+    def _served_by_feed(self, fields: Optional[List[str]]) -> bool:
+        """
+        最新記事フィード (一覧用のフィールドのみを持つ) で要求されたフィールドを返せるか
+        """
+        return bool(fields) and set(fields) <= set(ARTICLE_LIST_FIELDS)
 
-        return results
+    def _recent_articles_query(self, company_id: Optional[str], since: datetime, fields: Optional[List[str]] = None):
+        articles_ref = self.db.collection(self.config['collections']['articles']['name'])
+        query = articles_ref.where('status', '==', 'active').where('published_at', '>=', since)
+        if company_id:
+            query = query.where('company_id', '==', company_id)
+        if fields:
+            query = query.select(fields)
+        return query
 
     def update_article_status(self, article_id: str, status: str):
         """
@@ -146,10 +460,194 @@ class FirestoreClient:
             status (str): 新しいステータス
         """
         article_ref = self.db.collection(self.config['collections']['articles']['name']).document(article_id)
-        article_ref.update({
-            'status': status,
-            'updated_at': firestore.SERVER_TIMESTAMP
-        })
+        # 変更前のステータスの読み取りと、記事・カウンタの更新を1つのトランザクションで行う
+        previous = _update_status_in_transaction(self.db.transaction(), article_ref, status, self.stats_counters())
+        if previous:
+            self._update_feeds_for_status([(article_id, previous)], status)
+
+    def update_articles_status(self, article_ids: Iterable[str], status: str) -> List[str]:
+        """
+        複数記事のステータスをまとめて更新
+
+        Args:
+            article_ids (Iterable[str]): 更新する記事のID
+            status (str): 新しいステータス
+
+        Returns:
+            List[str]: 更新できた記事のIDリスト
+        """
+        collection = self.db.collection(self.config['collections']['articles']['name'])
+        refs = [collection.document(article_id) for article_id in dict.fromkeys(article_ids)]
+        # カウンタ・フィードの差分を求めるため、変更前のステータスと一覧用のフィールドをまとめて読む
+        previous = {
+            snapshot.reference.path: snapshot.to_dict() or {}
+            for snapshot in self.db.get_all(refs, field_paths=['status', *ARTICLE_LIST_FIELDS])
+            if snapshot.exists
+        }
+        with self.bulk_writer() as writer:
+            for doc_ref in refs:
+                writer.update(doc_ref, {
+                    'status': status,
+                    'updated_at': firestore.SERVER_TIMESTAMP
+                })
+
+        updated = [doc_ref for doc_ref in refs if doc_ref.path in writer.stats.succeeded_paths]
+        deltas: Dict[Any, int] = {}
+        for doc_ref in updated:
+            for key, delta in status_change_deltas(previous.get(doc_ref.path, {}).get('status'), status).items():
+                deltas[key] = deltas.get(key, 0) + delta
+        self._increment_stats(deltas)
+        self._update_feeds_for_status(
+            [(doc_ref.id, previous[doc_ref.path]) for doc_ref in updated if doc_ref.path in previous], status
+        )
+        return [doc_ref.id for doc_ref in updated]
+
+    def _update_feeds_for_status(self, articles: List[Any], status: str):
+        """
+        ステータス変更を最新記事フィードに反映する (有効でなくなった記事は外し、有効に戻った記事は入れる)
+
+        Args:
+            articles (List[Tuple[str, Dict[str, Any]]]): (記事ID, 変更前のデータ)
+            status (str): 新しいステータス
+        """
+        changed = [
+            article_summary(article_id, data) for article_id, data in articles
+            if (data.get('status') or 'active') != status
+        ]
+        if status == 'active':
+            self._update_latest_feeds(added=changed)
+        else:
+            self._update_latest_feeds(removed=changed)
+
+    # --------------------------------------------------------------------
+    # コールドアーカイブ (archive) 関連のメソッド
+    # --------------------------------------------------------------------
+
+    def cold_archive(self, path: Optional[str] = None) -> Optional[ColdArchive]:
+        """
+        設定ファイル (archive) から ColdArchive を生成 (保存先が未設定の場合はNone)
+        保存先は path、環境変数 ARCHIVE_PATH、設定ファイルの順に使う
+        """
+        archive_config = self.config.get('archive', {})
+        path = path or os.getenv('ARCHIVE_PATH') or archive_config.get('path')
+        if not path:
+            return None
+        return ColdArchive(path, compression=archive_config.get('compression', 'zstd'))
+
+    def archive_articles(
+        self,
+        older_than_days: Optional[int] = None,
+        archive: Optional[ColdArchive] = None,
+        dry_run: bool = False
+    ) -> Dict[str, int]:
+        """
+        公開から older_than_days 日を過ぎた記事をコールドアーカイブに移す
+
+        ページごとに、アーカイブのファイルに書き込んでから記事を墓標 (重複判定とカウンタ用のフィールドのみ、
+        status=archived) に置き換える。途中で止まっても再実行すれば残りから続けられる
+        記事数のカウンタは total 等はそのままで、status の軸のみ移し替える
+
+        Args:
+            older_than_days (int): 移す記事の経過日数 (省略時は設定ファイルの archive.older_than_days)
+            archive (ColdArchive): 保存先 (省略時は cold_archive())
+            dry_run (bool): Trueの場合は対象の記事数を数えるだけで書き込まない
+
+        Returns:
+            Dict[str, int]: {'archived': 移した記事数, 'files': 書き込んだファイル数, 'failed': 墓標を書けなかった記事数}
+        """
+        archive_config = self.config.get('archive', {})
+        if older_than_days is None:
+            older_than_days = archive_config.get('older_than_days', 365)
+        archive = archive or (None if dry_run else self.cold_archive())
+        if archive is None and not dry_run:
+            raise ValueError("Cold archive path is not configured (archive.path or ARCHIVE_PATH)")
+
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        articles = self.db.collection(self.config['collections']['articles']['name'])
+        query = (articles.where('status', 'in', ['active', 'deleted'])
+                 .where('published_at', '<', cutoff)
+                 .order_by('published_at'))
+
+        result = {'archived': 0, 'files': 0, 'failed': 0}
+        page_size = archive_config.get('page_size', 500)
+        page: List[Any] = []
+        for doc in self._iter_pages(query, page_size):
+            page.append(doc)
+            if len(page) == page_size:
+                self._archive_page(page, archive, dry_run, result)
+                page = []
+        if page:
+            self._archive_page(page, archive, dry_run, result)
+        self.logger.info(f"Archived articles published before {cutoff.isoformat()}: {result}")
+        return result
+
+    def _archive_page(self, docs: List[Any], archive: Optional[ColdArchive], dry_run: bool, result: Dict[str, int]):
+        if dry_run:
+            result['archived'] += len(docs)
+            return
+        previous = {doc.reference.path: doc.to_dict() for doc in docs}
+        result['files'] += len(archive.write({'id': doc.id, **previous[doc.reference.path]} for doc in docs))
+
+        # アーカイブのファイルを書き終えてから墓標に置き換える
+        with self.bulk_writer() as writer:
+            for doc in docs:
+                data = previous[doc.reference.path]
+                writer.set(doc.reference, {
+                    **{field: data.get(field) for field in TOMBSTONE_FIELDS},
+                    'status': ARCHIVED_STATUS,
+                    'archived_at': firestore.SERVER_TIMESTAMP,
+                    'updated_at': firestore.SERVER_TIMESTAMP
+                })
+
+        archived = [doc for doc in docs if doc.reference.path in writer.stats.succeeded_paths]
+        deltas: Dict[Any, int] = {}
+        for doc in archived:
+            for key, delta in status_change_deltas(previous[doc.reference.path].get('status'), ARCHIVED_STATUS).items():
+                deltas[key] = deltas.get(key, 0) + delta
+        self._increment_stats(deltas)
+        self._update_feeds_for_status([(doc.id, previous[doc.reference.path]) for doc in archived], ARCHIVED_STATUS)
+        result['archived'] += len(archived)
+        result['failed'] += len(docs) - len(archived)
+
+    def iter_articles_between(
+        self,
+        start: datetime,
+        end: Optional[datetime] = None,
+        company_id: Optional[str] = None,
+        page_size: int = 100,
+        archive: Optional[ColdArchive] = None
+    ) -> Iterator[Article]:
+        """
+        期間内の有効な記事を、Firestore とコールドアーカイブを合わせて公開日時の新しい順に返す (長期間のレポート用)
+        アーカイブが未設定の場合は Firestore のみ読む
+
+        Args:
+            start (datetime): この日時以降に公開された記事
+            end (datetime): この日時より前に公開された記事 (省略時は現在まで)
+            company_id (str): 企業ID（省略時は全企業）
+            page_size (int): Firestore の1回のクエリで読む件数
+            archive (ColdArchive): アーカイブ (省略時は cold_archive())
+
+        Returns:
+            Iterator[Article]: 公開日時の新しい順の記事
+        """
+        query = self._recent_articles_query(company_id, start)
+        if end is not None:
+            query = query.where('published_at', '<', end)
+        query = query.order_by('published_at', direction=firestore.Query.DESCENDING)
+        hot = (Article.from_snapshot(doc) for doc in self._iter_pages(query, page_size))
+
+        archive = archive or self.cold_archive()
+        if archive is None:
+            yield from hot
+            return
+        cold = (Article.from_dict(row['id'], row) for row in archive.iter_articles(start, end, company_id))
+        # 墓標を書く前に止まった記事は両方にあるため、隣り合った同じ記事は1件にする
+        last_id = None
+        for article in heapq.merge(hot, cold, key=lambda a: (a.published_at.replace(tzinfo=None), a.id), reverse=True):
+            if article.id != last_id:
+                yield article
+            last_id = article.id
 
     # --------------------------------------------------------------------
     # 企業 (companies) 関連のメソッド
@@ -157,7 +655,7 @@ class FirestoreClient:
 
     def get_company_info(self, company_id: str) -> Optional[Dict[str, Any]]:
         """
-        企業情報を取得する
+        企業情報を取得する (キャッシュを経由する)
 
         Args:
             company_id (str): 企業ID
@@ -165,31 +663,93 @@ class FirestoreClient:
         Returns:
             Optional[Dict[str, Any]]: 企業情報
         """
-        companies = self.db.collection(self.config['collections']['companies']['name'])
-        doc = companies.document(company_id).get()
-        return doc.to_dict() if doc.exists else None
+        return self.company_registry().get(company_id)
+
+    def get_company_names(self, company_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        複数企業の名前をまとめて取得する (キャッシュに無い企業のみ1回の get_all で読む)
+
+        Args:
+            company_ids (Iterable[str]): 企業ID
+
+        Returns:
+            Dict[str, str]: {企業ID: 企業名} (存在しない企業は含まない)
+        """
+        companies = self.company_registry().get_many(company_ids)
+        return {company_id: data.get('name', 'NoName') for company_id, data in companies.items() if data is not None}
 
     def save_company_info(self, company_data: Dict[str, Any]):
         """
-        企業情報を保存・更新
+        企業情報を保存・更新 (読み取り無しのマージ書き込み)
 
         Args:
             company_data (Dict[str, Any]): 保存する情報
         """
         companies = self.db.collection(self.config['collections']['companies']['name'])
-        doc_ref = companies.document(company_data['company_id'])
+        companies.document(company_data['company_id']).set({
+            **company_data,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        }, merge=True)
+        self.company_registry().invalidate(company_data['company_id'])
 
-        if doc_ref.get().exists:
-            doc_ref.update({
-                **company_data,
-                'updated_at': firestore.SERVER_TIMESTAMP
-            })
-        else:
-            doc_ref.set({
-                **company_data,
-                'created_at': firestore.SERVER_TIMESTAMP,
-                'updated_at': firestore.SERVER_TIMESTAMP
-            })
+    def company_registry(self) -> CompanyRegistry:
+        """
+        設定ファイル (collections.companies.cache) のTTL・件数で CompanyRegistry を生成
+        """
+        companies_config = self.config['collections']['companies']
+        cache_config = companies_config.get('cache', {})
+        return CompanyRegistry(
+            self.db,
+            collection=companies_config['name'],
+            ttl=cache_config.get('ttl', 300),
+            maxsize=cache_config.get('max_size', 1024)
+        )
+
+    # --------------------------------------------------------------------
+    # クロール状態 (crawl_state) 関連のメソッド
+    # --------------------------------------------------------------------
+
+    def get_watermark(self, company_id: str, source: str) -> Optional[Dict[str, Any]]:
+        """
+        企業・ソース毎の最高水位 (前回までに取得した最新記事) を取得
+
+        Args:
+            company_id (str): 企業ID
+            source (str): 取得元
+
+        Returns:
+            Optional[Dict[str, Any]]: {'url', 'published_at'} (未登録の場合はNone)
+        """
+        crawl_state = self.db.collection(self.config['collections']['crawl_state']['name'])
+        doc = crawl_state.document(f"{company_id}_{source}").get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        # Firestoreはnaiveなdatetimeをそのままの値でUTCとして保存するため、
+        # スクレイピング結果 (naive) と比較できるようtzinfoを外して戻す
+        published_at = data['published_at']
+        if published_at.tzinfo is not None:
+            published_at = published_at.replace(tzinfo=None)
+        return {'url': data['url'], 'published_at': published_at}
+
+    def update_watermark(self, company_id: str, source: str, url: str, published_at: datetime):
+        """
+        最高水位を更新
+
+        Args:
+            company_id (str): 企業ID
+            source (str): 取得元
+            url (str): 最新記事のURL
+            published_at (datetime): 最新記事の公開日時
+        """
+        crawl_state = self.db.collection(self.config['collections']['crawl_state']['name'])
+        crawl_state.document(f"{company_id}_{source}").set({
+            'company_id': company_id,
+            'source': source,
+            'url': url,
+            'published_at': published_at,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        })
 
     # --------------------------------------------------------------------
     # スクレイピング結果 (scraping_results) 関連のメソッド
@@ -214,40 +774,134 @@ class FirestoreClient:
         """
         全記事数を取得
         """
-        articles_ref = self.db.collection(self.config['collections']['articles']['name'])
-        docs = articles_ref.stream()
-        return len(list(docs))
+        return self._article_stat('total', lambda: {'all': self.count_articles()}).get('all', 0)
 
     def get_articles_count_by_company(self) -> Dict[str, int]:
         """
         企業IDごとの記事数を取得
         """
-        counts = {}
-        articles_ref = self.db.collection(self.config['collections']['articles']['name'])
-        for doc in articles_ref.stream():
-            data = doc.to_dict()
-            cid = data.get('company_id', '')
-            counts[cid] = counts.get(cid, 0) + 1
-        return counts
+        return self._article_stat('company', lambda: self.count_articles_by('company_id', self._company_ids()))
 
     def get_articles_count_by_source(self) -> Dict[str, int]:
         """
         ソースごとの記事数を取得
         """
-        counts = {}
-        articles_ref = self.db.collection(self.config['collections']['articles']['name'])
-        for doc in articles_ref.stream():
-            data = doc.to_dict()
-            source = data.get('source', '')
-            counts[source] = counts.get(source, 0) + 1
-        return counts
+        return self._article_stat('source', lambda: self.count_articles_by('source', self._article_sources()))
+
+    def get_articles_count_by_day(self) -> Dict[str, int]:
+        """
+        公開日 (YYYY-MM-DD) ごとの記事数を取得 (分散カウンタのみ)
+        """
+        return self.stats_counters().get_counts('day')
 
-    def get_latest_articles(self, limit: int = 5) -> List[Dict[str, Any]]:
+    def _article_stat(self, dimension: str, aggregate: Callable[[], Dict[str, int]]) -> Dict[str, int]:
+        """
+        記事数を分散カウンタから取得し、TTLキャッシュに保持する
+        設定 (stats.backend) が aggregation の場合や、カウンタが未作成の場合は count() 集計クエリを使う
+        """
+        backend = self.config.get('stats', {}).get('backend', 'counters')
+        key = (backend, dimension)
+        with _stats_cache_lock:
+            if key in _stats_cache:
+                return dict(_stats_cache[key])
+
+        counts: Dict[str, int] = {}
+        if backend == 'counters':
+            counts = self.stats_counters().get_counts(dimension)
+            if not counts:
+                self.logger.warning(f"No stats counters for {dimension}; falling back to aggregation queries")
+        if not counts:
+            counts = aggregate()
+
+        with _stats_cache_lock:
+            _stats_cache[key] = counts
+        return dict(counts)
+
+    def count_articles(self, company_id: Optional[str] = None, source: Optional[str] = None) -> int:
+        """
+        記事数をサーバー側の count() 集計クエリで取得 (ドキュメントは読み込まない)
+
+        Args:
+            company_id (Optional[str]): 指定した場合はその企業の記事のみ数える
+            source (Optional[str]): 指定した場合はそのソースの記事のみ数える
+
+        Returns:
+            int: 記事数
+        """
+        query = self.db.collection(self.config['collections']['articles']['name'])
+        if company_id:
+            query = query.where('company_id', '==', company_id)
+        if source:
+            query = query.where('source', '==', source)
+        result = query.count(alias='count').get()
+        return int(result[0][0].value)
+
+    def count_articles_by(self, field: str, values: Iterable[str]) -> Dict[str, int]:
+        """
+        値ごとの記事数を count() 集計クエリでまとめて取得 (クエリは並行して発行する)
+
+        Args:
+            field (str): company_id または source
+            values (Iterable[str]): 数える値の一覧
+
+        Returns:
+            Dict[str, int]: {値: 記事数}
+        """
+        values = list(dict.fromkeys(values))
+        if not values:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(QUERY_CONCURRENCY, len(values))) as executor:
+            counts = list(executor.map(lambda value: self.count_articles(**{field: value}), values))
+        return dict(zip(values, counts))
+
+    def verify_stats_counters(self) -> Dict[Any, int]:
+        """
+        分散カウンタを count() 集計クエリの結果と照合する
+
+        Returns:
+            Dict[Any, int]: ずれているキーと差分 (集計クエリの件数 - カウンタの値)
+        """
+        counters = self.stats_counters()
+        drift: Dict[Any, int] = {}
+        expected_by_dimension = {
+            'total': {'all': self.count_articles()},
+            'company': self.count_articles_by('company_id', self._company_ids()),
+            'source': self.count_articles_by('source', self._article_sources())
+        }
+        for dimension, expected in expected_by_dimension.items():
+            current = counters.get_counts(dimension)
+            for value in set(expected) | set(current):
+                delta = expected.get(value, 0) - current.get(value, 0)
+                if delta:
+                    drift[(dimension, value)] = delta
+        return drift
+
+    def _company_ids(self) -> List[str]:
+        companies = self.db.collection(self.config['collections']['companies']['name'])
+        return [doc.id for doc in companies.select([]).stream()]
+
+    def _article_sources(self) -> List[str]:
+        for field in self.config['collections']['articles']['fields']:
+            if field['name'] == 'source':
+                return list(field.get('enum', []))
+        return []
+
+    def get_latest_articles(self, limit: int = 5, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         最新の記事を取得 (生のdictで返す)
+
+        Args:
+            limit (int): 取得する件数
+            fields (List[str]): 読み込むフィールド（省略時は全て）
         """
+        if self._served_by_feed(fields):
+            items = self.latest_feed().read(GLOBAL_FEED_ID, None, limit)
+            if items is not None:
+                return [{'id': item['id'], **{field: item.get(field) for field in fields}} for item in items]
+
         articles_ref = self.db.collection(self.config['collections']['articles']['name'])
-        query = (articles_ref
+        query = articles_ref.select(fields) if fields else articles_ref
+        query = (query
                  .order_by('published_at', direction=firestore.Query.DESCENDING)
                  .limit(limit))
 
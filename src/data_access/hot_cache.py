@@ -0,0 +1,265 @@
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+from .models import ARTICLE_LIST_FIELDS, Article
+
+logger = logging.getLogger(__name__)
+
+MODE_LISTEN = 'listen'
+MODE_POLL = 'poll'
+
+# (公開日時, 記事ID) の昇順に並べた索引
+IndexKey = Tuple[datetime, str]
+
+def _naive(value: datetime) -> datetime:
+    return value.replace(tzinfo=None) if value.tzinfo is not None else value
+
+def _list_article(snapshot: Any) -> Article:
+    """
+    一覧表示に使うフィールドのみを保持した記事 (本文は参照時に読み込む)
+    on_snapshot のクエリでは射影が使えないため、受け取った後に落としてメモリを抑える
+    """
+    data = snapshot.to_dict()
+    return Article.from_dict(snapshot.id, {field: data.get(field) for field in ARTICLE_LIST_FIELDS}, snapshot.reference)
+
+class RecentArticlesMirror:
+    """
+    直近 days 日間の有効な記事をプロセス内に複製したキャッシュ (Slackの一覧表示用)
+
+    listen: Firestore の on_snapshot で変更を受け取り続ける (初回のスナップショットで全件を読み込む)
+    poll:   poll_interval 秒ごとに対象期間の記事を読み直す (on_snapshot が使えないフェイク等の場合)
+
+    公開日時が期間外になった記事と、max_articles を超えた分の古い記事は捨てる
+    最後に最新と確認できてからの経過秒数 (staleness) が max_staleness を超えたら、呼び出し側はFirestoreを直接読む
+    """
+
+    def __init__(
+        self,
+        query_factory: Callable[[datetime], Any],
+        days: int = 30,
+        max_articles: int = 20000,
+        mode: str = MODE_LISTEN,
+        poll_interval: float = 60.0,
+        max_staleness: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], datetime] = datetime.now
+    ):
+        if mode not in (MODE_LISTEN, MODE_POLL):
+            raise ValueError(f"Unknown hot cache mode: {mode}")
+        self.query_factory = query_factory
+        self.days = days
+        self.max_articles = max_articles
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.max_staleness = max_staleness
+        self._clock = clock
+        self._now = now
+
+        self._lock = threading.RLock()
+        self._articles: Dict[str, Article] = {}
+        self._index: List[IndexKey] = []
+        self._by_company: Dict[str, List[IndexKey]] = {}
+        self._confirmed_at: Optional[float] = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._watch: Any = None
+        self._watch_since: Optional[datetime] = None
+        # 件数の上限で捨てた最も新しい記事の公開日時 (これ以前は欠けている可能性がある)
+        self._size_floor: Optional[datetime] = None
+        # 保持している範囲の開始日時 (読み込み・期間外の記事を捨てた時点の期間の開始)
+        self._covers_from: Optional[datetime] = None
+        self.evicted_by_age = 0
+        self.evicted_by_size = 0
+        self.updates = 0
+
+    # ------------------------------------------------------------------
+    # 開始・停止
+    # ------------------------------------------------------------------
+
+    def start(self, timeout: float = 30.0) -> bool:
+        """
+        初回の読み込みを行い、以降の更新を受け取り始める
+
+        Returns:
+            bool: timeout 秒以内に初回の読み込みが終わった場合はTrue
+        """
+        if self.mode == MODE_LISTEN:
+            self._subscribe()
+        else:
+            self.poll()
+        self._thread = threading.Thread(target=self._maintain, name='recent-articles-mirror', daemon=True)
+        self._thread.start()
+        return self._ready.wait(timeout)
+
+    def stop(self):
+        self._stop.set()
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _window_start(self) -> datetime:
+        return self._now() - timedelta(days=self.days)
+
+    def _subscribe(self):
+        """
+        対象期間の記事の監視を (再) 開始する
+        クエリの開始日時は固定されるため、1日ごとに張り直して監視する範囲が広がり続けないようにする
+        """
+        since = self._window_start()
+        watch = self.query_factory(since).on_snapshot(self._on_snapshot)
+        with self._lock:
+            # 張り直す前の監視範囲の記事は、以降の変更を受け取らない
+            self._covers_from = max(self._covers_from or since, since)
+        previous, self._watch, self._watch_since = self._watch, watch, since
+        if previous is not None:
+            previous.unsubscribe()
+
+    def _maintain(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if self.mode == MODE_POLL:
+                    self.poll()
+                    continue
+                if self._watch is not None and self._watch.is_active:
+                    with self._lock:
+                        self._confirmed_at = self._clock()
+                        self._evict()
+                else:
+                    logger.warning("Recent articles listener is not active; resubscribing")
+                    self._subscribe()
+                if self._watch_since is not None and self._now() - self._watch_since > timedelta(days=1):
+                    self._subscribe()
+            except Exception as e:
+                logger.error(f"Error maintaining recent articles mirror: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # 更新
+    # ------------------------------------------------------------------
+
+    def _on_snapshot(self, docs: Any, changes: Any, read_time: Any):
+        with self._lock:
+            for change in changes:
+                if change.type.name == 'REMOVED':
+                    self._remove(change.document.id)
+                else:
+                    self._upsert(_list_article(change.document))
+            self._evict()
+            self.updates += 1
+            self._confirmed_at = self._clock()
+        self._ready.set()
+
+    def poll(self):
+        """
+        対象期間の記事を読み直して置き換える
+        """
+        since = self._window_start()
+        articles = [_list_article(doc) for doc in self.query_factory(since).stream()]
+        with self._lock:
+            self._articles.clear()
+            self._index.clear()
+            self._by_company.clear()
+            self._size_floor = None
+            self._covers_from = since
+            for article in articles:
+                self._upsert(article)
+            self._evict()
+            self.updates += 1
+            self._confirmed_at = self._clock()
+        self._ready.set()
+
+    def _key(self, article: Article) -> IndexKey:
+        return (_naive(article.published_at), article.id)
+
+    def _upsert(self, article: Article):
+        if article.id in self._articles:
+            self._remove(article.id)
+        key = self._key(article)
+        self._articles[article.id] = article
+        insort(self._index, key)
+        insort(self._by_company.setdefault(article.company_id, []), key)
+
+    def _remove(self, article_id: str):
+        article = self._articles.pop(article_id, None)
+        if article is None:
+            return
+        key = self._key(article)
+        for index in (self._index, self._by_company.get(article.company_id, [])):
+            position = bisect_left(index, key)
+            if position < len(index) and index[position] == key:
+                del index[position]
+        if not self._by_company.get(article.company_id):
+            self._by_company.pop(article.company_id, None)
+
+    def _evict(self):
+        """
+        期間外になった記事と、件数の上限を超えた古い記事を捨てる
+        """
+        cutoff = self._window_start()
+        while self._index and self._index[0][0] < cutoff:
+            self._remove(self._index[0][1])
+            self.evicted_by_age += 1
+        self._covers_from = max(self._covers_from or cutoff, cutoff)
+        while len(self._index) > self.max_articles:
+            published_at, article_id = self._index[0]
+            self._remove(article_id)
+            self._size_floor = max(self._size_floor or published_at, published_at)
+            self.evicted_by_size += 1
+
+    # ------------------------------------------------------------------
+    # 読み取り
+    # ------------------------------------------------------------------
+
+    @property
+    def staleness(self) -> float:
+        """最後に最新と確認できてからの経過秒数 (未読み込みの場合は inf)"""
+        if self._confirmed_at is None:
+            return float('inf')
+        return self._clock() - self._confirmed_at
+
+    def recent(
+        self,
+        company_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> Optional[List[Article]]:
+        """
+        since 以降の記事を新しい順に返す
+        期間の判定は保持している範囲 (最後に読み込み・期間外の記事を捨てた時点の期間) で行うため、
+        呼び出し側が days 日前を計算した時刻が多少前後しても、同じ日数の一覧には答えられる
+
+        Returns:
+            Optional[List[Article]]: 答えられない場合 (古すぎる・対象期間外・件数上限で欠けている可能性がある) はNone
+        """
+        with self._lock:
+            if self.staleness > self.max_staleness or self._covers_from is None:
+                return None
+            since = since or self._covers_from
+            if since < self._covers_from:
+                return None
+            if self._size_floor is not None and since <= self._size_floor:
+                return None
+            index = self._index if company_id is None else self._by_company.get(company_id, [])
+            start = bisect_left(index, (since, ''))
+            keys = index[start:][::-1]
+            if limit is not None:
+                keys = keys[:limit]
+            return [self._articles[article_id] for _, article_id in keys]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'articles': len(self._articles),
+                'companies': len(self._by_company),
+                'staleness_seconds': round(self.staleness, 3) if self._confirmed_at is not None else None,
+                'updates': self.updates,
+                'evicted_by_age': self.evicted_by_age,
+                'evicted_by_size': self.evicted_by_size
+            }
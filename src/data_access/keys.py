@@ -0,0 +1,38 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# 記事の同一性に関係しない計測用パラメータ
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid'}
+
+def normalize_url(url: str, drop_tracking: bool = False) -> str:
+    """
+    URLを正規化する
+    スキーム・ホストの小文字化、既定ポートとフラグメントの除去、クエリのソート
+    drop_tracking=True のときは計測用パラメータも除去する
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not (drop_tracking and (key in TRACKING_PARAMS or key.startswith(TRACKING_PARAM_PREFIXES)))
+    )
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+def normalize_article_url(url: str) -> str:
+    """
+    記事URLを正規化する (計測用パラメータを除いた normalize_url)
+    """
+    return normalize_url(url, drop_tracking=True)
+
+def article_doc_id(url: str) -> str:
+    """
+    正規化したURLのハッシュから記事のドキュメントIDを生成する
+    同じ記事は常に同じIDになるため、存在確認の読み取り無しで重複を防げる
+    """
+    return hashlib.sha256(normalize_article_url(url).encode('utf-8')).hexdigest()
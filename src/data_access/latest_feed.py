@@ -0,0 +1,185 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+from firebase_admin import firestore
+from .models import ARTICLE_LIST_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# 全企業の最新記事を持つフィードのドキュメントID
+GLOBAL_FEED_ID = '_all'
+
+# rebuild で全記事を収めた (これより古い記事が無い) フィードの covers_from
+EPOCH = datetime(1970, 1, 1)
+
+# Firestoreの日時の精度 (同時刻の記事を落とした場合に covers_from をその直後にずらす幅)
+COVERAGE_STEP = timedelta(microseconds=1)
+
+def _coverage_after_truncation(oldest_kept: datetime, first_dropped: datetime) -> datetime:
+    """
+    切り詰めた後のフィードが網羅している範囲の開始日時
+    落とした記事が残した最古の記事と同時刻の場合、その時刻の記事は揃っていないため直後からとする
+    """
+    if first_dropped >= oldest_kept:
+        return oldest_kept + COVERAGE_STEP
+    return oldest_kept
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Firestoreから読んだ日時 (UTC) のtzinfoを外し、記事の公開日時 (naive) と比較できるようにする
+    """
+    if value is not None and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+def article_summary(article_id: str, article: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    フィードに入れる記事の要約 (一覧表示に使うフィールドのみ)
+    """
+    return {'id': article_id, **{field: article.get(field) for field in ARTICLE_LIST_FIELDS}}
+
+def merge_feed(
+    items: List[Dict[str, Any]],
+    covers_from: datetime,
+    added: Iterable[Dict[str, Any]] = (),
+    removed_ids: Iterable[str] = (),
+    size: int = 50
+) -> Tuple[List[Dict[str, Any]], datetime]:
+    """
+    フィードに記事を追加・削除し、公開日時の新しい順に size 件に切り詰める
+
+    covers_from 以降に公開された有効な記事は全てフィードに含まれる (切り詰めた場合は残した最古の記事の日時に上がり、
+    同時刻の記事を落とした場合はその直後になる)
+    covers_from より古い記事を追加すると、間の記事が欠けている可能性があるため追加しない
+
+    Returns:
+        Tuple[List[Dict[str, Any]], datetime]: (記事の要約, covers_from)
+    """
+    removed = set(removed_ids)
+    merged = {item['id']: item for item in items if item['id'] not in removed}
+    for item in added:
+        if item['id'] not in removed and _naive(item['published_at']) >= covers_from:
+            merged[item['id']] = item
+    ordered = sorted(merged.values(), key=lambda item: _naive(item['published_at']), reverse=True)
+    if len(ordered) > size:
+        first_dropped = _naive(ordered[size]['published_at'])
+        ordered = ordered[:size]
+        covers_from = max(
+            covers_from, _coverage_after_truncation(_naive(ordered[-1]['published_at']), first_dropped)
+        )
+    return ordered, covers_from
+
+def read_feed(
+    items: List[Dict[str, Any]],
+    covers_from: datetime,
+    since: Optional[datetime],
+    limit: int
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    フィードだけで「since 以降の最新 limit 件」に答えられる場合はその記事を返す (答えられない場合はNone)
+    """
+    matched = [item for item in items if since is None or _naive(item['published_at']) >= since]
+    # covers_from が EPOCH のフィードは全記事を含むため、どの期間にも答えられる
+    if len(matched) >= limit or max(since or EPOCH, EPOCH) >= covers_from:
+        return matched[:limit]
+    return None
+
+@firestore.transactional
+def _update_in_transaction(transaction: Any, ref: Any, added: List[Dict[str, Any]], removed_ids: List[str], size: int):
+    snapshot = ref.get(transaction=transaction)
+    if not snapshot.exists:
+        # rebuild 前のフィードは欠けている記事が分からないため作らない
+        return
+    data = snapshot.to_dict()
+    items, covers_from = merge_feed(
+        data.get('items', []), _naive(data['covers_from']), added, removed_ids, size
+    )
+    transaction.update(ref, {
+        'items': items,
+        'covers_from': covers_from,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    })
+
+class LatestFeed:
+    """
+    企業ごと・全体の最新記事フィード (リングバッファのドキュメント)
+
+    記事の保存・ステータス変更の度に、該当する企業と全体のフィードをトランザクションで更新する
+    「企業Xの最新N件」「全体の最新N件」はインデックスを使うクエリではなく、1ドキュメントの読み取りで返せる
+    フィードは rebuild で作成し、作成前 (または更新に失敗して削除した) フィードは呼び出し側がクエリにフォールバックする
+    """
+
+    def __init__(self, db: Any, collection: str = 'latest_feeds', size: int = 50):
+        self.db = db
+        self.collection = collection
+        self.size = size
+
+    def _ref(self, feed_id: str):
+        return self.db.collection(self.collection).document(feed_id)
+
+    def apply(self, added: Iterable[Dict[str, Any]] = (), removed: Iterable[Dict[str, Any]] = ()):
+        """
+        追加・削除した記事 (要約) を、企業ごとのフィードと全体のフィードに反映する
+        """
+        changes: Dict[str, Tuple[List[Dict[str, Any]], List[str]]] = {}
+        for item in added:
+            for feed_id in (item.get('company_id'), GLOBAL_FEED_ID):
+                if feed_id:
+                    changes.setdefault(feed_id, ([], []))[0].append(item)
+        for item in removed:
+            for feed_id in (item.get('company_id'), GLOBAL_FEED_ID):
+                if feed_id:
+                    changes.setdefault(feed_id, ([], []))[1].append(item['id'])
+
+        for feed_id, (feed_added, feed_removed) in changes.items():
+            try:
+                _update_in_transaction(self.db.transaction(), self._ref(feed_id), feed_added, feed_removed, self.size)
+            except Exception as e:
+                # 更新できなかったフィードは古い内容を返さないよう削除し、rebuild まではクエリで読ませる
+                logger.error(f"Error updating latest feed {feed_id}; dropping it until rebuild: {str(e)}")
+                self._ref(feed_id).delete()
+
+    def read(self, feed_id: str, since: Optional[datetime], limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        フィードから since 以降の最新 limit 件を返す
+        フィードが無い、またはフィードだけでは答えられない場合はNone
+        """
+        if limit > self.size:
+            return None
+        snapshot = self._ref(feed_id).get()
+        if not snapshot.exists:
+            return None
+        data = snapshot.to_dict()
+        return read_feed(data.get('items', []), _naive(data['covers_from']), since, limit)
+
+    def rebuild(self, feed_id: str, query: Any) -> int:
+        """
+        最新 size 件をクエリで読み直してフィードを作り直す
+        網羅している範囲を決めるため、size + 1 件目まで読む
+
+        Args:
+            feed_id (str): 企業ID または GLOBAL_FEED_ID
+            query (Any): 対象の有効な記事のクエリ (公開日時の降順に並べる前のもの)
+
+        Returns:
+            int: フィードに入れた記事数
+        """
+        docs = list(query.select(ARTICLE_LIST_FIELDS)
+                    .order_by('published_at', direction=firestore.Query.DESCENDING)
+                    .limit(self.size + 1)
+                    .stream())
+        items = [article_summary(doc.id, doc.to_dict()) for doc in docs]
+        # size 件以下であれば全記事が入っている
+        covers_from = EPOCH
+        if len(items) > self.size:
+            covers_from = _coverage_after_truncation(
+                _naive(items[self.size - 1]['published_at']), _naive(items[self.size]['published_at'])
+            )
+            items = items[:self.size]
+        self._ref(feed_id).set({
+            'items': items,
+            'covers_from': covers_from,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        })
+        logger.info(f"Rebuilt latest feed {feed_id} with {len(items)} articles")
+        return len(items)
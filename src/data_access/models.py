@@ -2,38 +2,141 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-@dataclass
+# 一覧表示 (Slack・/stats) に必要なフィールド。クエリの select() に渡して本文などを読まないようにする
+ARTICLE_LIST_FIELDS = ['company_id', 'title', 'url', 'published_at', 'source']
+
+# 一覧では読まず、参照された時に読み込むフィールド
+ARTICLE_HEAVY_FIELDS = ('content', 'image_url')
+
+# 未読み込みを表す値 (None は「値が無い」として保存され得るため区別する)
+_UNLOADED: Any = object()
+
 class Article:
     """
     記事データのモデルクラス
+
+    大量に生成されるため __slots__ でインスタンス辞書を持たない
+    射影クエリ (select) で読んだ場合、content / image_url は最初に参照した時にドキュメントから読み込む
     """
-    id: str
-    company_id: str
-    title: str
-    url: str
-    published_at: datetime
-    content: Optional[str]
-    image_url: Optional[str]
-    source: str
-    created_at: datetime
-    updated_at: datetime
+    __slots__ = (
+        'id', 'company_id', 'title', 'url', 'published_at', 'source',
+        'created_at', 'updated_at', '_content', '_image_url', '_reference'
+    )
+
+    def __init__(
+        self,
+        id: str,
+        company_id: str,
+        title: str,
+        url: str,
+        published_at: datetime,
+        content: Optional[str] = None,
+        image_url: Optional[str] = None,
+        source: str = '',
+        created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None,
+        reference: Any = None
+    ):
+        self.id = id
+        self.company_id = company_id
+        self.title = title
+        self.url = url
+        self.published_at = published_at
+        self.source = source
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self._content = content
+        self._image_url = image_url
+        # 遅延読み込み用のドキュメント参照
+        self._reference = reference
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Any) -> 'Article':
+        """
+        Firestoreのドキュメントスナップショットから生成
+        スナップショットに無い content / image_url は、参照時にドキュメントから読み込む
+        """
+        return cls.from_dict(snapshot.id, snapshot.to_dict(), snapshot.reference)
+
+    @classmethod
+    def from_dict(cls, article_id: str, data: Dict[str, Any], reference: Any = None) -> 'Article':
+        """
+        ドキュメントのデータ (または射影・要約したもの) から生成
+        data に無い content / image_url は、reference があれば参照時に読み込む (無ければNone)
+        """
+        lazy = 'content' not in data or 'image_url' not in data
+        return cls(
+            article_id,
+            data.get('company_id'),
+            data.get('title'),
+            data.get('url'),
+            data.get('published_at'),
+            data.get('content', _UNLOADED),
+            data.get('image_url', _UNLOADED),
+            data.get('source'),
+            data.get('created_at'),
+            data.get('updated_at'),
+            reference if lazy else None
+        )
+
+    def _load_heavy_fields(self):
+        data = {}
+        if self._reference is not None:
+            data = self._reference.get(field_paths=list(ARTICLE_HEAVY_FIELDS)).to_dict() or {}
+        if self._content is _UNLOADED:
+            self._content = data.get('content')
+        if self._image_url is _UNLOADED:
+            self._image_url = data.get('image_url')
+        self._reference = None
+
+    @property
+    def content(self) -> Optional[str]:
+        if self._content is _UNLOADED:
+            self._load_heavy_fields()
+        return self._content
+
+    @content.setter
+    def content(self, value: Optional[str]):
+        self._content = value
+
+    @property
+    def image_url(self) -> Optional[str]:
+        if self._image_url is _UNLOADED:
+            self._load_heavy_fields()
+        return self._image_url
+
+    @image_url.setter
+    def image_url(self, value: Optional[str]):
+        self._image_url = value
 
     def to_dict(self) -> dict:
         """
         記事データを辞書形式に変換
+        読み込んでいない content / image_url は含めない (変換のためにFirestoreを読まない)
         """
-        return {
+        data = {
             'id': self.id,
             'company_id': self.company_id,
             'title': self.title,
             'url': self.url,
             'published_at': self.published_at,
-            'content': self.content,
-            'image_url': self.image_url,
             'source': self.source,
             'created_at': self.created_at,
             'updated_at': self.updated_at
         }
+        if self._content is not _UNLOADED:
+            data['content'] = self._content
+        if self._image_url is not _UNLOADED:
+            data['image_url'] = self._image_url
+        return data
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Article):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Article(id={self.id!r}, company_id={self.company_id!r}, title={self.title!r}, url={self.url!r})"
 
 @dataclass
 class Company:
@@ -64,6 +167,11 @@ class ScrapingResult:
     articles_count: int
     error_message: Optional[str] = None
     execution_time: Optional[float] = None
+    cache_hits: int = 0
+    cache_misses: int = 0
+    bytes_saved: int = 0
+    rate_limit_wait: float = 0.0
+    retries: int = 0
 
     def to_dict(self) -> dict:
         return {
@@ -72,5 +180,10 @@ class ScrapingResult:
             'success': self.success,
             'articles_count': self.articles_count,
             'error_message': self.error_message,
-            'execution_time': self.execution_time
+            'execution_time': self.execution_time,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'bytes_saved': self.bytes_saved,
+            'rate_limit_wait': self.rate_limit_wait,
+            'retries': self.retries
         }
@@ -0,0 +1,306 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+import base64
+import collections
+import gzip
+import itertools
+import json
+import logging
+import os
+import time
+from google.api_core import exceptions
+
+logger = logging.getLogger(__name__)
+
+# order_by / start_after でドキュメントIDを指すフィールド (FieldPath.document_id())
+DOCUMENT_ID = '__name__'
+
+# 1回のバッチ書き込みに含められる操作数の上限
+BATCH_LIMIT = 500
+
+# 再試行する書き込みのエラー
+RETRYABLE_ERRORS = (
+    exceptions.Aborted, exceptions.DeadlineExceeded, exceptions.InternalServerError,
+    exceptions.ServiceUnavailable, exceptions.TooManyRequests
+)
+
+def encode_value(value: Any) -> Any:
+    """
+    Firestoreの値をJSONで表せる値にする (日時・バイト列は型が分かる形にする)
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            # Firestoreと同じく、naiveな日時はUTCとして扱う
+            value = value.replace(tzinfo=timezone.utc)
+        return {'$timestamp': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'$bytes': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, dict):
+        return {key: encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise TypeError(f"Cannot export value of type {type(value).__name__}")
+
+def decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and '$timestamp' in value:
+            return datetime.fromisoformat(value['$timestamp'])
+        if len(value) == 1 and '$bytes' in value:
+            return base64.b64decode(value['$bytes'])
+        return {key: decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    return value
+
+def encode_document(doc_id: str, data: Dict[str, Any]) -> str:
+    """
+    1ドキュメントを1行のJSONにする
+    """
+    return json.dumps({'id': doc_id, 'data': encode_value(data)}, ensure_ascii=False, separators=(',', ':'))
+
+def decode_document(line: str) -> Tuple[str, Dict[str, Any]]:
+    record = json.loads(line)
+    return record['id'], decode_value(record['data'])
+
+@dataclass
+class TransferStats:
+    """エクスポート・インポートの件数とスループット"""
+    collection: str
+    documents: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+    resumed_from: int = 0
+
+    @property
+    def documents_per_second(self) -> float:
+        return (self.documents - self.resumed_from) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / self.elapsed / 1024 / 1024 if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'collection': self.collection,
+            'documents': self.documents,
+            'resumed_from': self.resumed_from,
+            'bytes': self.bytes,
+            'elapsed': round(self.elapsed, 2),
+            'documents_per_second': round(self.documents_per_second, 1),
+            'megabytes_per_second': round(self.megabytes_per_second, 2)
+        }
+
+class Checkpoint:
+    """
+    コレクションごとの進捗を JSON ファイルに保存する (一時ファイルに書いてから置き換える)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._state: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._state = json.load(f)
+
+    def get(self, collection: str) -> Dict[str, Any]:
+        return dict(self._state.get(collection, {}))
+
+    def update(self, collection: str, **state: Any):
+        self._state[collection] = {**self._state.get(collection, {}), **state}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+class _Progress:
+    """
+    report_every 秒ごとにスループットをログに出す
+    """
+
+    def __init__(self, stats: TransferStats, action: str, report_every: float):
+        self.stats = stats
+        self.action = action
+        self.report_every = report_every
+        self._started = time.perf_counter()
+        self._last_report = self._started
+
+    def update(self, documents: int, bytes_count: int):
+        now = time.perf_counter()
+        self.stats.documents = documents
+        self.stats.bytes = bytes_count
+        self.stats.elapsed = now - self._started
+        if now - self._last_report >= self.report_every:
+            self._last_report = now
+            logger.info(
+                f"{self.action} {self.stats.collection}: {documents} documents, "
+                f"{self.stats.documents_per_second:.0f} docs/s, {self.stats.megabytes_per_second:.2f} MB/s"
+            )
+
+def export_collection(
+    db: Any,
+    collection: str,
+    path: str,
+    checkpoint: Checkpoint,
+    page_size: int = 500,
+    compresslevel: int = 6,
+    report_every: float = 10.0
+) -> TransferStats:
+    """
+    コレクションを gzip 圧縮した NDJSON (1行1ドキュメント) に書き出す
+
+    ドキュメントIDの順に page_size 件ずつ start_after カーソルで読み、保持するのは1ページ分のみ
+    1ページを1つの gzip メンバーとして追記し、書き終えた位置と最後のIDをチェックポイントに記録する
+    再開時は記録した位置までファイルを切り詰め、最後のIDの次から読み進める
+
+    Args:
+        db (Any): Firestoreクライアント
+        collection (str): コレクション名
+        path (str): 書き出すファイル (.ndjson.gz)
+        checkpoint (Checkpoint): 進捗の保存先
+        page_size (int): 1回のクエリで読む件数
+        compresslevel (int): gzip の圧縮レベル
+        report_every (float): スループットをログに出す間隔 (秒)
+
+    Returns:
+        TransferStats: 件数とスループット
+    """
+    state = checkpoint.get(collection)
+    stats = TransferStats(collection, documents=state.get('documents', 0), resumed_from=state.get('documents', 0))
+    if state.get('done'):
+        logger.info(f"Export of {collection} already completed ({stats.documents} documents); skipping")
+        return stats
+
+    last_id: Optional[str] = state.get('last_id')
+    offset = state.get('offset', 0) if last_id is not None else 0
+    if last_id is not None and not os.path.exists(path):
+        logger.warning(f"Export file {path} is missing; restarting export of {collection} from the beginning")
+        last_id, offset = None, 0
+        stats.documents = stats.resumed_from = 0
+    query = db.collection(collection).order_by(DOCUMENT_ID).limit(page_size)
+    progress = _Progress(stats, 'Exported', report_every)
+    documents = stats.documents
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'r+b' if offset else 'wb') as raw:
+        # 前回チェックポイントを記録した後に書きかけた分を捨てる
+        raw.truncate(offset)
+        raw.seek(offset)
+        while True:
+            page = query.start_after({DOCUMENT_ID: last_id}) if last_id is not None else query
+            docs = list(page.stream())
+            if docs:
+                with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=compresslevel) as member:
+                    for doc in docs:
+                        member.write((encode_document(doc.id, doc.to_dict()) + '\n').encode('utf-8'))
+                raw.flush()
+                os.fsync(raw.fileno())
+                last_id = docs[-1].id
+                documents += len(docs)
+                checkpoint.update(collection, last_id=last_id, offset=raw.tell(), documents=documents)
+                progress.update(documents, raw.tell() - offset)
+            if len(docs) < page_size:
+                break
+
+    progress.update(documents, stats.bytes)
+    checkpoint.update(collection, documents=documents, done=True)
+    logger.info(f"Exported {collection}: {stats.to_dict()}")
+    return stats
+
+def _chunks(lines: Iterator[str], size: int) -> Iterator[List[str]]:
+    while True:
+        chunk = list(itertools.islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+def import_collection(
+    db: Any,
+    collection: str,
+    path: str,
+    checkpoint: Checkpoint,
+    batch_size: int = BATCH_LIMIT,
+    workers: int = 8,
+    max_attempts: int = 3,
+    report_every: float = 10.0,
+    sleep: Callable[[float], None] = time.sleep
+) -> TransferStats:
+    """
+    gzip 圧縮した NDJSON をコレクションに書き込む (同じIDのドキュメントは上書きする)
+
+    batch_size 件ずつのバッチを workers 個まで並行に書き込み、読み込みは書き込みが追いつくまで待つ (メモリは一定)
+    先頭から連続して書き込み終えた行数をチェックポイントに記録し、再開時はその行数を読み飛ばす
+    記事数のカウンタ・最新記事フィードは更新しないため、記事を取り込んだ後は reconcile_stats.py --feeds を実行する
+
+    Args:
+        db (Any): Firestoreクライアント
+        collection (str): コレクション名
+        path (str): 読み込むファイル (.ndjson.gz)
+        checkpoint (Checkpoint): 進捗の保存先
+        batch_size (int): 1回のバッチ書き込みの件数 (最大500)
+        workers (int): 並行して書き込むバッチ数
+        max_attempts (int): 一時的なエラーで失敗したバッチを書き込む最大回数
+        report_every (float): スループットをログに出す間隔 (秒)
+
+    Returns:
+        TransferStats: 件数とスループット
+    """
+    batch_size = min(batch_size, BATCH_LIMIT)
+    state = checkpoint.get(collection)
+    stats = TransferStats(collection, documents=state.get('documents', 0), resumed_from=state.get('documents', 0))
+    if state.get('done'):
+        logger.info(f"Import of {collection} already completed ({stats.documents} documents); skipping")
+        return stats
+
+    collection_ref = db.collection(collection)
+
+    def write(lines: List[str]):
+        for attempt in range(1, max_attempts + 1):
+            batch = db.batch()
+            for line in lines:
+                doc_id, data = decode_document(line)
+                batch.set(collection_ref.document(doc_id), data)
+            try:
+                batch.commit()
+                return
+            except RETRYABLE_ERRORS as e:
+                if attempt == max_attempts:
+                    raise
+                logger.warning(f"Retrying batch write to {collection} ({attempt}/{max_attempts}): {str(e)}")
+                sleep(min(2 ** attempt * 0.5, 30.0))
+
+    progress = _Progress(stats, 'Imported', report_every)
+    documents = stats.documents
+    pending: Deque[Tuple[int, Future]] = collections.deque()
+
+    def complete_oldest():
+        nonlocal documents
+        count, future = pending.popleft()
+        future.result()
+        documents += count
+        checkpoint.update(collection, documents=documents)
+        progress.update(documents, raw.tell())
+
+    with open(path, 'rb') as raw, gzip.GzipFile(fileobj=raw, mode='rb') as member, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        lines = (line.decode('utf-8') for line in member if line.strip())
+        try:
+            for chunk in _chunks(itertools.islice(lines, documents, None), batch_size):
+                pending.append((len(chunk), executor.submit(write, chunk)))
+                # 先に出したバッチから順に完了を待ち、チェックポイントは連続して書けた所までにする
+                if len(pending) >= workers * 2:
+                    complete_oldest()
+            while pending:
+                complete_oldest()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    checkpoint.update(collection, documents=documents, done=True)
+    logger.info(f"Imported {collection}: {stats.to_dict()}")
+    return stats
@@ -0,0 +1,375 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+import json
+import logging
+import os
+import sqlite3
+import threading
+from .keys import article_doc_id
+from .models import Article, ScrapingResult
+
+logger = logging.getLogger(__name__)
+
+# 1つのSQLに渡す値の数 (SQLITE_MAX_VARIABLE_NUMBER より十分小さくする)
+IN_CHUNK_SIZE = 500
+
+ARTICLE_COLUMNS = (
+    'id', 'company_id', 'title', 'url', 'published_at', 'content', 'image_url',
+    'source', 'status', 'created_at', 'updated_at'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    company_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    published_at TEXT NOT NULL,
+    content TEXT,
+    image_url TEXT,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'active',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_url_unique ON articles (url);
+CREATE INDEX IF NOT EXISTS idx_articles_status_published ON articles (status, published_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_company_published ON articles (company_id, status, published_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source);
+
+CREATE TABLE IF NOT EXISTS companies (
+    company_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS crawl_state (
+    company_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    published_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (company_id, source)
+);
+
+CREATE TABLE IF NOT EXISTS scraping_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+def _to_text(value: Optional[datetime]) -> Optional[str]:
+    """
+    日時を辞書順で比較できる文字列にする (tz付きはUTCのnaiveに揃える)
+    """
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+def _from_text(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+def _chunks(values: Sequence[Any], size: int = IN_CHUNK_SIZE) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+class SQLiteBackend:
+    """
+    SQLiteによる保存先 (StorageBackend の実装)
+
+    GCPに接続せずに収集処理を動かす・大量データで計測する・Firestoreの手前のローカル層とする用途
+    WALモードで、読み取りは書き込み中もブロックされない
+    記事の保存は1トランザクションで既存のID・URLを調べてから executemany でまとめて挿入する
+    (Firestoreと同じく、IDが異なってもURLが同じ記事は重複として扱う)
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # 収集処理は asyncio.to_thread から呼ぶため、接続はスレッド間で共有してLockで直列化する
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('PRAGMA busy_timeout=5000')
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _now(self) -> str:
+        return _to_text(datetime.now(timezone.utc))
+
+    # --------------------------------------------------------------------
+    # 記事 (articles)
+    # --------------------------------------------------------------------
+
+    def save_articles(self, articles: List[Dict[str, Any]], company_id: str) -> List[str]:
+        """
+        新規記事を保存する (既に存在する記事は保存しない)
+
+        Returns:
+            List[str]: 新規に保存された記事のURLリスト
+        """
+        return self.insert_articles([{**article, 'company_id': company_id} for article in articles])
+
+    def insert_articles(
+        self,
+        articles: List[Dict[str, Any]],
+        on_failure: Optional[Callable[[Dict[str, Any], Any], None]] = None
+    ) -> List[str]:
+        """
+        複数企業の記事をまとめて保存する (存在しない場合のみ作成)
+        失敗した場合はトランザクションを戻し、全ての記事を on_failure に通知する
+
+        Returns:
+            List[str]: 新規に保存された記事のURLリスト
+        """
+        unique: Dict[str, Dict[str, Any]] = {}
+        for article in articles:
+            unique.setdefault(article_doc_id(article['url']), article)
+        if not unique:
+            return []
+
+        now = self._now()
+        with self._lock:
+            try:
+                self._conn.execute('BEGIN IMMEDIATE')
+                existing_ids: Set[str] = set()
+                for chunk in _chunks(list(unique)):
+                    rows = self._conn.execute(
+                        f"SELECT id FROM articles WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                    )
+                    existing_ids.update(row['id'] for row in rows)
+                existing_urls = self.find_existing_urls(article['url'] for article in unique.values())
+                new = [
+                    (doc_id, article) for doc_id, article in unique.items()
+                    if doc_id not in existing_ids and article['url'] not in existing_urls
+                ]
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO articles '
+                    '(id, company_id, title, url, published_at, content, image_url, source, status, created_at, updated_at) '
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'active', ?, ?)",
+                    [
+                        (doc_id, article['company_id'], article['title'], article['url'],
+                         _to_text(article['published_at']), article.get('content'), article.get('image_url'),
+                         article['source'], now, now)
+                        for doc_id, article in new
+                    ]
+                )
+                self._conn.execute('COMMIT')
+            except Exception as e:
+                # BEGIN 自体が失敗した場合は戻すトランザクションが無い
+                if self._conn.in_transaction:
+                    self._conn.execute('ROLLBACK')
+                logger.error(f"Error inserting {len(unique)} articles into SQLite: {str(e)}")
+                if on_failure is None:
+                    raise
+                for article in unique.values():
+                    on_failure(article, e)
+                return []
+        return [article['url'] for _, article in new]
+
+    def find_existing_urls(self, urls: Iterable[str]) -> Set[str]:
+        urls = list(dict.fromkeys(urls))
+        existing: Set[str] = set()
+        with self._lock:
+            for chunk in _chunks(urls):
+                rows = self._conn.execute(
+                    f"SELECT url FROM articles WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                )
+                existing.update(row['url'] for row in rows)
+        return existing
+
+    def _article(self, row: sqlite3.Row) -> Article:
+        return Article(
+            row['id'], row['company_id'], row['title'], row['url'], _from_text(row['published_at']),
+            row['content'], row['image_url'], row['source'], _from_text(row['created_at']), _from_text(row['updated_at'])
+        )
+
+    def _recent_where(self, company_id: Optional[str], since: datetime):
+        clauses = ["status = 'active'", 'published_at >= ?']
+        params: List[Any] = [_to_text(since)]
+        if company_id:
+            clauses.append('company_id = ?')
+            params.append(company_id)
+        return ' AND '.join(clauses), params
+
+    def get_recent_articles(
+        self,
+        company_id: Optional[str] = None,
+        days: int = 7,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> List[Article]:
+        where, params = self._recent_where(company_id, datetime.now() - timedelta(days=days))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM articles WHERE {where} ORDER BY published_at DESC, id DESC LIMIT ?", [*params, limit]
+            ).fetchall()
+        return [self._article(row) for row in rows]
+
+    def iter_recent_articles(
+        self,
+        company_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        page_size: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[Article]:
+        """
+        指定日時以降の記事を新しい順に page_size 件ずつ読んで返す (直前のページの最後の記事より後から読む)
+        """
+        where, params = self._recent_where(company_id, since or datetime.now() - timedelta(days=7))
+        cursor: Optional[tuple] = None
+        while True:
+            sql, page_params = where, list(params)
+            if cursor is not None:
+                sql += ' AND (published_at, id) < (?, ?)'
+                page_params.extend(cursor)
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT * FROM articles WHERE {sql} ORDER BY published_at DESC, id DESC LIMIT ?",
+                    [*page_params, page_size]
+                ).fetchall()
+            for row in rows:
+                yield self._article(row)
+            if len(rows) < page_size:
+                return
+            cursor = (rows[-1]['published_at'], rows[-1]['id'])
+
+    def count_recent_articles(self, company_id: Optional[str] = None, since: Optional[datetime] = None) -> int:
+        where, params = self._recent_where(company_id, since or datetime.now() - timedelta(days=7))
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM articles WHERE {where}", params).fetchone()[0]
+
+    def update_article_status(self, article_id: str, status: str):
+        self.update_articles_status([article_id], status)
+
+    def update_articles_status(self, article_ids: Iterable[str], status: str) -> List[str]:
+        article_ids = list(dict.fromkeys(article_ids))
+        now = self._now()
+        updated: List[str] = []
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                for chunk in _chunks(article_ids):
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = self._conn.execute(f"SELECT id FROM articles WHERE id IN ({placeholders})", chunk)
+                    updated.extend(row['id'] for row in rows)
+                    self._conn.execute(
+                        f"UPDATE articles SET status = ?, updated_at = ? WHERE id IN ({placeholders})",
+                        [status, now, *chunk]
+                    )
+                self._conn.execute('COMMIT')
+            except Exception:
+                if self._conn.in_transaction:
+                    self._conn.execute('ROLLBACK')
+                raise
+        found = set(updated)
+        return [article_id for article_id in article_ids if article_id in found]
+
+    # --------------------------------------------------------------------
+    # 統計情報 (stats)
+    # --------------------------------------------------------------------
+
+    def get_total_articles_count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+    def _count_by(self, column: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {column} AS value, COUNT(*) AS count FROM articles GROUP BY {column}")
+            return {row['value']: row['count'] for row in rows}
+
+    def get_articles_count_by_company(self) -> Dict[str, int]:
+        return self._count_by('company_id')
+
+    def get_articles_count_by_source(self) -> Dict[str, int]:
+        return self._count_by('source')
+
+    def get_latest_articles(self, limit: int = 5, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT * FROM articles ORDER BY published_at DESC, id DESC LIMIT ?', [limit]
+            ).fetchall()
+        results = []
+        for row in rows:
+            data = self._article(row).to_dict()
+            data['status'] = row['status']
+            if fields:
+                data = {'id': data['id'], **{field: data.get(field) for field in fields}}
+            results.append(data)
+        return results
+
+    def stats_need_reconcile(self) -> bool:
+        """
+        件数は記事から直接数えるため、数え直しが必要になることはない
+        """
+        return False
+
+    # --------------------------------------------------------------------
+    # 企業 (companies)
+    # --------------------------------------------------------------------
+
+    def get_company_info(self, company_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM companies WHERE company_id = ?', [company_id]).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def get_company_names(self, company_ids: Iterable[str]) -> Dict[str, str]:
+        company_ids = list(dict.fromkeys(company_ids))
+        names: Dict[str, str] = {}
+        with self._lock:
+            for chunk in _chunks(company_ids):
+                rows = self._conn.execute(
+                    f"SELECT company_id, data FROM companies WHERE company_id IN ({','.join('?' * len(chunk))})", chunk
+                )
+                names.update((row['company_id'], json.loads(row['data']).get('name', 'NoName')) for row in rows)
+        return names
+
+    def save_company_info(self, company_data: Dict[str, Any]):
+        """
+        企業情報を保存・更新 (既存の項目にマージする)
+        """
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO companies (company_id, data, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(company_id) DO UPDATE SET data = json_patch(data, excluded.data), updated_at = excluded.updated_at',
+                [company_data['company_id'], json.dumps(company_data, ensure_ascii=False, default=str), self._now()]
+            )
+
+    # --------------------------------------------------------------------
+    # クロール状態 (crawl_state)・スクレイピング結果 (scraping_results)
+    # --------------------------------------------------------------------
+
+    def get_watermark(self, company_id: str, source: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, published_at FROM crawl_state WHERE company_id = ? AND source = ?', [company_id, source]
+            ).fetchone()
+        return {'url': row['url'], 'published_at': _from_text(row['published_at'])} if row else None
+
+    def update_watermark(self, company_id: str, source: str, url: str, published_at: datetime):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO crawl_state (company_id, source, url, published_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [company_id, source, url, _to_text(published_at), self._now()]
+            )
+
+    def save_scraping_result(self, result: ScrapingResult):
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO scraping_results (company_id, source, data, created_at) VALUES (?, ?, ?, ?)',
+                [result.company_id, result.source, json.dumps(result.to_dict(), default=str), self._now()]
+            )
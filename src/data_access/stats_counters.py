@@ -0,0 +1,167 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Tuple
+from urllib.parse import quote
+import logging
+import random
+from firebase_admin import firestore
+
+logger = logging.getLogger(__name__)
+
+# 1回のバッチ書き込みに含められる操作数の上限
+BATCH_LIMIT = 500
+
+CounterKey = Tuple[str, str]
+
+def article_counter_keys(article: Dict[str, Any]) -> Iterable[CounterKey]:
+    """
+    記事が数えられる集計キー (軸, 値) の一覧
+    total は全記事数で、値は常に "all"
+    """
+    yield ('total', 'all')
+    if article.get('company_id'):
+        yield ('company', article['company_id'])
+    if article.get('source'):
+        yield ('source', article['source'])
+    published_at = article.get('published_at')
+    if isinstance(published_at, datetime):
+        yield ('day', published_at.strftime('%Y-%m-%d'))
+    yield ('status', article.get('status') or 'active')
+
+def count_articles(articles: Iterable[Dict[str, Any]]) -> Counter:
+    """
+    記事の一覧から集計キーごとの件数を数える
+    """
+    counts: Counter = Counter()
+    for article in articles:
+        counts.update(article_counter_keys(article))
+    return counts
+
+def status_change_deltas(old_status: str, new_status: str) -> Dict[CounterKey, int]:
+    """
+    記事のステータス変更によるカウンタの差分
+    """
+    old_status = old_status or 'active'
+    if old_status == new_status:
+        return {}
+    return {('status', old_status): -1, ('status', new_status): 1}
+
+class StatsCounters:
+    """
+    記事数の分散カウンタ (企業・ソース・公開日・ステータスごと)
+
+    1つのキーを shards 個のドキュメントに分け、加算はランダムに選んだシャードに Increment で行う
+    (1ドキュメントあたり毎秒1回程度という書き込み上限を避けるため)
+    読み取りは軸ごとに1クエリで、件数は キーの数 × シャード数 のドキュメント読み取りになる
+    """
+
+    def __init__(self, db: Any, collection: str = 'article_stats', shards: int = 10):
+        if shards < 1:
+            raise ValueError(f"shards must be positive: {shards}")
+        self.db = db
+        self.collection = collection
+        self.shards = shards
+
+    def _shard_ref(self, key: CounterKey, shard: int):
+        dimension, value = key
+        doc_id = f"{dimension}:{quote(value, safe='')}:{shard}"
+        return self.db.collection(self.collection).document(doc_id)
+
+    def add_increments(self, batch: Any, deltas: Dict[CounterKey, int]) -> int:
+        """
+        既存のバッチ (またはトランザクション) にカウンタの加算を追加する
+        記事の書き込みと同じバッチに含めると、記事とカウンタが同時に反映される
+
+        Returns:
+            int: 追加した操作数
+        """
+        ops = 0
+        for (dimension, value), delta in deltas.items():
+            if not delta:
+                continue
+            shard = random.randrange(self.shards)
+            batch.set(self._shard_ref((dimension, value), shard), {
+                'dimension': dimension,
+                'value': value,
+                'shard': shard,
+                'count': firestore.Increment(delta)
+            }, merge=True)
+            ops += 1
+        return ops
+
+    def increment(self, deltas: Dict[CounterKey, int]):
+        """
+        カウンタを加算する (500件ごとのバッチで原子的に書き込む)
+        """
+        items = [(key, delta) for key, delta in deltas.items() if delta]
+        for start in range(0, len(items), BATCH_LIMIT):
+            batch = self.db.batch()
+            self.add_increments(batch, dict(items[start:start + BATCH_LIMIT]))
+            batch.commit()
+
+    def get_counts(self, dimension: str) -> Dict[str, int]:
+        """
+        軸ごとの件数を取得 (シャードを合算する)
+
+        Args:
+            dimension (str): company / source / day / status / total
+
+        Returns:
+            Dict[str, int]: {値: 件数}
+        """
+        counts: Dict[str, int] = {}
+        docs = self.db.collection(self.collection).where('dimension', '==', dimension).stream()
+        for doc in docs:
+            data = doc.to_dict()
+            counts[data['value']] = counts.get(data['value'], 0) + data.get('count', 0)
+        return counts
+
+    def get_total(self) -> int:
+        return self.get_counts('total').get('all', 0)
+
+    def rebuild(self, articles: Iterable[Dict[str, Any]], dry_run: bool = False) -> Dict[CounterKey, int]:
+        """
+        記事を全件数え直し、カウンタを置き換える (リコンサイル用)
+        数え直しの間に保存された記事の分はずれる可能性があるため、書き込みの少ない時間帯に実行する
+
+        Args:
+            articles (Iterable[Dict[str, Any]]): 全記事 (company_id, source, published_at, status を含む)
+            dry_run (bool): Trueの場合は現在のカウンタとの差分を返すだけで書き込まない
+
+        Returns:
+            Dict[CounterKey, int]: 現在のカウンタとの差分 (正しい件数 - カウンタの値)
+        """
+        expected = count_articles(articles)
+        current: Dict[CounterKey, int] = {}
+        shard_refs = []
+        for doc in self.db.collection(self.collection).stream():
+            data = doc.to_dict()
+            key = (data['dimension'], data['value'])
+            current[key] = current.get(key, 0) + data.get('count', 0)
+            shard_refs.append(doc.reference)
+
+        drift = {
+            key: expected.get(key, 0) - current.get(key, 0)
+            for key in set(expected) | set(current)
+            if expected.get(key, 0) != current.get(key, 0)
+        }
+        if dry_run:
+            return drift
+
+        # 正しい件数をシャード0に書いてから、それ以外のシャードを消す
+        targets = {key: self._shard_ref(key, 0) for key in expected}
+        target_paths = {ref.path for ref in targets.values()}
+        writes = [('set', targets[key], {
+            'dimension': key[0], 'value': key[1], 'shard': 0, 'count': count
+        }) for key, count in expected.items()]
+        writes += [('delete', ref, None) for ref in shard_refs if ref.path not in target_paths]
+        for start in range(0, len(writes), BATCH_LIMIT):
+            batch = self.db.batch()
+            for op, ref, data in writes[start:start + BATCH_LIMIT]:
+                if op == 'delete':
+                    batch.delete(ref)
+                else:
+                    batch.set(ref, data)
+            batch.commit()
+        logger.info(f"Rebuilt {len(expected)} stats counters ({len(drift)} had drifted)")
+        return drift
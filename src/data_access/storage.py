@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Set, runtime_checkable
+import os
+from .models import Article, ScrapingResult
+
+BACKEND_FIRESTORE = 'firestore'
+BACKEND_SQLITE = 'sqlite'
+
+@runtime_checkable
+class StorageBackend(Protocol):
+    """
+    記事・企業情報・クロール状態・スクレイピング結果の保存先
+
+    FirestoreClient と SQLiteBackend が実装する
+    収集処理・/stats・Slackの一覧表示はこのメソッドのみを使い、保存先を差し替えられる
+    """
+
+    # 記事
+    def save_articles(self, articles: List[Dict[str, Any]], company_id: str) -> List[str]: ...
+
+    def insert_articles(
+        self,
+        articles: List[Dict[str, Any]],
+        on_failure: Optional[Callable[[Dict[str, Any], Any], None]] = None
+    ) -> List[str]: ...
+
+    def find_existing_urls(self, urls: Iterable[str]) -> Set[str]: ...
+
+    def get_recent_articles(
+        self,
+        company_id: Optional[str] = None,
+        days: int = 7,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> List[Article]: ...
+
+    def iter_recent_articles(
+        self,
+        company_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        page_size: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[Article]: ...
+
+    def count_recent_articles(self, company_id: Optional[str] = None, since: Optional[datetime] = None) -> int: ...
+
+    def update_article_status(self, article_id: str, status: str): ...
+
+    def update_articles_status(self, article_ids: Iterable[str], status: str) -> List[str]: ...
+
+    # 統計
+    def get_total_articles_count(self) -> int: ...
+
+    def get_articles_count_by_company(self) -> Dict[str, int]: ...
+
+    def get_articles_count_by_source(self) -> Dict[str, int]: ...
+
+    def get_latest_articles(self, limit: int = 5, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]: ...
+
+    def stats_need_reconcile(self) -> bool: ...
+
+    # 企業情報
+    def get_company_info(self, company_id: str) -> Optional[Dict[str, Any]]: ...
+
+    def get_company_names(self, company_ids: Iterable[str]) -> Dict[str, str]: ...
+
+    def save_company_info(self, company_data: Dict[str, Any]): ...
+
+    # クロール状態・スクレイピング結果
+    def get_watermark(self, company_id: str, source: str) -> Optional[Dict[str, Any]]: ...
+
+    def update_watermark(self, company_id: str, source: str, url: str, published_at: datetime): ...
+
+    def save_scraping_result(self, result: ScrapingResult): ...
+
+def create_storage_backend(kind: Optional[str] = None) -> StorageBackend:
+    """
+    保存先を生成する
+
+    Args:
+        kind (str): firestore / sqlite (省略時は環境変数 STORAGE_BACKEND、未設定なら firestore)
+            sqlite の場合、ファイルは環境変数 SQLITE_PATH (未設定なら ./news.sqlite3)
+    """
+    kind = (kind or os.getenv('STORAGE_BACKEND') or BACKEND_FIRESTORE).lower()
+    if kind == BACKEND_SQLITE:
+        from .sqlite_backend import SQLiteBackend
+        return SQLiteBackend(os.getenv('SQLITE_PATH', 'news.sqlite3'))
+    if kind == BACKEND_FIRESTORE:
+        # firebase_admin はSQLiteのみで動かす場合に不要なため、使う時に読み込む
+        from .firestore_client import FirestoreClient
+        return FirestoreClient()
+    raise ValueError(f"Unknown storage backend: {kind}")
@@ -0,0 +1,198 @@
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+import fcntl
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from .keys import article_doc_id
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILTER_PATH = os.path.join(
+    os.getenv('SCRAPER_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'slack-news-aggregator')),
+    'seen_urls.bloom'
+)
+
+# magic, ビット数, ハッシュ関数の数, 追加した件数
+MAGIC = b'SEENURL1'
+HEADER = struct.Struct('<8sQQQ')
+
+def optimal_params(capacity: int, false_positive_rate: float) -> Tuple[int, int]:
+    """
+    想定件数と偽陽性率から、ビット数とハッシュ関数の数を求める
+    """
+    bits = math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+class SeenUrlFilter:
+    """
+    保存済み記事URLのBloomフィルタ (メモリマップしたファイルに保持)
+
+    「確実に未保存」であればFirestoreを読まずに判定できる
+    「保存済みかもしれない」場合のみ呼び出し側でFirestoreを確認する
+    ファイルはgunicornの複数ワーカーで共有し、作り直し・書き込みは .lock ファイルのflockで排他する
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: int = 1_000_000,
+        false_positive_rate: float = 0.001
+    ):
+        if not 0 < false_positive_rate < 1:
+            raise ValueError(f"false_positive_rate must be between 0 and 1: {false_positive_rate}")
+        self.path = path or DEFAULT_FILTER_PATH
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.bits, self.hashes = optimal_params(capacity, false_positive_rate)
+        self._lock = threading.Lock()
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._saturation_warned = False
+
+    @property
+    def size_bytes(self) -> int:
+        return HEADER.size + (self.bits + 7) // 8
+
+    @property
+    def count(self) -> int:
+        """追加した件数 (重複を含む)"""
+        return HEADER.unpack_from(self._mmap, 0)[3] if self._mmap is not None else 0
+
+    def open(self, populate: Optional[Callable[[], Iterable[str]]] = None) -> bool:
+        """
+        フィルタファイルを開く
+        ファイルが無い、またはパラメータが設定と異なる場合は populate のURLで作り直す
+        作り直すのは1プロセスのみで、他のワーカーは完了を待ってから開く
+
+        Returns:
+            bool: 作り直した場合はTrue
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._file_lock():
+            rebuilt = not self._matches_file()
+            if rebuilt:
+                self._rebuild(populate)
+            with self._lock:
+                self._map()
+        return rebuilt
+
+    def close(self):
+        with self._lock:
+            self._unmap()
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """
+        ワーカープロセス間の排他 (作り直しと追加で同じ .lock ファイルを使う)
+        データファイル自体は作り直しで置き換わるため、flockの対象にしない
+        """
+        with open(self.path + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _unmap(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _matches_file(self) -> bool:
+        try:
+            with open(self.path, 'rb') as f:
+                header = f.read(HEADER.size)
+            if len(header) < HEADER.size or os.path.getsize(self.path) != self.size_bytes:
+                return False
+        except OSError:
+            return False
+        magic, bits, hashes, _ = HEADER.unpack(header)
+        return magic == MAGIC and bits == self.bits and hashes == self.hashes
+
+    def _rebuild(self, populate: Optional[Callable[[], Iterable[str]]]):
+        logger.info(f"Building seen-URL filter at {self.path} (capacity={self.capacity}, fp={self.false_positive_rate})")
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'r+b') as f:
+            f.truncate(self.size_bytes)
+            f.write(HEADER.pack(MAGIC, self.bits, self.hashes, 0))
+            f.flush()
+            with mmap.mmap(f.fileno(), self.size_bytes) as mm:
+                count = 0
+                for url in (populate() if populate else []):
+                    self._set_bits(mm, url)
+                    count += 1
+                HEADER.pack_into(mm, 0, MAGIC, self.bits, self.hashes, count)
+                mm.flush()
+        os.replace(tmp_path, self.path)
+        logger.info(f"Seen-URL filter built with {count} URLs")
+
+    def _map(self):
+        self._unmap()
+        self._file = open(self.path, 'r+b')
+        self._mmap = mmap.mmap(self._file.fileno(), self.size_bytes)
+
+    def _replaced(self) -> bool:
+        """
+        開いた後に他のワーカーがファイルを作り直したか
+        """
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except OSError:
+            return False
+
+    def _positions(self, url: str) -> Iterator[int]:
+        """
+        正規化URLのハッシュ (ドキュメントIDと同じ値) から二重ハッシュ法でビット位置を求める
+        """
+        digest = article_doc_id(url)
+        h1, h2 = int(digest[:16], 16), int(digest[16:32], 16) | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def _set_bits(self, mm: mmap.mmap, url: str):
+        for pos in self._positions(url):
+            index = HEADER.size + (pos >> 3)
+            mm[index] |= 1 << (pos & 7)
+
+    def might_contain(self, url: str) -> bool:
+        """
+        保存済みの可能性があればTrue (Falseなら確実に未保存)
+        """
+        if self._mmap is None:
+            raise RuntimeError("SeenUrlFilter is not open")
+        mm = self._mmap
+        return all(mm[HEADER.size + (pos >> 3)] & (1 << (pos & 7)) for pos in self._positions(url))
+
+    def add_many(self, urls: Iterable[str]):
+        """
+        保存済みのURLを追加する
+        """
+        urls = list(urls)
+        if not urls:
+            return
+        if self._mmap is None:
+            raise RuntimeError("SeenUrlFilter is not open")
+        # 同一プロセス内のスレッドはLockで、他のワーカープロセスとはflockで排他する
+        with self._lock, self._file_lock():
+            # 置き換え前のファイルに書き込んでも他のワーカーからは見えないため開き直す
+            if self._replaced() and self._matches_file():
+                self._map()
+            for url in urls:
+                self._set_bits(self._mmap, url)
+            count = HEADER.unpack_from(self._mmap, 0)[3] + len(urls)
+            HEADER.pack_into(self._mmap, 0, MAGIC, self.bits, self.hashes, count)
+        if count > self.capacity and not self._saturation_warned:
+            self._saturation_warned = True
+            logger.warning(
+                f"Seen-URL filter holds {count} URLs over its capacity {self.capacity}; "
+                f"false positives will increase until capacity is raised"
+            )
+
+    def add(self, url: str):
+        self.add_many([url])
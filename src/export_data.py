@@ -0,0 +1,51 @@
+"""
+記事 (articles)・企業 (companies) のコレクションを gzip 圧縮した NDJSON に書き出す
+コレクションごとに {出力先}/{コレクション名}.ndjson.gz を作る (1行1ドキュメント: {"id": ..., "data": {...}})
+
+ドキュメントIDの順にカーソルで読み進めるため、件数によらずメモリは一定
+進捗は {出力先}/export_checkpoint.json に記録し、中断しても同じコマンドで続きから再開できる
+
+    python export_data.py --output ./dump
+    python export_data.py --output ./dump --collections articles --page-size 1000
+    python export_data.py --output ./dump --restart     # チェックポイントを無視して最初から
+"""
+import argparse
+import logging
+import os
+
+from data_access.firestore_client import FirestoreClient
+from data_access.ndjson_transfer import Checkpoint, export_collection
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = ['articles', 'companies']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', required=True, help='出力先のディレクトリ')
+    parser.add_argument('--collections', nargs='+', choices=COLLECTIONS, default=COLLECTIONS)
+    parser.add_argument('--page-size', type=int, default=500, help='1回のクエリで読む件数')
+    parser.add_argument('--report-every', type=float, default=10.0, help='スループットをログに出す間隔 (秒)')
+    parser.add_argument('--restart', action='store_true', help='チェックポイントを無視して最初から書き出す')
+    args = parser.parse_args()
+
+    client = FirestoreClient()
+    checkpoint_path = os.path.join(args.output, 'export_checkpoint.json')
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = Checkpoint(checkpoint_path)
+
+    for name in args.collections:
+        collection = client.config['collections'][name]['name']
+        stats = export_collection(
+            client.db, collection, os.path.join(args.output, f"{collection}.ndjson.gz"), checkpoint,
+            page_size=args.page_size, report_every=args.report_every
+        )
+        logger.info(f"Throughput: {stats.to_dict()}")
+
+if __name__ == '__main__':
+    main()
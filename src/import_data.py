@@ -0,0 +1,59 @@
+"""
+export_data.py で書き出した gzip 圧縮の NDJSON をコレクションに書き込む (同じIDのドキュメントは上書き)
+環境の初期データ投入・別プロジェクトへの移行に使う
+
+バッチ書き込み (最大500件) を並行に実行し、進捗は {入力元}/import_checkpoint.json に記録する
+中断しても同じコマンドで続きから再開できる
+記事数のカウンタ・最新記事フィードは更新しないため、記事を取り込んだ後に reconcile_stats.py --feeds を実行する
+
+    python import_data.py --input ./dump
+    python import_data.py --input ./dump --collections companies --workers 16
+    python import_data.py --input ./dump --restart      # チェックポイントを無視して最初から
+"""
+import argparse
+import logging
+import os
+
+from data_access.firestore_client import FirestoreClient
+from data_access.ndjson_transfer import BATCH_LIMIT, Checkpoint, import_collection
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 企業を先に取り込む
+COLLECTIONS = ['companies', 'articles']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', required=True, help='export_data.py の出力先のディレクトリ')
+    parser.add_argument('--collections', nargs='+', choices=COLLECTIONS, default=COLLECTIONS)
+    parser.add_argument('--batch-size', type=int, default=BATCH_LIMIT, help='1回のバッチ書き込みの件数 (最大500)')
+    parser.add_argument('--workers', type=int, default=8, help='並行して書き込むバッチ数')
+    parser.add_argument('--report-every', type=float, default=10.0, help='スループットをログに出す間隔 (秒)')
+    parser.add_argument('--restart', action='store_true', help='チェックポイントを無視して最初から書き込む')
+    args = parser.parse_args()
+
+    client = FirestoreClient()
+    checkpoint_path = os.path.join(args.input, 'import_checkpoint.json')
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = Checkpoint(checkpoint_path)
+
+    for name in args.collections:
+        collection = client.config['collections'][name]['name']
+        stats = import_collection(
+            client.db, collection, os.path.join(args.input, f"{collection}.ndjson.gz"), checkpoint,
+            batch_size=args.batch_size, workers=args.workers,
+            max_attempts=client.config.get('batch', {}).get('max_retry', 3),
+            report_every=args.report_every
+        )
+        logger.info(f"Throughput: {stats.to_dict()}")
+
+    if 'articles' in args.collections:
+        logger.info("Run reconcile_stats.py --feeds to rebuild article counters and latest feeds")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+既存の記事ドキュメント (自動ID) を、正規化URLのハッシュによる決定的なIDへ付け替える
+
+同じURLの記事が複数ある場合は1件 (既に決定的IDのもの、無ければ最も古いもの) だけを残す
+コピーを全て書き込んでから元のドキュメントを削除するため、途中で止まっても記事は失われない
+
+    python migrate_article_ids.py --dry-run
+    python migrate_article_ids.py
+"""
+import argparse
+import logging
+from typing import Any, Dict, Iterable, List, Tuple
+
+from data_access.firestore_client import FirestoreClient
+from data_access.keys import article_doc_id
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def plan_rekey(
+    docs: Iterable[Tuple[str, Dict[str, Any]]]
+) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[str, str]]]:
+    """
+    (ドキュメントID, データ) の一覧から、作成するドキュメントと削除するドキュメントを決める
+
+    Returns:
+        Tuple[Dict[str, Dict[str, Any]], List[Tuple[str, str]]]: ({新ID: データ}, [(削除する旧ID, 新ID)])
+    """
+    groups: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+    for doc_id, data in docs:
+        if not data.get('url'):
+            logger.warning(f"Skipping article without url: {doc_id}")
+            continue
+        groups.setdefault(article_doc_id(data['url']), []).append((doc_id, data))
+
+    copies: Dict[str, Dict[str, Any]] = {}
+    deletes: List[Tuple[str, str]] = []
+    for target_id, members in groups.items():
+        if not any(doc_id == target_id for doc_id, _ in members):
+            oldest = min(members, key=lambda m: (m[1].get('created_at') is None, m[1].get('created_at') or 0))
+            copies[target_id] = oldest[1]
+        deletes.extend((doc_id, target_id) for doc_id, _ in members if doc_id != target_id)
+    return copies, deletes
+
+def apply_rekey(client: FirestoreClient, copies: Dict[str, Dict[str, Any]], deletes: List[Tuple[str, str]]):
+    """
+    コピーを全て書き込んでから旧ドキュメントを削除する
+    コピーに失敗した記事の旧ドキュメントは削除しない
+    """
+    collection = client.db.collection(client.config['collections']['articles']['name'])
+    with client.bulk_writer() as writer:
+        for target_id, data in copies.items():
+            writer.set(collection.document(target_id), data)
+        writer.flush()
+        copied = writer.stats.succeeded
+        logger.info(f"Copied {copied}/{len(copies)} articles")
+
+        failed_targets = {collection.document(target_id).path for target_id in copies} - writer.stats.succeeded_paths
+        skipped = 0
+        for doc_id, target_id in deletes:
+            if collection.document(target_id).path in failed_targets:
+                skipped += 1
+                continue
+            writer.delete(collection.document(doc_id))
+    logger.info(f"Deleted {writer.stats.succeeded - copied}/{len(deletes)} old documents ({skipped} skipped)")
+    if writer.stats.errors:
+        logger.error(f"{len(writer.stats.errors)} writes failed; rerun the migration to retry them")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='件数を表示するだけで書き込まない')
+    args = parser.parse_args()
+
+    client = FirestoreClient()
+    collection = client.db.collection(client.config['collections']['articles']['name'])
+    copies, deletes = plan_rekey((doc.id, doc.to_dict()) for doc in collection.stream())
+    logger.info(f"Rekey plan: {len(copies)} documents to create, {len(deletes)} documents to delete")
+
+    if args.dry_run:
+        return
+    apply_rekey(client, copies, deletes)
+    logger.info("Article ID migration completed")
+
+if __name__ == '__main__':
+    main()
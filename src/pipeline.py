@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# バッチを受け取り、次の段に渡す要素を返すハンドラ
+StageHandler = Callable[[List[Any]], Awaitable[Optional[Iterable[Any]]]]
+
+# ハンドラが例外を送出したバッチと例外を受け取り、代わりに次の段に渡す要素を返す
+ErrorHandler = Callable[[List[Any], Exception], Optional[Iterable[Any]]]
+
+@dataclass
+class StageStats:
+    """段毎の処理件数・スループット・レイテンシ"""
+    name: str
+    workers: int
+    batch_size: int
+    items: int = 0
+    batches: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    max_latency: float = 0.0
+    max_queue: int = 0
+    first_started: Optional[float] = None
+    last_finished: Optional[float] = None
+
+    @property
+    def throughput(self) -> float:
+        """段が動いていた間の1秒あたりの処理件数"""
+        if self.first_started is None or self.last_finished is None:
+            return 0.0
+        elapsed = self.last_finished - self.first_started
+        return self.items / elapsed if elapsed > 0 else float(self.items)
+
+    @property
+    def avg_latency(self) -> float:
+        """1バッチあたりの平均処理時間(秒)"""
+        return self.busy_seconds / self.batches if self.batches else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'workers': self.workers,
+            'items': self.items,
+            'batches': self.batches,
+            'errors': self.errors,
+            'throughput': round(self.throughput, 2),
+            'avg_latency': round(self.avg_latency, 3),
+            'max_latency': round(self.max_latency, 3),
+            'max_queue': self.max_queue
+        }
+
+class Stage:
+    """
+    パイプラインの1段
+
+    workers: 並行して動くワーカー数
+    batch_size: 1回のハンドラ呼び出しでまとめる最大件数
+    batch_timeout: バッチが埋まるまで待つ最大秒数
+    queue_size: 入力キューの上限 (満杯の場合は前段が待たされる)
+    on_error: ハンドラが例外を送出した場合に、代わりに次の段に渡す要素を返す (省略時はバッチを捨てる)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: StageHandler,
+        workers: int = 1,
+        batch_size: int = 1,
+        batch_timeout: float = 0.05,
+        queue_size: int = 100,
+        on_error: Optional[ErrorHandler] = None
+    ):
+        self.name = name
+        self.handler = handler
+        self.on_error = on_error
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.queue_size = queue_size
+        self.stats = StageStats(name=name, workers=workers, batch_size=batch_size)
+
+class Pipeline:
+    """
+    上限付きキューで段を繋いだストリーミングパイプライン
+    各段は独立したワーカー数・バッチサイズで動き、キューが満杯になると前段が待つ (バックプレッシャー)
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        self._queues: List[asyncio.Queue] = []
+        self._outputs: List[Any] = []
+
+    @property
+    def stats(self) -> List[StageStats]:
+        return [stage.stats for stage in self.stages]
+
+    async def run(self, items: Iterable[Any]) -> List[Any]:
+        """
+        items を先頭の段に流し、最後の段が返した要素を返す
+        """
+        self._queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        self._outputs = []
+        workers = [
+            asyncio.create_task(self._worker(index))
+            for index, stage in enumerate(self.stages)
+            for _ in range(stage.workers)
+        ]
+        try:
+            for item in items:
+                await self._emit(0, item)
+            # 前段から順に空になるのを待つ (前段が終わればそれ以上は流れてこない)
+            for queue in self._queues:
+                await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return self._outputs
+
+    async def _emit(self, index: int, item: Any):
+        if index >= len(self.stages):
+            self._outputs.append(item)
+            return
+        queue = self._queues[index]
+        await queue.put(item)
+        stats = self.stages[index].stats
+        stats.max_queue = max(stats.max_queue, queue.qsize())
+
+    async def _next_batch(self, index: int) -> List[Any]:
+        """
+        最初の1件を待ち、batch_timeout の間に届いた分を batch_size までまとめる
+        """
+        stage, queue = self.stages[index], self._queues[index]
+        batch = [await queue.get()]
+        deadline = time.monotonic() + stage.batch_timeout
+        while len(batch) < stage.batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self, index: int):
+        stage, queue = self.stages[index], self._queues[index]
+        while True:
+            batch = await self._next_batch(index)
+            try:
+                await self._process(stage, index, batch)
+            except Exception as e:
+                # on_error や後段への受け渡しが失敗してもワーカーは止めない (止まると run が終わらない)
+                logger.error(f"Stage '{stage.name}' dropped a batch of {len(batch)}: {str(e)}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _process(self, stage: Stage, index: int, batch: List[Any]):
+        """
+        バッチをハンドラで処理し、結果を次の段に渡す
+        """
+        stats = stage.stats
+        started = time.monotonic()
+        if stats.first_started is None:
+            stats.first_started = started
+        try:
+            outputs = list(await stage.handler(batch) or [])
+        except Exception as e:
+            logger.error(f"Stage '{stage.name}' failed on a batch of {len(batch)}: {str(e)}")
+            stats.errors += len(batch)
+            outputs = list(stage.on_error(batch, e) or []) if stage.on_error else []
+        finally:
+            elapsed = time.monotonic() - started
+            stats.items += len(batch)
+            stats.batches += 1
+            stats.busy_seconds += elapsed
+            stats.max_latency = max(stats.max_latency, elapsed)
+            stats.last_finished = time.monotonic()
+
+        for output in outputs:
+            await self._emit(index + 1, output)
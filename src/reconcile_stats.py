@@ -0,0 +1,55 @@
+"""
+記事数の分散カウンタ (article_stats) を記事コレクションから数え直して置き換える
+--feeds を指定した場合は、企業ごと・全体の最新記事フィード (latest_feeds) も作り直す
+
+カウンタは記事の保存・ステータス変更に合わせて加算しているが、
+加算前にプロセスが止まった場合などにずれるため、定期的 (例: 日次) に実行する
+
+    python reconcile_stats.py --verify     # count() 集計クエリで照合するだけ (記事は読まない)
+    python reconcile_stats.py --dry-run
+    python reconcile_stats.py
+    python reconcile_stats.py --feeds
+"""
+import argparse
+import logging
+
+from data_access.firestore_client import FirestoreClient
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+COUNTED_FIELDS = ['company_id', 'source', 'published_at', 'status']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='ずれを表示するだけで書き込まない')
+    parser.add_argument('--verify', action='store_true', help='企業・ソース・全体の件数を集計クエリで照合するだけ')
+    parser.add_argument('--feeds', action='store_true', help='最新記事フィードも作り直す (初回の作成にも使う)')
+    args = parser.parse_args()
+
+    client = FirestoreClient()
+    if args.verify:
+        drift = client.verify_stats_counters()
+        for (dimension, value), delta in sorted(drift.items()):
+            logger.info(f"{dimension}={value}: {delta:+d}")
+        logger.info(f"{len(drift)} counters drifted")
+        return
+
+    collection = client.db.collection(client.config['collections']['articles']['name'])
+    # 集計に必要なフィールドのみ読む
+    articles = (doc.to_dict() for doc in collection.select(COUNTED_FIELDS).stream())
+    drift = client.stats_counters().rebuild(articles, dry_run=args.dry_run)
+
+    for (dimension, value), delta in sorted(drift.items()):
+        logger.info(f"{dimension}={value}: {delta:+d}")
+    logger.info(f"{len(drift)} counters drifted{' (dry run, nothing written)' if args.dry_run else ' and were rebuilt'}")
+
+    if args.feeds and not args.dry_run:
+        feeds = client.rebuild_latest_feeds()
+        logger.info(f"Rebuilt {len(feeds)} latest feeds")
+
+if __name__ == '__main__':
+    main()
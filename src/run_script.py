@@ -3,13 +3,21 @@ import yaml
 import logging
 from datetime import datetime
 import time
-from typing import List, Dict, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Set
 
-from data_access.firestore_client import FirestoreClient
+from data_access.storage import StorageBackend, create_storage_backend
 from data_access.models import ScrapingResult
 from scrapers.prtimes_scraper import PRTimesScraper
+from scrapers.async_fetcher import AsyncFetcher
+from scrapers.http_cache import get_default_validator_store
+from scrapers.parse_pool import ParsePool
+from scrapers.rate_limiter import Backoff, RetryBudget, get_default_rate_limiter
+from scrapers.response_cache import ResponseCache
+from scrapers.session_pool import configure_session_pool, get_connection_stats
 from slack_bot.notifications import SlackNotifier
+from pipeline import Pipeline, Stage
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,13 +25,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@dataclass
+class CompanyCrawl:
+    """パイプラインを流れる企業毎の処理状態"""
+    company: Dict[str, Any]
+    scraper: PRTimesScraper
+    articles: List[Dict[str, Any]] = field(default_factory=list)
+    new_articles: List[Dict[str, Any]] = field(default_factory=list)
+    # 前回の最高水位まで辿り着いたか (Falseの場合は最高水位を進めない)
+    complete: bool = True
+    error: Optional[Exception] = None
+    started_at: float = field(default_factory=time.time)
+
 class NewsCollector:
     """ニュース収集を制御するメインクラス"""
 
-    def __init__(self):
-        self.db = FirestoreClient()
-        self.notifier = SlackNotifier()
+    def __init__(self, db: Optional[StorageBackend] = None, notifier: Optional[SlackNotifier] = None):
+        self.db = db or create_storage_backend()
+        self.notifier = notifier or SlackNotifier()
         self.config = self._load_config()
+        self.retry_budget = self._new_retry_budget()
+        self.stage_stats: List[Dict[str, Any]] = []
+        self._saved_urls: Set[str] = set()
+        # 同期取得用の共通セッションもワーカー数に合わせたプールサイズにする
+        concurrency = self.config.get('scraping', {}).get('concurrency', {})
+        configure_session_pool(concurrency.get('global', 32))
+        self.response_cache = self._create_response_cache()
 
     def _load_config(self) -> Dict[str, Any]:
         config_path = os.path.join(os.path.dirname(__file__), 'configs/companies.yaml')
@@ -34,31 +61,17 @@ class NewsCollector:
         """メインの実行処理"""
         logger.info("Starting news collection process...")
         start_time = time.time()
-        results = []
 
         try:
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                future_to_company = {
-                    executor.submit(self._process_company, company): company
-                    for company in self.config['companies']
-                }
-
-                for future in as_completed(future_to_company):
-                    company = future_to_company[future]
-                    try:
-                        company_results = future.result()
-                        results.extend(company_results)
-                    except Exception as e:
-                        logger.error(f"Error processing company {company['name']}: {str(e)}")
-                        results.append(ScrapingResult(
-                            company_id=company['id'],
-                            source='prtimes',
-                            success=False,
-                            articles_count=0,
-                            error_message=str(e)
-                        ))
-
-            self.notifier.notify_scraping_result(results)
+            results = asyncio.run(self._collect_all())
+            self.notifier.notify_scraping_result(results, self.stage_stats)
+            if self.db.stats_need_reconcile():
+                self.notifier.notify_error(
+                    "記事数カウンタの更新に失敗しました (記事の保存は完了しています)",
+                    "reconcile_stats.py を実行してカウンタを数え直してください"
+                )
+            if self.response_cache.recording:
+                self.response_cache.evict()
 
         except Exception as e:
             logger.error(f"Critical error in news collection: {str(e)}")
@@ -68,53 +81,265 @@ class NewsCollector:
             )
             raise
         finally:
+            # 条件付きGETの検証子は実行中はメモリに溜め、実行毎に1回だけ書き込む
+            try:
+                get_default_validator_store().flush()
+            except OSError as e:
+                logger.error(f"Failed to save HTTP validators: {str(e)}")
             execution_time = time.time() - start_time
             logger.info(f"News collection process completed in {execution_time:.2f} seconds")
+            logger.info(f"Shared session connections: {get_connection_stats().to_dict()}")
+
+    async def _collect_all(self) -> List[ScrapingResult]:
+        """
+        全企業のニュースを 取得 → 重複除外 → 保存 → 通知 のパイプラインで収集する
+        """
+        companies = [c for c in self.config['companies'] if c.get('prtimes', {}).get('enabled', True)]
+        scraping_config = self.config.get('scraping', {})
+        concurrency = scraping_config.get('concurrency', {})
+        fetcher = AsyncFetcher(
+            max_concurrency=concurrency.get('global', 32),
+            per_host_limit=concurrency.get('per_host', 4),
+            timeout=scraping_config.get('timeout', 30)
+        )
+        # I/O (取得) とCPU (パース) は段を分け、それぞれのワーカー数・キュー深さで動かす
+        parse_config = scraping_config.get('parse', {})
+        parse_pool = ParsePool(
+            workers=parse_config.get('workers'),
+            queue_depth=parse_config.get('queue_depth', 64)
+        )
+        self.retry_budget = self._new_retry_budget()
+        self._saved_urls = set()
+
+        async with fetcher, parse_pool:
+            pipeline = self._build_pipeline(fetcher, parse_pool)
+            crawls = await pipeline.run(companies)
+        logger.info(f"Async fetcher connections: {fetcher.connection_stats.to_dict()}")
+
+        # パースは取得段の中でプロセスプールに投げているため、その集計を段として並べる
+        self.stage_stats = [pipeline.stats[0].to_dict(), parse_pool.stats.to_dict()]
+        self.stage_stats += [stats.to_dict() for stats in pipeline.stats[1:]]
+        for stats in self.stage_stats:
+            logger.info(f"Pipeline stage {stats['name']}: {stats}")
+
+        return [self._crawl_result(crawl) for crawl in crawls]
+
+    def _build_pipeline(self, fetcher: AsyncFetcher, parse_pool: ParsePool) -> Pipeline:
+        """
+        設定ファイル (scraping.pipeline) の段毎のワーカー数・バッチサイズでパイプラインを構築
+        バッチサイズ・キューの上限は企業単位
+        段のハンドラが例外を送出した場合は、そのバッチの企業を失敗として後段に流す
+        """
+        pipeline_config = self.config.get('scraping', {}).get('pipeline', {})
+
+        def stage(name, handler, **defaults) -> Stage:
+            return Stage(name, handler, on_error=self._stage_failed, **{**defaults, **pipeline_config.get(name, {})})
+
+        return Pipeline([
+            stage('crawl', lambda batch: self._crawl_stage(batch, fetcher, parse_pool),
+                  workers=16, queue_size=32),
+            stage('dedup', self._dedup_stage, workers=2, batch_size=20, batch_timeout=0.2, queue_size=64),
+            stage('persist', self._persist_stage, workers=2, batch_size=20, batch_timeout=0.2, queue_size=64),
+            stage('notify', self._notify_stage, workers=1, batch_size=50, batch_timeout=1.0, queue_size=64)
+        ])
+
+    async def _crawl_stage(
+        self,
+        batch: List[Dict[str, Any]],
+        fetcher: AsyncFetcher,
+        parse_pool: ParsePool
+    ) -> List[CompanyCrawl]:
+        """
+        取得段: 前回の最高水位までの一覧ページを取得する (パースはプロセスプールで実行)
+        """
+        crawls = []
+        for company in batch:
+            logger.info(f"Processing company: {company['name']}")
+            crawl = CompanyCrawl(company=company, scraper=self._create_scraper())
+            try:
+                watermark = await asyncio.to_thread(self.db.get_watermark, company['id'], 'prtimes')
+                listing = await crawl.scraper.get_news_since_async(
+                    company['prtimes']['url'], fetcher, watermark, self._max_pages(), parse_pool
+                )
+                crawl.articles, crawl.complete = listing.articles, listing.complete
+            except Exception as e:
+                self._fail(crawl, e)
+            crawls.append(crawl)
+        return crawls
+
+    async def _dedup_stage(self, batch: List[CompanyCrawl]) -> List[CompanyCrawl]:
+        """
+        重複除外段: 同一実行内で既に他の企業が保存したURLと、同じ企業の一覧内で重複したURLを除外する
+        既存記事との照合は保存段の create (存在しない場合のみ作成) で行うため読み取りは不要
+        URLは保存に成功してから登録する (保存に失敗した場合、同じURLを持つ他の企業の記事で保存し直せる)
+        """
+        for crawl in batch:
+            if crawl.error is not None:
+                continue
+            crawl.new_articles = []
+            seen: Set[str] = set()
+            for article in crawl.articles:
+                if article['url'] not in self._saved_urls and article['url'] not in seen:
+                    seen.add(article['url'])
+                    crawl.new_articles.append(article)
+        return batch
+
+    async def _persist_stage(self, batch: List[CompanyCrawl]) -> List[CompanyCrawl]:
+        """
+        保存段: 複数企業の記事をまとめて書き込み、その後に各企業の最高水位を進める
+        実際に新規作成された記事のみを、最初にそのURLを取得した企業の通知対象として残す
+        一部の記事の保存に失敗した企業 (同じURLを持つ企業を含む) は最高水位を進めず、次回同じ範囲を再取得する
+        """
+        pending = [crawl for crawl in batch if crawl.error is None]
+        owners: Dict[str, CompanyCrawl] = {}
+        articles = []
+        for crawl in pending:
+            for article in crawl.new_articles:
+                if article['url'] not in owners:
+                    owners[article['url']] = crawl
+                    articles.append({**article, 'company_id': crawl.company['id']})
+        failed_urls: Set[str] = set()
 
-    def _process_company(self, company: Dict[str, Any]) -> List[ScrapingResult]:
-        results = []
-        company_name = company['name']
-        logger.info(f"Processing company: {company_name}")
+        def on_failure(article: Dict[str, Any], error):
+            failed_urls.add(article['url'])
 
-        if company.get('prtimes', {}).get('enabled', True):
+        try:
+            inserted = set(await asyncio.to_thread(self.db.insert_articles, articles, on_failure)) if articles else set()
+        except Exception as e:
+            for crawl in pending:
+                crawl.new_articles = []
+                self._fail(crawl, e)
+            return batch
+        # 保存済みになったURL (新規作成・既存) は、以降の企業の重複除外に使う
+        self._saved_urls.update(url for url in owners if url not in failed_urls)
+        for crawl in pending:
+            failures = sum(1 for a in crawl.new_articles if a['url'] in failed_urls)
+            crawl.new_articles = [
+                a for a in crawl.new_articles if a['url'] in inserted and owners[a['url']] is crawl
+            ]
+            if failures:
+                self._fail(crawl, RuntimeError(f"Failed to save {failures} articles"))
+        pending = [crawl for crawl in pending if crawl.error is None]
+
+        # 保存が完了してから最高水位を進める (失敗時は次回同じ範囲を再取得する)
+        # 前回の最高水位まで辿り着けなかった場合は、間の記事を取りこぼさないよう進めない
+        async def advance(crawl: CompanyCrawl):
+            if not crawl.articles or not crawl.complete:
+                return
+            newest = max(crawl.articles, key=lambda a: a['published_at'])
             try:
-                prtimes_url = company['prtimes']['url']
-                scraper = PRTimesScraper()
-                articles = scraper.get_news(prtimes_url)
-
-                # Firestoreに保存 (URL重複はスキップ)
-                saved_ids = self.db.save_articles(articles, company['id'])
-
-                if saved_ids:
-                    saved_articles = []
-                    for article in articles:
-                        # 保存時の doc_id と URL が1対1でないため、URLで判断
-                        if not self.db._is_duplicate(article['url']):
-                            # 実際にはすでにsave_articlesで重複除外しているため、ここでは使わないかもしれない
-                            saved_articles.append(article)
-                        else:
-                            saved_articles.append(article)
-
-                    # 通知する記事は全件か、または実際に新規保存されたものに絞ってもよい
-                    self.notifier.notify_new_articles(articles, company_name)
-
-                results.append(ScrapingResult(
-                    company_id=company['id'],
-                    source='prtimes',
-                    success=True,
-                    articles_count=len(articles)
-                ))
+                await asyncio.to_thread(
+                    self.db.update_watermark, crawl.company['id'], 'prtimes', newest['url'], newest['published_at']
+                )
             except Exception as e:
-                logger.error(f"Error scraping PRTimes for {company_name}: {str(e)}")
-                results.append(ScrapingResult(
-                    company_id=company['id'],
-                    source='prtimes',
-                    success=False,
-                    articles_count=0,
-                    error_message=str(e)
-                ))
-
-        return results
+                logger.error(f"Failed to update watermark for {crawl.company['name']}: {str(e)}")
+
+        await asyncio.gather(*(advance(crawl) for crawl in pending))
+        return batch
+
+    async def _notify_stage(self, batch: List[CompanyCrawl]) -> List[CompanyCrawl]:
+        """
+        通知段: 複数企業の新着記事を1つの通知にまとめて送る
+        一部の保存に失敗した企業も、保存できた記事は通知する
+        """
+        groups = [(crawl.company['name'], crawl.new_articles) for crawl in batch if crawl.new_articles]
+        if groups:
+            await asyncio.to_thread(self.notifier.notify_new_articles_digest, groups)
+        return batch
+
+    def _stage_failed(self, batch: List[Any], error: Exception) -> List[CompanyCrawl]:
+        """
+        段のハンドラが例外を送出した場合、バッチの全企業を失敗として後段に渡す (実行結果から漏らさない)
+        """
+        crawls = []
+        for item in batch:
+            crawl = item if isinstance(item, CompanyCrawl) else CompanyCrawl(company=item, scraper=self._create_scraper())
+            # 保存できたか分からないため通知しない
+            crawl.new_articles = []
+            if crawl.error is None:
+                self._fail(crawl, error)
+            crawls.append(crawl)
+        return crawls
+
+    def _fail(self, crawl: CompanyCrawl, error: Exception):
+        logger.error(f"Error scraping PRTimes for {crawl.company['name']}: {str(error)}")
+        crawl.error = error
+        # 保存に失敗したページを次回「変更なし」と判定しないよう検証子を破棄
+        crawl.scraper.validator_store.discard(crawl.company['prtimes'].get('url', ''))
+
+    def _crawl_result(self, crawl: CompanyCrawl) -> ScrapingResult:
+        if crawl.error is not None:
+            return self._failed_result(crawl.company, crawl.error)
+        result = self._success_result(crawl.company, len(crawl.articles), crawl.scraper)
+        result.execution_time = time.time() - crawl.started_at
+        return result
+
+    def _create_scraper(self) -> PRTimesScraper:
+        scraping_config = self.config.get('scraping', {})
+        rate_limit = scraping_config.get('rate_limit', {})
+        backoff = scraping_config.get('backoff', {})
+        return PRTimesScraper(
+            timeout=scraping_config.get('timeout', 30),
+            retry=scraping_config.get('retry', 3),
+            parser_backend=scraping_config.get('parser'),
+            page_param=scraping_config.get('pagination', {}).get('page_param', 'page'),
+            rate_limiter=get_default_rate_limiter(
+                rate=rate_limit.get('rate', 2.0),
+                burst=rate_limit.get('burst', 4),
+                decrease=rate_limit.get('decrease', 0.5),
+                recovery=rate_limit.get('recovery', 60.0)
+            ),
+            retry_budget=self.retry_budget,
+            backoff=Backoff(base=backoff.get('base', 0.5), cap=backoff.get('cap', 30.0)),
+            response_cache=self.response_cache
+        )
+
+    def _create_response_cache(self) -> ResponseCache:
+        """
+        生レスポンスのキャッシュを生成
+        モードは環境変数 SCRAPER_RESPONSE_CACHE_MODE が設定ファイルより優先される
+        再生時刻は SCRAPER_REPLAY_AS_OF (ISO 8601) で指定できる
+        """
+        cache_config = self.config.get('scraping', {}).get('response_cache', {})
+        as_of = os.getenv('SCRAPER_REPLAY_AS_OF')
+        return ResponseCache(
+            directory=cache_config.get('dir'),
+            mode=os.getenv('SCRAPER_RESPONSE_CACHE_MODE') or cache_config.get('mode', 'off'),
+            max_age=cache_config.get('max_age_days', 7) * 24 * 3600,
+            max_bytes=cache_config.get('max_size_mb', 500) * 1024 * 1024,
+            as_of=datetime.fromisoformat(as_of).timestamp() if as_of else None
+        )
+
+    def _new_retry_budget(self) -> RetryBudget:
+        """
+        1回の実行で共有する再試行の上限
+        """
+        return RetryBudget(self.config.get('scraping', {}).get('retry_budget'))
+
+    def _max_pages(self) -> int:
+        return self.config.get('scraping', {}).get('pagination', {}).get('max_pages', 10)
+
+    def _success_result(self, company: Dict[str, Any], articles_count: int, scraper: PRTimesScraper) -> ScrapingResult:
+        return ScrapingResult(
+            company_id=company['id'],
+            source='prtimes',
+            success=True,
+            articles_count=articles_count,
+            cache_hits=scraper.cache_stats.hits,
+            cache_misses=scraper.cache_stats.misses,
+            bytes_saved=scraper.cache_stats.bytes_saved,
+            rate_limit_wait=scraper.fetch_stats.limiter_wait,
+            retries=scraper.fetch_stats.retries
+        )
+
+    def _failed_result(self, company: Dict[str, Any], error: Exception) -> ScrapingResult:
+        return ScrapingResult(
+            company_id=company['id'],
+            source='prtimes',
+            success=False,
+            articles_count=0,
+            error_message=str(error)
+        )
 
 if __name__ == '__main__':
     collector = NewsCollector()
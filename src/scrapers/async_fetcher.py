@@ -0,0 +1,128 @@
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlparse
+import asyncio
+import logging
+import aiohttp
+from .session_pool import ConnectionStats, DEFAULT_HEADERS
+
+@dataclass
+class FetchResponse:
+    """取得結果 (ステータス・本文・ヘッダー)"""
+    status: int
+    content: bytes = b''
+    text: str = ''
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+class AsyncFetcher:
+    """
+    aiohttpを用いた非同期のページ取得エンジン
+    全体の同時接続数とホスト毎の同時接続数をセマフォで制限する
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        per_host_limit: int = 4,
+        timeout: int = 30,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.headers = headers or DEFAULT_HEADERS
+        self.logger = logging.getLogger(__name__)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.connection_stats = ConnectionStats()
+
+    async def __aenter__(self) -> 'AsyncFetcher':
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """
+        セッションを生成する (既に生成済みなら何もしない)
+        """
+        if self._session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.per_host_limit
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[self._trace_config()]
+        )
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """
+        リクエスト数と新規接続数 (ハンドシェイク数) を数えるトレース設定
+        """
+        async def on_request_start(session, context, params):
+            self.connection_stats.requests += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connection_stats.new_connections += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
+
+    async def close(self):
+        """
+        セッションを閉じる
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._global_semaphore = None
+            self._host_semaphores.clear()
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """
+        URLのホストに対応するセマフォを取得
+        """
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResponse:
+        """
+        ページを1回取得してレスポンスを返す
+        HTTPエラーもそのまま返し、通信エラーは例外として送出する (再試行は呼び出し側で行う)
+        """
+        await self.open()
+        async with self._global_semaphore, self._host_semaphore(url):
+            async with self._session.get(url, headers=headers) as response:
+                if response.status == 304 or response.status >= 400:
+                    return FetchResponse(status=response.status, headers=response.headers)
+                content = await response.read()
+                return FetchResponse(
+                    status=response.status,
+                    content=content,
+                    text=await response.text(errors='replace'),
+                    headers=response.headers
+                )
+
+    async def fetch_text(self, url: str) -> Optional[str]:
+        """
+        ページを取得して本文を返す (失敗時はNone)
+        """
+        try:
+            response = await self.fetch(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f"Failed to fetch {url}: {str(e)}")
+            return None
+        if response.status >= 400:
+            return None
+        return response.text
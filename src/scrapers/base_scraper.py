@@ -1,21 +1,53 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Mapping, Optional
 from datetime import datetime
+import asyncio
 import logging
+import re
+import time
+import aiohttp
 from bs4 import BeautifulSoup
 import requests
+from .async_fetcher import AsyncFetcher
+from .http_cache import (
+    CacheStats, Validator, ValidatorStore,
+    conditional_headers, content_hash, get_default_validator_store
+)
+from .response_cache import ResponseCache, get_default_response_cache
+from .session_pool import get_shared_session
+from .rate_limiter import (
+    Backoff, FetchStats, HostRateLimiter, RetryBudget,
+    RETRYABLE_STATUSES, get_default_rate_limiter
+)
+
+class FetchError(Exception):
+    """ページの取得に失敗した (再試行しないエラー、または再試行を使い切った)"""
 
 class BaseScraper(ABC):
     """スクレイパーの基底クラス"""
     
-    def __init__(self, timeout: int = 30, retry: int = 3):
+    def __init__(
+        self,
+        timeout: int = 30,
+        retry: int = 3,
+        validator_store: Optional[ValidatorStore] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        backoff: Optional[Backoff] = None,
+        response_cache: Optional[ResponseCache] = None
+    ):
         self.timeout = timeout
         self.retry = retry
         self.logger = logging.getLogger(__name__)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # 企業毎に新しい接続を張らないよう、プロセス共通のセッションを使う
+        self.session = get_shared_session()
+        self.validator_store = validator_store or get_default_validator_store()
+        self.rate_limiter = rate_limiter or get_default_rate_limiter()
+        self.retry_budget = retry_budget or RetryBudget()
+        self.backoff = backoff or Backoff()
+        self.response_cache = response_cache or get_default_response_cache()
+        self.cache_stats = CacheStats()
+        self.fetch_stats = FetchStats()
 
     @abstractmethod
     def get_news(self, url: str) -> List[Dict[str, Any]]:
@@ -24,22 +56,197 @@ class BaseScraper(ABC):
         """
         pass
 
+    async def get_news_async(self, url: str, fetcher: AsyncFetcher) -> List[Dict[str, Any]]:
+        """
+        ニュース記事を非同期で取得する
+        非同期対応していないサブクラスでは同期版をスレッドで実行する
+        """
+        return await asyncio.to_thread(self.get_news, url)
+
     def _fetch_page(self, url: str) -> Optional[BeautifulSoup]:
         """
         ページを取得してBeautifulSoupオブジェクトを返す
+        前回から変更がない場合、取得に失敗した場合はパースせずにNoneを返す
         """
-        for i in range(self.retry):
+        try:
+            text = self._fetch_html(url)
+        except FetchError:
+            return None
+        if text is None:
+            return None
+        return self._parse_html(text)
+
+    def _fetch_html(self, url: str, conditional: bool = True) -> Optional[str]:
+        """
+        条件付きGETでページを取得し、本文を返す
+        304 または本文ハッシュが前回と同一の場合はNoneを返し、取得に失敗した場合は FetchError を送出する
+        conditional=False の場合は検証子を使わず、常に本文を返す
+        """
+        if self.response_cache.replaying:
+            return self._replay(url)
+        validator = self.validator_store.get(url) if conditional else None
+        for attempt in range(self.retry):
+            self.fetch_stats.limiter_wait += self.rate_limiter.acquire(url)
+            status, retry_after = None, None
             try:
-                response = self.session.get(url, timeout=self.timeout)
-                response.raise_for_status()
-                return BeautifulSoup(response.text, 'html.parser')
+                response = self.session.get(
+                    url,
+                    timeout=self.timeout,
+                    headers=self._request_headers(validator)
+                )
+                if response.status_code == 304:
+                    return self._not_modified(url, validator)
+                status = response.status_code
+                if status < 400:
+                    self.response_cache.record(url, status, response.content, response.headers)
+                    if not conditional:
+                        return response.text
+                    return self._accept_response(url, validator, response.content, response.text, response.headers)
+                retry_after = response.headers.get('Retry-After')
+                error = f"HTTP {status}"
             except requests.RequestException as e:
-                self.logger.error(f"Failed to fetch {url}: {str(e)}")
-                if i == self.retry - 1:
-                    return None
-                continue
+                error = str(e)
+            self.logger.error(f"Failed to fetch {url}: {error}")
+
+            delay = self._retry_delay(url, attempt, status, retry_after)
+            if delay is None:
+                raise FetchError(f"Failed to fetch {url}: {error}")
+            time.sleep(delay)
+        raise FetchError(f"Failed to fetch {url}")
+
+    async def _fetch_page_async(self, url: str, fetcher: AsyncFetcher) -> Optional[BeautifulSoup]:
+        """
+        ページを非同期で取得してBeautifulSoupオブジェクトを返す
+        """
+        try:
+            text = await self._fetch_html_async(url, fetcher)
+        except FetchError:
+            return None
+        if text is None:
+            return None
+        return self._parse_html(text)
+
+    async def _fetch_html_async(self, url: str, fetcher: AsyncFetcher, conditional: bool = True) -> Optional[str]:
+        """
+        _fetch_html の非同期版
+        """
+        if self.response_cache.replaying:
+            return self._replay(url)
+        validator = self.validator_store.get(url) if conditional else None
+        for attempt in range(self.retry):
+            self.fetch_stats.limiter_wait += await self.rate_limiter.acquire_async(url)
+            status, retry_after = None, None
+            try:
+                response = await fetcher.fetch(url, headers=self._request_headers(validator))
+                if response.status == 304:
+                    return self._not_modified(url, validator)
+                status = response.status
+                if status < 400:
+                    self.response_cache.record(url, status, response.content, response.headers)
+                    if not conditional:
+                        return response.text
+                    return self._accept_response(url, validator, response.content, response.text, response.headers)
+                retry_after = response.headers.get('Retry-After')
+                error = f"HTTP {status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+            self.logger.error(f"Failed to fetch {url}: {error}")
+
+            delay = self._retry_delay(url, attempt, status, retry_after)
+            if delay is None:
+                raise FetchError(f"Failed to fetch {url}: {error}")
+            await asyncio.sleep(delay)
+        raise FetchError(f"Failed to fetch {url}")
+
+    def _request_headers(self, validator: Optional[Validator]) -> Dict[str, str]:
+        """
+        リクエストヘッダーを生成
+        recordモードでは全ページの本文を保存するため条件付きGETを行わない
+        """
+        if self.response_cache.recording:
+            return {}
+        return conditional_headers(validator)
+
+    def _replay(self, url: str) -> Optional[str]:
+        """
+        replayモードでキャッシュからページを返す (ネットワークにはアクセスしない)
+        再生を何度でも同じ結果にするため、検証子ストアは参照・更新しない
+        """
+        cached = self.response_cache.lookup(url)
+        if cached is None:
+            self.logger.warning(f"No cached response to replay: {url}")
+            return None
+        self.cache_stats.hits += 1
+        match = re.search(r'charset=([\w-]+)', cached.headers.get('Content-Type', ''), re.IGNORECASE)
+        return cached.content.decode(match.group(1) if match else 'utf-8', errors='replace')
+
+    def _retry_delay(
+        self,
+        url: str,
+        attempt: int,
+        status: Optional[int],
+        retry_after: Optional[str]
+    ) -> Optional[float]:
+        """
+        再試行までの待ち時間を返す (再試行しない場合はNone)
+        """
+        if attempt >= self.retry - 1:
+            return None
+        # 404等の再試行しても結果が変わらないエラー
+        if status is not None and status not in RETRYABLE_STATUSES:
+            return None
+        if not self.retry_budget.try_consume():
+            self.logger.warning(f"Retry budget exhausted, giving up on {url}")
+            return None
+
+        delay = self.backoff.delay(attempt, retry_after)
+        if status == 429 or retry_after:
+            # 同じホストを叩いている他のワーカーも待たせる
+            self.rate_limiter.penalize(url, delay)
+        self.fetch_stats.retries += 1
+        return delay
+
+    def _not_modified(self, url: str, validator: Optional[Validator]) -> None:
+        """
+        304 Not Modified を受け取った場合の処理
+        """
+        self.cache_stats.hits += 1
+        if validator:
+            self.cache_stats.bytes_saved += validator.content_length
+        self.logger.info(f"Not modified: {url}")
         return None
 
+    def _accept_response(
+        self,
+        url: str,
+        validator: Optional[Validator],
+        content: bytes,
+        text: str,
+        headers: Mapping[str, str]
+    ) -> Optional[str]:
+        """
+        取得した本文の検証子を保存し、前回と同一内容ならNoneを返す
+        """
+        digest = content_hash(content)
+        self.validator_store.put(url, Validator(
+            etag=headers.get('ETag'),
+            last_modified=headers.get('Last-Modified'),
+            content_hash=digest,
+            content_length=len(content)
+        ))
+        if validator and validator.content_hash == digest:
+            self.cache_stats.hits += 1
+            self.logger.info(f"Unchanged content: {url}")
+            return None
+        self.cache_stats.misses += 1
+        return text
+
+    def _parse_html(self, text: str) -> BeautifulSoup:
+        """
+        HTML文字列をBeautifulSoupオブジェクトに変換する
+        """
+        return BeautifulSoup(text, 'html.parser')
+
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """
         日付文字列をdatetimeオブジェクトにパースする
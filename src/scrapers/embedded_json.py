@@ -0,0 +1,149 @@
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import logging
+import re
+from .parsers import ListingRecord
+
+logger = logging.getLogger(__name__)
+
+# Next.js 等がページに埋め込む初期データ
+PAYLOAD_MARKERS = (
+    re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>'),
+    re.compile(r'window\.__NUXT__\s*=\s*'),
+    re.compile(r'window\.__INITIAL_STATE__\s*=\s*'),
+)
+
+# プレスリリース一覧が入っている配列のキー候補 (この配列だけを部分デコードする)
+LIST_KEYS = ('pressReleases', 'releases', 'releaseList', 'release_list', 'articles')
+
+TITLE_KEYS = ('title', 'release_title')
+URL_KEYS = ('release_url', 'url', 'link', 'href')
+DATE_KEYS = ('released_at', 'releasedAt', 'release_date', 'published_at', 'publishedAt', 'created_at')
+IMAGE_KEYS = ('main_image', 'mainImage', 'thumbnail', 'thumbnail_url', 'image_url', 'image')
+SUMMARY_KEYS = ('lead', 'summary', 'subtitle', 'description')
+
+_decoder = json.JSONDecoder()
+
+def _payload_span(text: str) -> Optional[Tuple[int, int]]:
+    """
+    埋め込みJSONの開始位置と (わかる範囲での) 終了位置を返す
+    """
+    for marker in PAYLOAD_MARKERS:
+        match = marker.search(text)
+        if not match:
+            continue
+        start = match.end()
+        end = text.find('</script>', start)
+        return start, end if end != -1 else len(text)
+    return None
+
+def _decode_list_only(text: str, start: int, end: int) -> Optional[List[Any]]:
+    """
+    ペイロード全体をデコードせず、一覧配列のキーを探してその配列だけをデコードする
+    """
+    for key in LIST_KEYS:
+        pos = text.find(f'"{key}"', start, end)
+        while pos != -1:
+            cursor = pos + len(key) + 2
+            while cursor < end and text[cursor] in ' \t\r\n:':
+                cursor += 1
+            if cursor < end and text[cursor] == '[':
+                try:
+                    value, _ = _decoder.raw_decode(text, cursor)
+                except ValueError:
+                    break
+                if _looks_like_release_list(value):
+                    return value
+            pos = text.find(f'"{key}"', pos + 1, end)
+    return None
+
+def _iter_lists(node: Any) -> Iterator[List[Any]]:
+    """
+    JSONツリー内の配列を幅優先で列挙
+    """
+    queue = deque([node])
+    while queue:
+        current = queue.popleft()
+        if isinstance(current, list):
+            yield current
+            queue.extend(current)
+        elif isinstance(current, dict):
+            queue.extend(current.values())
+
+def _first(item: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+def _release_url(item: Dict[str, Any]) -> Optional[str]:
+    url = _first(item, URL_KEYS)
+    if url:
+        return str(url)
+    # URLを持たない場合はIDから組み立てる (/main/html/rd/p/{release_id}.{company_id}.html)
+    release_id, company_id = item.get('release_id'), item.get('company_id')
+    if release_id is not None and company_id is not None:
+        try:
+            return f"/main/html/rd/p/{int(release_id):09d}.{int(company_id):09d}.html"
+        except (TypeError, ValueError):
+            # 数値でないIDからはURLを組み立てられない
+            return None
+    return None
+
+def _looks_like_release_list(value: Any) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) > 0
+        and all(isinstance(v, dict) for v in value)
+        and all(_first(v, TITLE_KEYS) and _release_url(v) for v in value[:3])
+    )
+
+def _image_url(item: Dict[str, Any]) -> Optional[str]:
+    image = _first(item, IMAGE_KEYS)
+    if isinstance(image, dict):
+        image = image.get('url') or image.get('src')
+    return str(image) if image else None
+
+def to_listing_record(item: Dict[str, Any]) -> ListingRecord:
+    """
+    ペイロードの1件をパーサーバックエンドと同じ生フィールド形式に変換
+    """
+    published = _first(item, DATE_KEYS)
+    summary = _first(item, SUMMARY_KEYS)
+    title = _first(item, TITLE_KEYS)
+    return {
+        'title': str(title) if title else None,
+        'href': _release_url(item),
+        'published': str(published) if published is not None else None,
+        'image_url': _image_url(item),
+        'summary': str(summary) if summary else None
+    }
+
+def extract_listing_records(text: str) -> Optional[List[ListingRecord]]:
+    """
+    ページに埋め込まれたJSONからプレスリリース一覧を抽出する
+    ペイロードが無い、一覧が見つからない、またはURLを得られない記事がある場合はNone (DOMパースへフォールバック)
+    """
+    span = _payload_span(text)
+    if span is None:
+        return None
+    start, end = span
+
+    items = _decode_list_only(text, start, end)
+    if items is None:
+        try:
+            payload, _ = _decoder.raw_decode(text, start)
+        except ValueError as e:
+            logger.warning(f"Failed to decode embedded payload: {str(e)}")
+            return None
+        items = next((lst for lst in _iter_lists(payload) if _looks_like_release_list(lst)), None)
+        if items is None:
+            return None
+
+    records = [to_listing_record(item) for item in items]
+    if any(record['href'] is None for record in records):
+        logger.warning("Embedded payload has releases without a usable URL; falling back to DOM parsing")
+        return None
+    return records
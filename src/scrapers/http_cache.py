@@ -0,0 +1,130 @@
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+import atexit
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'slack-news-aggregator')
+
+@dataclass
+class Validator:
+    """URL毎のキャッシュ検証子"""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    content_length: int = 0
+
+@dataclass
+class CacheStats:
+    """条件付きGETのヒット/ミス集計"""
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+
+def content_hash(content: bytes) -> str:
+    """
+    レスポンス本文のハッシュ値を計算
+    """
+    return hashlib.sha256(content).hexdigest()
+
+def conditional_headers(validator: Optional[Validator]) -> Dict[str, str]:
+    """
+    検証子から条件付きGET用のヘッダーを生成
+    """
+    headers = {}
+    if validator is None:
+        return headers
+    if validator.etag:
+        headers['If-None-Match'] = validator.etag
+    if validator.last_modified:
+        headers['If-Modified-Since'] = validator.last_modified
+    return headers
+
+class ValidatorStore:
+    """
+    ETag / Last-Modified / 本文ハッシュをURL毎にJSONファイルへ永続化するストア
+
+    put / discard はメモリ上の変更として溜め、flush でまとめてファイルに書き込む (取得の度にファイルを書かない)
+    flush はその時点のファイルを読み直して自分の変更のみを上書きするため、他のプロセスが書いた検証子を消さない
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(
+            os.getenv('SCRAPER_CACHE_DIR', DEFAULT_CACHE_DIR), 'validators.json'
+        )
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Validator] = self._load()
+        # 未書き込みの変更 (Noneは削除)
+        self._pending: Dict[str, Optional[Validator]] = {}
+
+    def _load(self) -> Dict[str, Validator]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            return {url: Validator(**entry) for url, entry in raw.items()}
+        except FileNotFoundError:
+            return {}
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring broken validator store {self.path}: {str(e)}")
+            return {}
+
+    def _save(self, entries: Dict[str, Validator]):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({url: asdict(v) for url, v in entries.items()}, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, url: str) -> Optional[Validator]:
+        with self._lock:
+            return self._entries.get(url)
+
+    def put(self, url: str, validator: Validator):
+        with self._lock:
+            self._entries[url] = validator
+            self._pending[url] = validator
+
+    def discard(self, url: str):
+        """
+        検証子を削除する (次回は必ず全件取得させたい場合に使用)
+        """
+        with self._lock:
+            self._entries.pop(url, None)
+            self._pending[url] = None
+
+    def flush(self):
+        """
+        溜めた変更をファイルに書き込む (一時ファイルに書いてから置き換える)
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            entries = self._load()
+            for url, validator in self._pending.items():
+                if validator is None:
+                    entries.pop(url, None)
+                else:
+                    entries[url] = validator
+            self._save(entries)
+            self._entries = entries
+            self._pending = {}
+
+_default_store: Optional[ValidatorStore] = None
+_default_store_lock = threading.Lock()
+
+def get_default_validator_store() -> ValidatorStore:
+    """
+    プロセス共通のValidatorStoreを取得 (プロセス終了時に未書き込みの変更を書き込む)
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ValidatorStore()
+            atexit.register(_default_store.flush)
+        return _default_store
@@ -0,0 +1,129 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+
+if TYPE_CHECKING:
+    from .base_scraper import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ParseStats:
+    """パース段の集計"""
+    pages: int = 0
+    parse_seconds: float = 0.0
+    queue_wait: float = 0.0
+    max_latency: float = 0.0
+    first_started: Optional[float] = None
+    last_finished: Optional[float] = None
+
+    @property
+    def throughput(self) -> float:
+        """パース段が動いていた間の1秒あたりのページ数"""
+        if self.first_started is None or self.last_finished is None:
+            return 0.0
+        elapsed = self.last_finished - self.first_started
+        return self.pages / elapsed if elapsed > 0 else float(self.pages)
+
+    def to_dict(self) -> dict:
+        return {
+            'name': 'parse',
+            'items': self.pages,
+            'throughput': round(self.throughput, 2),
+            'avg_latency': round(self.parse_seconds / self.pages, 3) if self.pages else 0.0,
+            'max_latency': round(self.max_latency, 3),
+            'parse_seconds': round(self.parse_seconds, 3),
+            'queue_wait': round(self.queue_wait, 3)
+        }
+
+# ワーカープロセス毎に抽出器を使い回す (セレクタのコンパイル等を1回にする)
+# スクレイパー本体 (セッション・検証子ストア・レスポンスキャッシュ等) はワーカーでは生成しない
+_worker_extractors: Dict[Tuple[type, Optional[str]], Any] = {}
+
+def _extract_in_worker(
+    extractor_cls: type,
+    parser_backend: Optional[str],
+    text: str
+) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    ワーカープロセス側で一覧ページから記事を抽出し、所要時間と共に返す
+    """
+    key = (extractor_cls, parser_backend)
+    if key not in _worker_extractors:
+        _worker_extractors[key] = extractor_cls(parser_backend=parser_backend)
+    start = time.perf_counter()
+    articles = _worker_extractors[key].extract(text)
+    return articles, time.perf_counter() - start
+
+class ParsePool:
+    """
+    CPUバウンドなHTMLパースをI/Oとは別のプロセスプールで実行する
+    I/O側 (イベントループ) は本文の取得のみを行い、GILの影響を受けずに並行取得を続けられる
+
+    queue_depth はプールに投入済みで未完了のページ数の上限
+    上限に達すると取得側が待たされる (取得済み本文がメモリに溜まり続けないようにする)
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_depth: int = 64):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.queue_depth = queue_depth
+        self.stats = ParseStats()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> 'ParsePool':
+        self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        """
+        プロセスプールを生成する (workers=0 の場合はスレッドで実行する)
+        """
+        if self.workers > 0 and self._executor is None:
+            # gRPC (Firestore) のスレッドを抱えたままforkしないようspawnで起動する
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        self._slots = asyncio.Semaphore(self.queue_depth)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def extract_articles(self, scraper: 'BaseScraper', text: str) -> List[Dict[str, Any]]:
+        """
+        スクレイパーの _extract_articles をワーカーで実行する
+        プロセスで実行する場合、ワーカーにはスクレイパーの抽出器 (extractor) の型のみを渡す
+        """
+        if self._slots is None:
+            self.open()
+        queued_at = time.perf_counter()
+        async with self._slots:
+            self.stats.queue_wait += time.perf_counter() - queued_at
+            if self.stats.first_started is None:
+                self.stats.first_started = time.perf_counter()
+            if self._executor is None:
+                start = time.perf_counter()
+                articles = await asyncio.to_thread(scraper._extract_articles, text)
+                elapsed = time.perf_counter() - start
+            else:
+                extractor = scraper.extractor
+                loop = asyncio.get_running_loop()
+                articles, elapsed = await loop.run_in_executor(
+                    self._executor, _extract_in_worker, type(extractor), extractor.parser.name, text
+                )
+        self.stats.pages += 1
+        self.stats.parse_seconds += elapsed
+        self.stats.max_latency = max(self.stats.max_latency, elapsed)
+        self.stats.last_finished = time.perf_counter()
+        return articles
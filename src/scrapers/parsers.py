@@ -0,0 +1,160 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+from lxml import etree, html as lxml_html
+
+logger = logging.getLogger(__name__)
+
+# 一覧ページから取り出す生のフィールド
+# {'title', 'href', 'published', 'image_url', 'summary'} (値は文字列またはNone)
+ListingRecord = Dict[str, Optional[str]]
+
+# TODO: タグの取得がPRTimesのサイトの仕様に合わないので修正する
+ARTICLE_TAG = 'article'
+ARTICLE_CLASS = 'list-article'
+
+def article_region(text: str) -> str:
+    """
+    最初の<article>から最後の</article>までを切り出す
+    ヘッダー・サイドバー等を木構造に含めないための前処理
+    """
+    start = text.find('<' + ARTICLE_TAG)
+    end = text.rfind('</' + ARTICLE_TAG + '>')
+    if start == -1 or end == -1:
+        return text
+    return text[start:end + len(ARTICLE_TAG) + 3]
+
+class ListingParser(ABC):
+    """一覧ページのパーサーバックエンドの基底クラス"""
+
+    name = ''
+
+    @abstractmethod
+    def parse(self, text: str) -> List[ListingRecord]:
+        """
+        一覧ページのHTMLから記事毎の生フィールドを抽出する
+        """
+        pass
+
+class SoupListingParser(ListingParser):
+    """
+    BeautifulSoupバックエンド
+    SoupStrainerで記事要素のみを木構造に残し、セレクタは事前コンパイルしておく
+    """
+
+    TITLE = soupsieve.compile('h2.list-article_title a')
+    TIME = soupsieve.compile('time')
+    IMAGE = soupsieve.compile('img.list-article_image')
+    SUMMARY = soupsieve.compile('p.list-article__summary')
+
+    def __init__(self, features: str = 'html.parser'):
+        self.features = features
+        self.name = features if features == 'html.parser' else f'bs4-{features}'
+        self.strainer = SoupStrainer(ARTICLE_TAG, class_=ARTICLE_CLASS)
+
+    def parse(self, text: str) -> List[ListingRecord]:
+        soup = BeautifulSoup(article_region(text), self.features, parse_only=self.strainer)
+        records = []
+        for article in soup.find_all(ARTICLE_TAG, class_=ARTICLE_CLASS):
+            title = self.TITLE.select_one(article)
+            time_elem = self.TIME.select_one(article)
+            image = self.IMAGE.select_one(article)
+            summary = self.SUMMARY.select_one(article)
+            records.append({
+                'title': title.get_text() if title else None,
+                'href': title.get('href') if title else None,
+                'published': time_elem.get_text() if time_elem else None,
+                'image_url': image.get('src') if image else None,
+                'summary': summary.get_text() if summary else None
+            })
+        return records
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+class LxmlListingParser(ListingParser):
+    """
+    lxmlバックエンド (libxml2)
+    事前コンパイルしたXPathで記事要素を直接参照する
+    """
+
+    name = 'lxml'
+
+    ARTICLES = etree.XPath(f"//{ARTICLE_TAG}[{_has_class(ARTICLE_CLASS)}]")
+    TITLE = etree.XPath(f".//h2[{_has_class('list-article_title')}]//a")
+    TIME = etree.XPath(".//time")
+    IMAGE = etree.XPath(f".//img[{_has_class('list-article_image')}]/@src")
+    SUMMARY = etree.XPath(f".//p[{_has_class('list-article__summary')}]")
+
+    def parse(self, text: str) -> List[ListingRecord]:
+        region = article_region(text)
+        if not region.strip():
+            return []
+        root = lxml_html.fromstring(region)
+        records = []
+        for article in self.ARTICLES(root):
+            title = self.TITLE(article)
+            time_elem = self.TIME(article)
+            image = self.IMAGE(article)
+            summary = self.SUMMARY(article)
+            records.append({
+                'title': title[0].text_content() if title else None,
+                'href': title[0].get('href') if title else None,
+                'published': time_elem[0].text_content() if time_elem else None,
+                'image_url': str(image[0]) if image else None,
+                'summary': summary[0].text_content() if summary else None
+            })
+        return records
+
+class SelectolaxListingParser(ListingParser):
+    """
+    selectolaxバックエンド (Lexbor, 任意依存)
+    """
+
+    name = 'selectolax'
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser_cls = LexborHTMLParser
+
+    def parse(self, text: str) -> List[ListingRecord]:
+        tree = self._parser_cls(article_region(text))
+        records = []
+        for article in tree.css(f"{ARTICLE_TAG}.{ARTICLE_CLASS}"):
+            title = article.css_first('h2.list-article_title a')
+            time_elem = article.css_first('time')
+            image = article.css_first('img.list-article_image')
+            summary = article.css_first('p.list-article__summary')
+            records.append({
+                'title': title.text() if title else None,
+                'href': title.attributes.get('href') if title else None,
+                'published': time_elem.text() if time_elem else None,
+                'image_url': image.attributes.get('src') if image else None,
+                'summary': summary.text() if summary else None
+            })
+        return records
+
+PARSER_BACKENDS = {
+    'html.parser': lambda: SoupListingParser('html.parser'),
+    'bs4-lxml': lambda: SoupListingParser('lxml'),
+    'lxml': LxmlListingParser,
+    'selectolax': SelectolaxListingParser
+}
+
+DEFAULT_PARSER_BACKEND = 'lxml'
+
+def get_parser(name: Optional[str] = None) -> ListingParser:
+    """
+    名前からパーサーバックエンドを生成
+    任意依存が未インストールの場合はデフォルトにフォールバックする
+    """
+    name = name or DEFAULT_PARSER_BACKEND
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name}")
+    try:
+        return PARSER_BACKENDS[name]()
+    except ImportError as e:
+        logger.warning(f"Parser backend '{name}' unavailable ({str(e)}), falling back to {DEFAULT_PARSER_BACKEND}")
+        return PARSER_BACKENDS[DEFAULT_PARSER_BACKEND]()
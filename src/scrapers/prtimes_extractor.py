@@ -0,0 +1,110 @@
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+import logging
+import re
+from urllib.parse import urljoin
+from .parsers import ListingRecord, get_parser
+from .embedded_json import extract_listing_records
+
+JST = timezone(timedelta(hours=9))
+
+class PRTimesExtractor:
+    """
+    PRTimesの一覧ページから記事情報を抽出する
+    セッション等のI/O用の状態を持たないため、パース用プロセスでもそのまま生成できる
+    """
+
+    def __init__(self, parser_backend: Optional[str] = None):
+        self.base_url = "https://prtimes.jp"
+        self.parser = get_parser(parser_backend)
+        self.logger = logging.getLogger(__name__)
+
+    def extract(self, text: str) -> List[Dict[str, Any]]:
+        """
+        一覧ページから記事情報のリストを抽出
+        埋め込みJSONがあればそれを使い、無い場合のみDOMをパースする
+        """
+        records = extract_listing_records(text)
+        if records is None:
+            records = self.parser.parse(text)
+
+        articles = []
+        for record in records:
+            try:
+                article_data = self.parse_article(record)
+                if article_data:
+                    articles.append(article_data)
+            except Exception as e:
+                self.logger.error(f"Failed to parse article: {str(e)}")
+                continue
+
+        return articles
+
+    def parse_article(self, record: ListingRecord) -> Optional[Dict[str, Any]]:
+        """
+        パーサーが抽出した生フィールドから記事情報を組み立てる
+        """
+        try:
+            # タイトルとURLの取得
+            if not record.get('title') or not record.get('href'):
+                return None
+
+            title = self._clean_text(record['title'])
+            url = urljoin(self.base_url, record['href'])
+
+            # 公開日時の取得
+            if not record.get('published'):
+                return None
+
+            published_at = self.parse_date(self._clean_text(record['published']))
+            if not published_at:
+                return None
+
+            # 概要文の取得
+            content = None
+            if record.get('summary'):
+                content = self._clean_text(record['summary'])
+
+            return {
+                'title': title,
+                'url': url,
+                'published_at': published_at,
+                'content': content,
+                'image_url': record.get('image_url'),
+                'source': 'prtimes'
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error parsing article: {str(e)}")
+            return None
+
+    def parse_date(self, date_str: str) -> Optional[datetime]:
+        """
+        PR Times固有の日付フォーマットをパース
+        埋め込みJSONのISO 8601形式の場合は日本時間のnaiveなdatetimeに揃える
+        """
+        pattern = r'(\d{4})年(\d{1,2})月(\d{1,2})日\s*(\d{1,2})[:時](\d{2})'
+        match = re.match(pattern, date_str)
+        if not match:
+            try:
+                parsed = datetime.fromisoformat(date_str)
+            except ValueError:
+                return None
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(JST).replace(tzinfo=None)
+            return parsed
+
+        try:
+            year, month, day, hour, minute = map(int, match.groups())
+            return datetime(year, month, day, hour, minute)
+        except ValueError as e:
+            self.logger.error(f"Error parsing date {date_str}: {str(e)}")
+            return None
+
+    def _clean_text(self, text: str) -> str:
+        """
+        テキストの前後の空白を除去し、改行を正規化する
+        """
+        if not text:
+            return ""
+        return " ".join(text.strip().split())
@@ -1,104 +1,202 @@
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+from dataclasses import dataclass, field
 from datetime import datetime
-import re
-from bs4 import BeautifulSoup
-from .base_scraper import BaseScraper
+from urllib.parse import urlparse, urlencode, parse_qsl, urlunparse
+from .base_scraper import BaseScraper, FetchError
+from .async_fetcher import AsyncFetcher
+from .http_cache import ValidatorStore
+from .rate_limiter import Backoff, HostRateLimiter, RetryBudget
+from .response_cache import ResponseCache
+from .prtimes_extractor import PRTimesExtractor
+
+if TYPE_CHECKING:
+    from .parse_pool import ParsePool
+
+@dataclass
+class IncrementalListing:
+    """最高水位 (watermark) までの差分取得の結果"""
+    articles: List[Dict[str, Any]] = field(default_factory=list)
+    # 前回の最高水位 (または一覧の末尾) まで辿り着いたか
+    # Falseの場合、取得できなかった記事が残っているため最高水位を進めてはいけない
+    complete: bool = True
 
 class PRTimesScraper(BaseScraper):
     """
     PRTimes専用のスクレイパークラス
     """
 
-    def __init__(self, timeout: int = 30, retry: int = 3):
-        super().__init__(timeout, retry)
+    def __init__(
+        self,
+        timeout: int = 30,
+        retry: int = 3,
+        validator_store: Optional[ValidatorStore] = None,
+        parser_backend: Optional[str] = None,
+        page_param: str = 'page',
+        rate_limiter: Optional[HostRateLimiter] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        backoff: Optional[Backoff] = None,
+        response_cache: Optional[ResponseCache] = None
+    ):
+        super().__init__(timeout, retry, validator_store, rate_limiter, retry_budget, backoff, response_cache)
         self.base_url = "https://prtimes.jp"
+        self.extractor = PRTimesExtractor(parser_backend)
+        self.parser = self.extractor.parser
+        self.page_param = page_param
 
     def get_news(self, url: str) -> List[Dict[str, Any]]:
         """
         PRTimesからの企業のプレスリリース一覧を取得する
         """
-        soup = self._fetch_page(url)
-        if not soup:
+        try:
+            text = self._fetch_html(url)
+        except FetchError:
             return []
+        if not text:
+            return []
+        return self._extract_articles(text)
 
-        articles = []
-        for article in self._find_articles(soup):
-            try:
-                article_data = self._parse_article(article)
-                if article_data:
-                    articles.append(article_data)
-            except Exception as e:
-                self.logger.error(f"Failed to parse article: {str(e)}")
-                continue
-        
-        return articles
-
-    def _find_articles(self, soup: BeautifulSoup) -> List[Any]:
+    async def get_news_async(
+        self,
+        url: str,
+        fetcher: AsyncFetcher,
+        parse_pool: Optional['ParsePool'] = None
+    ) -> List[Dict[str, Any]]:
         """
-        PRTimesからニュースCardを全て取得
+        PRTimesからの企業のプレスリリース一覧を非同期で取得する
         """
-        return soup.find_all('article', class_='list-article')
+        try:
+            text = await self._fetch_html_async(url, fetcher)
+        except FetchError:
+            return []
+        if not text:
+            return []
+        return await self._extract_articles_async(text, parse_pool)
 
-    def _parse_article(self, article: BeautifulSoup) -> Optional[Dict[str, Any]]:
+    def get_news_since(
+        self,
+        url: str,
+        watermark: Optional[Dict[str, Any]],
+        max_pages: int = 10
+    ) -> IncrementalListing:
         """
-        個別の記事要素をパースして記事情報を抽出
+        一覧ページを順に辿り、前回の最高水位 (watermark) より新しい記事のみを取得する
+        watermark が無い場合は1ページ目のみを取得する
+        条件付きGETは1ページ目のみで行い (2ページ目以降は1ページ目が変わると内容がずれるため)、
+        ページの取得に失敗した場合は FetchError を送出する
+        max_pages 以内に watermark へ辿り着けなかった場合は complete=False を返す
         """
-        # TODO: タグの取得がPRTimesのサイトの仕様に合わないので修正する
-        try:
-            # タイトルとURLの取得
-            title_elem = article.find('h2', class_='list-article_title')
-            if not title_elem or not title_elem.find('a'):
-                return None
+        collected: List[Dict[str, Any]] = []
+        pages = max_pages if watermark else 1
+        for page in range(1, pages + 1):
+            if page == 1:
+                text = self._fetch_html(url)
+            else:
+                text = self._fetch_html(self._page_url(url, page), conditional=False)
+            if not text:
+                return IncrementalListing(collected)
+            if self._collect_until_watermark(self._extract_articles(text), watermark, collected):
+                return IncrementalListing(collected)
+        return self._incomplete(url, collected, watermark)
 
-            title = self._clean_text(title_elem.find('a').text)
-            url = self.base_url + title_elem.find('a')['href']
+    async def get_news_since_async(
+        self,
+        url: str,
+        fetcher: AsyncFetcher,
+        watermark: Optional[Dict[str, Any]],
+        max_pages: int = 10,
+        parse_pool: Optional['ParsePool'] = None
+    ) -> IncrementalListing:
+        """
+        get_news_since の非同期版
+        parse_pool を渡した場合、パースはプロセスプールで行う
+        """
+        collected: List[Dict[str, Any]] = []
+        pages = max_pages if watermark else 1
+        for page in range(1, pages + 1):
+            if page == 1:
+                text = await self._fetch_html_async(url, fetcher)
+            else:
+                text = await self._fetch_html_async(self._page_url(url, page), fetcher, conditional=False)
+            if not text:
+                return IncrementalListing(collected)
+            articles = await self._extract_articles_async(text, parse_pool)
+            if self._collect_until_watermark(articles, watermark, collected):
+                return IncrementalListing(collected)
+        return self._incomplete(url, collected, watermark)
 
-            # 公開日時の取得
-            date_elem = article.find('time')
-            if not date_elem:
-                return None
+    def _incomplete(
+        self,
+        url: str,
+        collected: List[Dict[str, Any]],
+        watermark: Optional[Dict[str, Any]]
+    ) -> IncrementalListing:
+        """
+        最後のページまで辿っても watermark に達しなかった場合の結果
+        watermark が無い場合は1ページ目のみで完了とする
+        """
+        if not watermark:
+            return IncrementalListing(collected)
+        self.logger.warning(f"Watermark not reached within the page limit: {url}")
+        # 次回1ページ目が「変更なし」と判定され、残りの記事を取りこぼさないよう検証子を破棄
+        self.validator_store.discard(url)
+        return IncrementalListing(collected, complete=False)
 
-            published_at = self._parse_prtimes_date(date_elem.text)
-            if not published_at:
-                return None
-            
-            # 画像URLの取得
-            image_url = None
-            img_elem = article.find('img', class_='list-article_image')
-            if img_elem and 'src' in img_elem.attrs:
-                image_url = img_elem['src']
+    def _collect_until_watermark(
+        self,
+        articles: List[Dict[str, Any]],
+        watermark: Optional[Dict[str, Any]],
+        collected: List[Dict[str, Any]]
+    ) -> bool:
+        """
+        watermark に達するまでの記事を collected に追加する
+        これ以上ページを辿る必要がない場合はTrueを返す
+        公開日時は分単位のため、watermark と同時刻の記事は watermark 自身を除いて集め、
+        それより古い記事に達した時点で止める (同時刻の保存済み記事は保存時の重複判定で除かれる)
+        """
+        if not articles:
+            return True
+        seen_urls = {a['url'] for a in collected}
+        # 範囲外のページ番号で同じページが返ってきた場合
+        if articles[0]['url'] in seen_urls:
+            return True
+        for article in articles:
+            if watermark:
+                if article['published_at'] < watermark['published_at']:
+                    return True
+                if article['url'] == watermark.get('url'):
+                    continue
+            if article['url'] not in seen_urls:
+                collected.append(article)
+                seen_urls.add(article['url'])
+        return False
 
-            # 概要文の取得
-            content = None
-            content_elem = article.find('p', class_='list-article__summary')
-            if content_elem:
-                content = self._clean_text(content_elem.text)
+    def _page_url(self, url: str, page: int) -> str:
+        """
+        一覧のページ番号付きURLを生成 (1ページ目は元のURL)
+        """
+        if page <= 1:
+            return url
+        parsed = urlparse(url)
+        query = dict(parse_qsl(parsed.query))
+        query[self.page_param] = str(page)
+        return urlunparse(parsed._replace(query=urlencode(query)))
 
-            return {
-                'title': title,
-                'url': url,
-                'published_at': published_at,
-                'content': content,
-                'image_url': image_url,
-                'source': 'prtimes'
-            }
+    def _extract_articles(self, text: str) -> List[Dict[str, Any]]:
+        """
+        一覧ページから記事情報のリストを抽出
+        """
+        return self.extractor.extract(text)
 
-        except Exception as e:
-            self.logger.error(f"Error parsing article: {str(e)}")
-            return None
+    async def _extract_articles_async(self, text: str, parse_pool: Optional['ParsePool']) -> List[Dict[str, Any]]:
+        """
+        _extract_articles をパース用プロセスプールで実行する (プール未指定時はその場で実行)
+        """
+        if parse_pool is None:
+            return self._extract_articles(text)
+        return await parse_pool.extract_articles(self, text)
 
     def _parse_prtimes_date(self, date_str: str) -> Optional[datetime]:
         """
         PR Times固有の日付フォーマットをパース
         """
-        pattern = r'(\d{4})年(\d{1,2})月(\d{1,2})日\s+(\d{1,2}):(\d{2})'
-        match = re.match(pattern, date_str)
-        if not match:
-            return None
-            
-        try:
-            year, month, day, hour, minute = map(int, match.groups())
-            return datetime(year, month, day, hour, minute)
-        except ValueError as e:
-            self.logger.error(f"Error parsing date {date_str}: {str(e)}")
-            return None
+        return self.extractor.parse_date(date_str)
@@ -0,0 +1,224 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+import asyncio
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 再試行する価値のあるHTTPステータス
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+@dataclass
+class FetchStats:
+    """取得時のレート制限待ち・再試行の集計"""
+    limiter_wait: float = 0.0
+    retries: int = 0
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After ヘッダー (秒数 または HTTP-date) を秒数に変換
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class TokenBucket:
+    """
+    トークンバケット
+    予約方式で、取得できるまでの待ち時間を返す (ロックは待機中に保持しない)
+
+    429/Retry-After で止められるたびに速度を decrease 倍に落とし (min_rate まで)、
+    その後 recovery 秒かけて元の速度まで徐々に戻す
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+        decrease: float = 0.5,
+        min_rate: float = 0.1,
+        recovery: float = 60.0
+    ):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.decrease = decrease
+        self.min_rate = min(min_rate, rate)
+        self.recovery = recovery
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """
+        前回の更新時刻から now までのトークン補充と速度の回復 (ロック保持中に呼ぶ)
+        停止中は更新時刻が停止明けにあるため、何も補充しない
+        """
+        elapsed = now - self._updated
+        if elapsed <= 0:
+            return
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * elapsed / self.recovery)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        トークンを1つ予約し、使用可能になるまでの秒数を返す
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1
+            wait = self._updated - now
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+            return wait
+
+    def block_for(self, seconds: float):
+        """
+        429/Retry-After を受けた場合に、このホストへの送信を一定時間止める
+        停止明けに待機中のリクエストが一斉に送られないよう、補充の基準時刻を停止明けに移し、
+        そこから 1/rate 秒間隔で送る
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            # 同じ停止期間中に届いた429 (並行リクエストの分) では重ねて減速しない
+            if now >= self._blocked_until:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._updated = max(self._updated, self._blocked_until)
+            self._tokens = min(self._tokens, 1.0)
+
+class HostRateLimiter:
+    """
+    ホスト単位のレート制限
+    スレッド・asyncioの双方から共有して使用できる
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: int = 4,
+        overrides: Optional[Dict[str, Dict[str, float]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        decrease: float = 0.5,
+        recovery: float = 60.0
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.decrease = decrease
+        self.recovery = recovery
+        self.overrides = overrides or {}
+        self._clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._buckets:
+                override = self.overrides.get(host, {})
+                self._buckets[host] = TokenBucket(
+                    rate=override.get('rate', self.rate),
+                    burst=int(override.get('burst', self.burst)),
+                    clock=self._clock,
+                    decrease=override.get('decrease', self.decrease),
+                    recovery=override.get('recovery', self.recovery)
+                )
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> float:
+        """
+        送信可能になるまで待機し、待機した秒数を返す
+        """
+        wait = self._bucket(url).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url: str) -> float:
+        """
+        acquire の非同期版
+        """
+        wait = self._bucket(url).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, url: str, seconds: float):
+        """
+        ホストへの送信を一定時間止め、送信速度を落とす (他のワーカーにも適用される)
+        """
+        self._bucket(url).block_for(seconds)
+
+class RetryBudget:
+    """
+    1回の実行全体で許容する再試行回数 (Noneは無制限)
+    """
+
+    def __init__(self, max_retries: Optional[int] = None):
+        self.max_retries = max_retries
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def try_consume(self) -> bool:
+        with self._lock:
+            if self.max_retries is not None and self.used >= self.max_retries:
+                return False
+            self.used += 1
+            return True
+
+class Backoff:
+    """
+    ジッター付き指数バックオフ (Full Jitter)
+    Retry-After がある場合はそちらを優先する
+    """
+
+    def __init__(self, base: float = 0.5, cap: float = 30.0, max_retry_after: float = 120.0):
+        self.base = base
+        self.cap = cap
+        self.max_retry_after = max_retry_after
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        seconds = parse_retry_after(retry_after)
+        if seconds is not None:
+            return min(seconds, self.max_retry_after)
+        return random.uniform(0, min(self.cap, self.base * (2 ** attempt)))
+
+_default_limiter: Optional[HostRateLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+def get_default_rate_limiter(
+    rate: float = 2.0,
+    burst: int = 4,
+    decrease: float = 0.5,
+    recovery: float = 60.0
+) -> HostRateLimiter:
+    """
+    プロセス共通のHostRateLimiterを取得 (引数は初回生成時のみ有効)
+    """
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = HostRateLimiter(rate=rate, burst=burst, decrease=decrease, recovery=recovery)
+        return _default_limiter
@@ -0,0 +1,233 @@
+from dataclasses import dataclass, asdict, field
+from typing import Callable, Dict, List, Mapping, Optional
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from .http_cache import DEFAULT_CACHE_DIR, content_hash
+
+try:
+    from ..data_access.keys import normalize_url
+except ImportError:
+    # src を基準に import された場合 (run_script 等) は scrapers が最上位のパッケージになる
+    from data_access.keys import normalize_url
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = 'off'
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+CACHE_MODES = (MODE_OFF, MODE_RECORD, MODE_REPLAY)
+
+# 再生時の文字コード判定等に必要なヘッダーのみ保存する
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+@dataclass
+class CacheEntry:
+    """インデックスの1行 (正規化URL + 取得時刻 → 本文のハッシュ)"""
+    url: str
+    fetched_at: float
+    sha256: str
+    status: int = 200
+    headers: Dict[str, str] = field(default_factory=dict)
+
+@dataclass
+class CachedResponse:
+    """キャッシュから再生したレスポンス"""
+    url: str
+    status: int
+    content: bytes
+    headers: Dict[str, str]
+    fetched_at: float
+
+class ResponseCache:
+    """
+    取得した生のHTTPレスポンスをローカルに保存する圧縮・コンテンツアドレス型キャッシュ
+
+    - record: 取得した全レスポンスを保存する
+    - replay: キャッシュからのみ応答する (ネットワークにはアクセスしない)
+    - off: 何もしない
+
+    本文は sha256 をキーに objects/ 以下へgzipで保存し (同一内容は1つにまとまる)、
+    正規化URLと取得時刻の対応は index.jsonl に追記する
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        mode: str = MODE_OFF,
+        max_age: Optional[float] = 7 * 24 * 3600,
+        max_bytes: Optional[int] = 500 * 1024 * 1024,
+        as_of: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown response cache mode: {mode}")
+        self.directory = directory or os.path.join(
+            os.getenv('SCRAPER_CACHE_DIR', DEFAULT_CACHE_DIR), 'responses'
+        )
+        self.mode = mode
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.as_of = as_of
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, List[CacheEntry]]] = None
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == MODE_RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == MODE_REPLAY
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, 'index.jsonl')
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'objects', digest[:2], f"{digest}.gz")
+
+    def _index(self) -> Dict[str, List[CacheEntry]]:
+        """
+        インデックスを読み込む (初回のみ, ロック取得済みで呼ぶこと)
+        """
+        if self._entries is not None:
+            return self._entries
+        entries: Dict[str, List[CacheEntry]] = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = CacheEntry(**json.loads(line))
+                    except (ValueError, TypeError):
+                        logger.warning(f"Skipping broken response cache index line in {self.index_path}")
+                        continue
+                    entries.setdefault(entry.url, []).append(entry)
+        except FileNotFoundError:
+            pass
+        for history in entries.values():
+            history.sort(key=lambda e: e.fetched_at)
+        self._entries = entries
+        return entries
+
+    def record(self, url: str, status: int, content: bytes, headers: Mapping[str, str]):
+        """
+        レスポンスを保存する (recordモード以外では何もしない)
+        """
+        if not self.recording:
+            return
+        digest = content_hash(content)
+        entry = CacheEntry(
+            url=normalize_url(url),
+            fetched_at=self._clock(),
+            sha256=digest,
+            status=status,
+            headers={k: headers[k] for k in STORED_HEADERS if headers.get(k)}
+        )
+        with self._lock:
+            path = self._object_path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(gzip.compress(content))
+                os.replace(tmp_path, path)
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(asdict(entry)) + '\n')
+            self._index().setdefault(entry.url, []).append(entry)
+
+    def lookup(self, url: str, as_of: Optional[float] = None) -> Optional[CachedResponse]:
+        """
+        指定時刻 (省略時は as_of または最新) 以前に保存された最新のレスポンスを返す
+        """
+        as_of = as_of if as_of is not None else self.as_of
+        with self._lock:
+            history = self._index().get(normalize_url(url), [])
+            candidates = [e for e in history if as_of is None or e.fetched_at <= as_of]
+        for entry in reversed(candidates):
+            try:
+                with open(self._object_path(entry.sha256), 'rb') as f:
+                    content = gzip.decompress(f.read())
+            except (OSError, EOFError) as e:
+                logger.warning(f"Missing cached object for {entry.url}: {str(e)}")
+                continue
+            return CachedResponse(entry.url, entry.status, content, dict(entry.headers), entry.fetched_at)
+        return None
+
+    def evict(self, max_age: Optional[float] = None, max_bytes: Optional[int] = None) -> int:
+        """
+        古いエントリと、合計サイズの上限を超えた分を古い順に削除する
+        削除した本文ファイルの数を返す
+        """
+        max_age = max_age if max_age is not None else self.max_age
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        with self._lock:
+            entries = sorted(
+                (e for history in self._index().values() for e in history),
+                key=lambda e: e.fetched_at
+            )
+            if max_age is not None:
+                cutoff = self._clock() - max_age
+                entries = [e for e in entries if e.fetched_at >= cutoff]
+
+            sizes: Dict[str, int] = {}
+            refs: Dict[str, int] = {}
+            for entry in entries:
+                if entry.sha256 not in sizes:
+                    try:
+                        sizes[entry.sha256] = os.path.getsize(self._object_path(entry.sha256))
+                    except OSError:
+                        sizes[entry.sha256] = 0
+                refs[entry.sha256] = refs.get(entry.sha256, 0) + 1
+
+            total = sum(sizes.values())
+            start = 0
+            while max_bytes is not None and total > max_bytes and start < len(entries):
+                digest = entries[start].sha256
+                refs[digest] -= 1
+                if refs[digest] == 0:
+                    total -= sizes[digest]
+                start += 1
+            entries = entries[start:]
+
+            kept = {e.sha256 for e in entries}
+            removed = 0
+            objects_dir = os.path.join(self.directory, 'objects')
+            for root, _, files in os.walk(objects_dir):
+                for name in files:
+                    if name.endswith('.gz') and name[:-3] not in kept:
+                        os.remove(os.path.join(root, name))
+                        removed += 1
+
+            self._entries = {}
+            for entry in entries:
+                self._entries.setdefault(entry.url, []).append(entry)
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(asdict(entry)) + '\n')
+            os.replace(tmp_path, self.index_path)
+
+        if removed:
+            logger.info(f"Evicted {removed} cached responses from {self.directory}")
+        return removed
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_default_response_cache() -> ResponseCache:
+    """
+    プロセス共通のResponseCacheを取得
+    モードは環境変数 SCRAPER_RESPONSE_CACHE_MODE で指定する (既定は off)
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(mode=os.getenv('SCRAPER_RESPONSE_CACHE_MODE', MODE_OFF))
+        return _default_cache
@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+from typing import Optional
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+@dataclass
+class ConnectionStats:
+    """接続の再利用状況 (新規接続数 = TCP/TLSハンドシェイク数)"""
+    requests: int = 0
+    new_connections: int = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        if self.requests == 0:
+            return 0.0
+        return max(0.0, 1 - self.new_connections / self.requests)
+
+    def to_dict(self) -> dict:
+        return {
+            'requests': self.requests,
+            'new_connections': self.new_connections,
+            'reuse_ratio': self.reuse_ratio
+        }
+
+class _PoolStatsMixin:
+    """新規接続の生成を数えるためのコネクションプール拡張"""
+
+    stats_lock: threading.Lock
+    stats: ConnectionStats
+
+    def _new_conn(self):
+        with self.stats_lock:
+            self.stats.new_connections += 1
+        return super()._new_conn()
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """
+    リクエスト数と新規接続数を数えるHTTPAdapter
+    """
+
+    def __init__(self, stats: ConnectionStats, stats_lock: threading.Lock, **kwargs):
+        self.stats = stats
+        self.stats_lock = stats_lock
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        attrs = {'stats': self.stats, 'stats_lock': self.stats_lock}
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('CountingHTTPConnectionPool', (_PoolStatsMixin, HTTPConnectionPool), attrs),
+            'https': type('CountingHTTPSConnectionPool', (_PoolStatsMixin, HTTPSConnectionPool), attrs)
+        }
+
+    def send(self, request, **kwargs):
+        with self.stats_lock:
+            self.stats.requests += 1
+        return super().send(request, **kwargs)
+
+class SessionRegistry:
+    """
+    プロセス内で共有するrequests.Sessionの管理
+    スクレイパーのインスタンスや実行をまたいでKeep-Alive接続を再利用する
+    """
+
+    def __init__(self, pool_size: int = 10):
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self.pool_size = pool_size
+        self.stats = ConnectionStats()
+        self._stats_lock = threading.Lock()
+
+    def _mount(self, session: requests.Session):
+        adapter = CountingHTTPAdapter(
+            self.stats,
+            self._stats_lock,
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+    def get_session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                self._mount(session)
+                self._session = session
+            return self._session
+
+    def configure(self, pool_size: int):
+        """
+        ワーカー数に合わせてホスト毎のプールサイズを拡張する (縮小はしない)
+        """
+        with self._lock:
+            if pool_size <= self.pool_size:
+                return
+            self.pool_size = pool_size
+            if self._session is not None:
+                logger.info(f"Resizing shared HTTP connection pool to {pool_size}")
+                self._mount(self._session)
+
+_registry = SessionRegistry()
+
+def get_shared_session() -> requests.Session:
+    """
+    プロセス共通のrequests.Sessionを取得
+    """
+    return _registry.get_session()
+
+def configure_session_pool(pool_size: int):
+    """
+    共通セッションのプールサイズを設定
+    """
+    _registry.configure(pool_size)
+
+def get_connection_stats() -> ConnectionStats:
+    """
+    共通セッションの接続再利用状況を取得
+    """
+    return _registry.stats
@@ -1,11 +1,17 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from slack_sdk.web import WebClient
 from slack_sdk.errors import SlackApiError
 import logging
 import re
+from itertools import islice
 from datetime import datetime, timedelta
 from ..data_access.firestore_client import FirestoreClient
-from ..data_access.models import Article
+from ..data_access.hot_cache import RecentArticlesMirror
+from ..data_access.models import ARTICLE_LIST_FIELDS, Article
+from .notifications import MAX_BLOCKS
+
+# 一覧に表示する記事数の上限 (期間が長くてもチャンネルを埋め尽くさないようにする)
+MAX_LISTED_ARTICLES = 100
 
 class SlackEventHandler:
     """Slackイベントを処理するハンドラクラス"""
@@ -14,6 +20,20 @@ class SlackEventHandler:
         self.client = client
         self.db = FirestoreClient()
         self.logger = logging.getLogger(__name__)
+        self.mirror = self._start_mirror()
+
+    def _start_mirror(self) -> Optional[RecentArticlesMirror]:
+        """
+        設定で有効な場合、直近の記事のプロセス内キャッシュを開始する
+        """
+        try:
+            mirror = self.db.recent_articles_mirror()
+            if mirror is not None and not mirror.start():
+                self.logger.warning("Recent articles mirror did not finish its initial load in time")
+            return mirror
+        except Exception as e:
+            self.logger.error(f"Error starting recent articles mirror: {str(e)}")
+            return None
 
     def handle_mention(self, event: Dict[str, Any]):
         """
@@ -88,24 +108,21 @@ class SlackEventHandler:
         except SlackApiError as e:
             self.logger.error(f"Error sending help message: {str(e)}")
 
-    def _show_recent_articles(self, channel: str, days: int = 7):
+    def _show_recent_articles(self, channel: str, days: int = 7, limit: int = MAX_LISTED_ARTICLES):
         """
-        最近の記事一覧を表示
+        最近の記事一覧を表示 (新しい順に最大 limit 件)
         """
         try:
-            # 全企業の記事を取得
-            companies = self.db.db.collection(self.db.config['collections']['companies']['name']).stream()
-            company_map = {}
-            for cdoc in companies:
-                cdata = cdoc.to_dict()
-                company_map[cdoc.id] = cdata.get('name', 'NoName')
-
-            all_articles: List[Article] = self.db.get_recent_articles(None, days)
-
-            # 日付でソート
-            all_articles.sort(key=lambda x: x.published_at, reverse=True)
-
-            if not all_articles:
+            since = datetime.now() - timedelta(days=days)
+            # プロセス内キャッシュで答えられればFirestoreを読まない
+            cached = self.mirror.recent(None, since) if self.mirror is not None else None
+            if cached is not None:
+                total = len(cached)
+                articles = iter(cached)
+            else:
+                total = self.db.count_recent_articles(None, since)
+                articles = self.db.iter_recent_articles(None, since, fields=ARTICLE_LIST_FIELDS)
+            if not total:
                 self.client.chat_postMessage(
                     channel=channel,
                     text=f"過去{days}日間の新着記事はありません。"
@@ -117,38 +134,34 @@ class SlackEventHandler:
                     "type": "header",
                     "text": {
                         "type": "plain_text",
-                        "text": f"📰 過去{days}日間の記事一覧 (全{len(all_articles)}件)"
+                        "text": f"📰 過去{days}日間の記事一覧 (全{total}件)"
                     }
                 },
                 {"type": "divider"}
             ]
 
-            # 記事をブロックに変換
-            for article in all_articles:
-                cname = company_map.get(article.company_id, "Unknown Company")
-                blocks.extend([
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": (
-                                f"*<{article.url}|{article.title}>*\n"
-                                f"🏢 {cname}\n"
-                                f"📅 {article.published_at.strftime('%Y年%m月%d日 %H:%M')}\n"
-                                f"📰 {article.source.upper()}"
-                            )
-                        }
-                    },
-                    {"type": "divider"}
-                ])
-
-            # 長いメッセージは分割して送信
-            for i in range(0, len(blocks), 50):
-                chunk = blocks[i:i + 50]
-                self.client.chat_postMessage(
-                    channel=channel,
-                    blocks=chunk
-                )
+            # 記事は新しい順にページ単位で読み、ブロックが上限に達する度に送信する
+            # 企業名は1メッセージ分の記事ごとにまとめて引く (キャッシュに無い企業のみ読む)
+            articles = islice(articles, limit)
+            shown = 0
+            while True:
+                batch = list(islice(articles, MAX_BLOCKS // 2))
+                if not batch:
+                    break
+                shown += len(batch)
+                names = self.db.get_company_names({article.company_id for article in batch})
+                for article in batch:
+                    blocks.extend(self._article_blocks(article, names.get(article.company_id, "Unknown Company")))
+                    if len(blocks) >= MAX_BLOCKS:
+                        self.client.chat_postMessage(channel=channel, blocks=blocks[:MAX_BLOCKS])
+                        blocks = blocks[MAX_BLOCKS:]
+            if total > shown:
+                blocks.append({
+                    "type": "context",
+                    "elements": [{"type": "mrkdwn", "text": f"全{total}件中、新しい{shown}件を表示しています"}]
+                })
+            if blocks:
+                self.client.chat_postMessage(channel=channel, blocks=blocks)
 
         except SlackApiError as e:
             self.logger.error(f"Error sending articles message: {str(e)}")
@@ -156,6 +169,26 @@ class SlackEventHandler:
             self.logger.error(f"Error retrieving articles: {str(e)}")
             self._send_error_message(channel, str(e))
 
+    def _article_blocks(self, article: Article, company_name: str) -> List[Dict[str, Any]]:
+        """
+        記事1件分のブロック
+        """
+        return [
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": (
+                        f"*<{article.url}|{article.title}>*\n"
+                        f"🏢 {company_name}\n"
+                        f"📅 {article.published_at.strftime('%Y年%m月%d日 %H:%M')}\n"
+                        f"📰 {article.source.upper()}"
+                    )
+                }
+            },
+            {"type": "divider"}
+        ]
+
     def _send_error_message(self, channel: str, error: str):
         """
         エラーメッセージを送信
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 import yaml
@@ -7,6 +7,9 @@ from datetime import datetime
 import logging
 from ..data_access.models import Article, ScrapingResult
 
+# Slackの1メッセージあたりのブロック数の上限
+MAX_BLOCKS = 50
+
 class SlackNotifier:
     """Slack通知を管理するクラス"""
 
@@ -56,24 +59,7 @@ class SlackNotifier:
         ]
 
         for article in articles:
-            published_at_str = ""
-            if 'published_at' in article and isinstance(article['published_at'], datetime):
-                published_at_str = article['published_at'].strftime('%Y年%m月%d日 %H:%M')
-
-            blocks.extend([
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": (
-                            f"*<{article['url']}|{article['title']}>*\n"
-                            f"📅 {published_at_str}\n"
-                            f"📰 {article['source'].upper()}"
-                        )
-                    }
-                },
-                {"type": "divider"}
-            ])
+            blocks.extend(self._article_blocks(article))
 
         try:
             self.client.chat_postMessage(
@@ -83,9 +69,80 @@ class SlackNotifier:
         except SlackApiError as e:
             self.logger.error(f"Failed to send Slack notification: {str(e)}")
 
-    def notify_scraping_result(self, results: List[ScrapingResult]):
+    def notify_new_articles_digest(self, groups: List[Tuple[str, List[Dict[str, Any]]]]):
+        """
+        複数企業の新規記事をまとめて通知 (ブロック数の上限毎にメッセージを分割)
+
+        Args:
+            groups (List[Tuple[str, List[Dict[str, Any]]]]): (企業名, 新規記事) のリスト
+        """
+        groups = [(name, articles) for name, articles in groups if articles]
+        if not groups:
+            return
+
+        total = sum(len(articles) for _, articles in groups)
+        messages: List[List[Dict[str, Any]]] = [[
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": f"🆕 新着記事 ({len(groups)}社 / {total}件)"
+                }
+            },
+            {"type": "divider"}
+        ]]
+        for company_name, articles in groups:
+            company_blocks = [{
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": f"*{company_name}* ({len(articles)}件)"}
+            }]
+            for article in articles:
+                company_blocks.extend(self._article_blocks(article))
+            for block in company_blocks:
+                if len(messages[-1]) >= MAX_BLOCKS:
+                    messages.append([])
+                messages[-1].append(block)
+
+        for blocks in messages:
+            try:
+                self.client.chat_postMessage(
+                    channel=self.config['default_channel'],
+                    blocks=blocks
+                )
+            except SlackApiError as e:
+                self.logger.error(f"Failed to send Slack notification: {str(e)}")
+
+    def _article_blocks(self, article: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        記事1件分のブロックを生成
+        """
+        published_at_str = ""
+        if 'published_at' in article and isinstance(article['published_at'], datetime):
+            published_at_str = article['published_at'].strftime('%Y年%m月%d日 %H:%M')
+
+        return [
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": (
+                        f"*<{article['url']}|{article['title']}>*\n"
+                        f"📅 {published_at_str}\n"
+                        f"📰 {article['source'].upper()}"
+                    )
+                }
+            },
+            {"type": "divider"}
+        ]
+
+    def notify_scraping_result(
+        self,
+        results: List[ScrapingResult],
+        stage_stats: Optional[List[Dict[str, Any]]] = None
+    ):
         """
         スクレイピング実行結果を通知
+        stage_stats を渡した場合はパイプラインの段毎のスループット・レイテンシも表示する
         """
         blocks = [
             {
@@ -101,6 +158,11 @@ class SlackNotifier:
         success_count = sum(1 for r in results if r.success)
         fail_count = len(results) - success_count
         total_articles = sum(r.articles_count for r in results)
+        cache_hits = sum(r.cache_hits for r in results)
+        cache_misses = sum(r.cache_misses for r in results)
+        bytes_saved = sum(r.bytes_saved for r in results)
+        rate_limit_wait = sum(r.rate_limit_wait for r in results)
+        retries = sum(r.retries for r in results)
 
         blocks.append({
             "type": "section",
@@ -111,11 +173,28 @@ class SlackNotifier:
                     f"✅ 成功: {success_count}件\n"
                     f"❌ 失敗: {fail_count}件\n"
                     f"📄 取得記事数: {total_articles}件\n"
+                    f"🗄 キャッシュ: ヒット {cache_hits}件 / ミス {cache_misses}件 (節約 {bytes_saved / 1024:.1f}KB)\n"
+                    f"⏳ レート制限待ち: {rate_limit_wait:.1f}秒 / 再試行: {retries}回\n"
                     f"🕒 実行時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
                 )
             }
         })
 
+        if stage_stats:
+            stage_text = "*段別の処理状況:*\n"
+            for stage in stage_stats:
+                stage_text += (
+                    f"• {stage['name']}: {stage['items']}件 / {stage['throughput']:.1f}件/秒 / "
+                    f"平均 {stage['avg_latency'] * 1000:.0f}ms (最大 {stage['max_latency'] * 1000:.0f}ms)\n"
+                )
+            blocks.append({
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": stage_text
+                }
+            })
+
         if fail_count > 0:
             error_text = "*エラー詳細:*\n"
             for result in results:
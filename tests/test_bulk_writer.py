@@ -0,0 +1,37 @@
+# tests/test_bulk_writer.py
+from unittest.mock import MagicMock
+from src.data_access.bulk_writer import ALREADY_EXISTS, BulkPersistence
+from src.data_access.fake_firestore import FakeFirestore
+
+def _failure(code, attempts, path="articles/a"):
+    failure = MagicMock(code=code, message="write failed", attempts=attempts)
+    failure.operation.reference.path = path
+    return failure
+
+def test_bulk_persistence_retries_only_transient_errors():
+    failures = []
+    writer = BulkPersistence(MagicMock(), max_attempts=3, on_failure=failures.append)
+
+    # create-if-absent の「既に存在する」は失敗にも再試行にもしない
+    assert writer._on_error(_failure(ALREADY_EXISTS, 1), None) is False
+    # UNAVAILABLE (14) は上限まで再試行し、PERMISSION_DENIED (7) は再試行しない
+    assert writer._on_error(_failure(14, 1), None) is True
+    assert writer._on_error(_failure(14, 3, "articles/flaky"), None) is False
+    assert writer._on_error(_failure(7, 1, "articles/denied"), None) is False
+
+    assert (writer.stats.already_exists, writer.stats.retried, writer.stats.failed) == (1, 1, 2)
+    assert [error.path for error in failures] == ["articles/flaky", "articles/denied"]
+    assert writer.stats.errors["articles/flaky"].attempts == 3
+
+def test_bulk_persistence_creates_only_missing_documents():
+    db = FakeFirestore()
+    articles = db.collection("articles")
+    with BulkPersistence(db) as writer:
+        writer.create(articles.document("a"), {"title": "A"})
+    with BulkPersistence(db) as writer:
+        writer.create(articles.document("a"), {"title": "A2"})
+        writer.create(articles.document("b"), {"title": "B"})
+
+    assert writer.stats.already_exists == 1
+    assert writer.stats.succeeded_paths == {articles.document("b").path}
+    assert articles.document("a").get().to_dict() == {"title": "A"}
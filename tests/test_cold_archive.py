@@ -0,0 +1,111 @@
+# tests/test_cold_archive.py
+import pytest
+from datetime import datetime, timedelta, timezone
+from src.data_access.company_cache import clear_company_cache
+from src.data_access.fake_firestore import FakeFirestore
+from src.data_access.firestore_client import FirestoreClient, clear_stats_cache
+from src.data_access.keys import article_doc_id
+
+pytest.importorskip("pyarrow")
+
+from src.data_access.cold_archive import ColdArchive  # noqa: E402
+
+@pytest.fixture
+def archive(tmp_path):
+    return ColdArchive(str(tmp_path / "archive"))
+
+@pytest.fixture
+def fake_client(tmp_path):
+    db = FakeFirestore(seed=0)
+    client = FirestoreClient(db=db)
+    client.config['url_filter'] = {'enabled': False}
+    clear_stats_cache()
+    clear_company_cache()
+    return client, db
+
+def _row(article_id, published_at, company_id="company1", status="active"):
+    return {
+        "id": article_id,
+        "company_id": company_id,
+        "title": f"Title {article_id}",
+        "url": f"http://example.com/{article_id}",
+        "published_at": published_at,
+        "content": "content",
+        "source": "prtimes",
+        "status": status
+    }
+
+def _article(i, published_at, company_id="company1"):
+    return {
+        "company_id": company_id,
+        "title": f"Title {i}",
+        "url": f"http://example.com/{i}",
+        "published_at": published_at,
+        "content": "content",
+        "source": "prtimes"
+    }
+
+def test_write_partitions_by_month_and_reads_newest_first(archive):
+    paths = archive.write([
+        _row("a", datetime(2023, 1, 5)),
+        _row("b", datetime(2023, 1, 20), company_id="company2"),
+        _row("c", datetime(2023, 3, 1)),
+        _row("d", datetime(2023, 3, 2), status="deleted")
+    ])
+    assert len(paths) == 2
+    assert "year=2023/month=01" in paths[0]
+    assert archive.months() == [(2023, 1), (2023, 3)]
+
+    assert [row["id"] for row in archive.iter_articles()] == ["c", "b", "a"]
+    assert [row["id"] for row in archive.iter_articles(statuses=None)] == ["d", "c", "b", "a"]
+    assert [row["id"] for row in archive.iter_articles(start=datetime(2023, 1, 10), end=datetime(2023, 3, 1))] == ["b"]
+    assert [row["id"] for row in archive.iter_articles(company_id="company1")] == ["c", "a"]
+
+    row = next(archive.iter_articles())
+    assert row["published_at"] == datetime(2023, 3, 1, tzinfo=timezone.utc)
+    assert row["content"] == "content"
+
+def test_duplicate_archives_are_read_once(archive):
+    archive.write([_row("a", datetime(2023, 1, 5))], archived_at=datetime(2024, 1, 1))
+    archive.write([{**_row("a", datetime(2023, 1, 5)), "title": "retry"}], archived_at=datetime(2024, 1, 2))
+    rows = list(archive.iter_articles())
+    assert [(row["id"], row["title"]) for row in rows] == [("a", "retry")]
+
+def test_archive_articles_leaves_tombstones(fake_client, archive):
+    client, db = fake_client
+    now = datetime.now()
+    client.insert_articles([_article(i, now - timedelta(days=400 + i)) for i in range(3)])
+    client.insert_articles([_article(10, now - timedelta(days=1))])
+    client.rebuild_latest_feeds()
+
+    assert client.archive_articles(365, dry_run=True) == {"archived": 3, "files": 0, "failed": 0}
+    result = client.archive_articles(365, archive=archive)
+    assert result["archived"] == 3
+    assert result["failed"] == 0
+
+    tombstone = db.collection("articles").document(article_doc_id("http://example.com/0")).get().to_dict()
+    assert tombstone["status"] == "archived"
+    assert "content" not in tombstone and "title" not in tombstone
+    # 墓標があるため、同じ記事は再び作成されない
+    assert client.insert_articles([_article(0, now - timedelta(days=400))]) == []
+    # 全体の記事数はそのままで、ステータスの軸のみ移る
+    assert client.stats_counters().get_total() == 4
+    assert client.stats_counters().get_counts("status") == {"active": 1, "archived": 3}
+    assert [item["url"] for item in client.get_latest_articles(limit=5, fields=["url"])] == ["http://example.com/10"]
+    # 2回目は対象が無い
+    assert client.archive_articles(365, archive=archive)["archived"] == 0
+
+def test_iter_articles_between_unions_hot_and_cold(fake_client, archive):
+    client, _ = fake_client
+    now = datetime.now()
+    client.insert_articles([_article(i, now - timedelta(days=100 * i + 1)) for i in range(6)])
+    client.archive_articles(250, archive=archive)
+
+    articles = list(client.iter_articles_between(now - timedelta(days=450), page_size=2, archive=archive))
+    assert [article.url for article in articles] == [f"http://example.com/{i}" for i in range(5)]
+    assert articles[-1].content == "content"
+
+    articles = list(client.iter_articles_between(
+        now - timedelta(days=450), now - timedelta(days=150), archive=archive
+    ))
+    assert [article.url for article in articles] == [f"http://example.com/{i}" for i in (2, 3, 4)]
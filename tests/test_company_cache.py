@@ -0,0 +1,50 @@
+# tests/test_company_cache.py
+import pytest
+from unittest.mock import MagicMock
+from src.data_access.company_cache import CompanyRegistry, clear_company_cache
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_company_cache()
+    yield
+    clear_company_cache()
+
+def _db():
+    db = MagicMock()
+    db.collection.return_value.document.side_effect = lambda company_id: MagicMock(id=company_id)
+
+    def get_all(refs):
+        for ref in refs:
+            snapshot = MagicMock(id=ref.id, exists=ref.id != "missing")
+            snapshot.to_dict.return_value = {"company_id": ref.id, "name": f"Company {ref.id}"}
+            yield snapshot
+
+    db.get_all.side_effect = get_all
+    return db
+
+def test_company_registry_batches_misses_and_shares_cache():
+    db = _db()
+    registry = CompanyRegistry(db)
+    assert registry.get_many(["A", "B", "missing"]) == {
+        "A": {"company_id": "A", "name": "Company A"},
+        "B": {"company_id": "B", "name": "Company B"},
+        "missing": None
+    }
+    # キャッシュに無い企業は1回の get_all で読む
+    assert db.get_all.call_count == 1
+    assert [ref.id for ref in db.get_all.call_args.args[0]] == ["A", "B", "missing"]
+
+    # 存在しない企業も含め、別のインスタンスからもキャッシュを使う
+    other = CompanyRegistry(db)
+    assert other.get("A") == {"company_id": "A", "name": "Company A"}
+    assert other.get("missing") is None
+    assert db.get_all.call_count == 1
+
+def test_company_registry_invalidate_reloads_only_that_company():
+    db = _db()
+    registry = CompanyRegistry(db)
+    registry.get_many(["A", "B"])
+    registry.invalidate("A")
+    assert registry.get_many(["A", "B"])["A"] == {"company_id": "A", "name": "Company A"}
+    assert db.get_all.call_count == 2
+    assert [ref.id for ref in db.get_all.call_args.args[0]] == ["A"]
@@ -0,0 +1,198 @@
+# tests/test_fake_firestore.py
+import pytest
+from datetime import datetime, timedelta, timezone
+from google.api_core import exceptions
+from src.data_access.company_cache import clear_company_cache
+from src.data_access.fake_firestore import FakeFirestore, Latency
+from src.data_access.firestore_client import FirestoreClient, clear_stats_cache
+from src.data_access.keys import article_doc_id
+from src.data_access.latest_feed import EPOCH, GLOBAL_FEED_ID, LatestFeed
+from src.data_access.models import ARTICLE_LIST_FIELDS
+from src.data_access.url_filter import SeenUrlFilter
+
+@pytest.fixture
+def fake_client(tmp_path):
+    """
+    FakeFirestore を使う FirestoreClient (Firebaseには接続しない)
+    """
+    db = FakeFirestore(seed=0)
+    client = FirestoreClient(db=db)
+    client._url_filter = SeenUrlFilter(str(tmp_path / "seen.bloom"), capacity=1000, false_positive_rate=0.01)
+    client._url_filter.open()
+    clear_stats_cache()
+    clear_company_cache()
+    yield client, db
+    client._url_filter.close()
+
+def _article(i, company_id="company1", published_at=None):
+    return {
+        "company_id": company_id,
+        "title": f"Title {i}",
+        "url": f"http://example.com/{i}",
+        "published_at": published_at or datetime.now() - timedelta(hours=i),
+        "content": "content",
+        "source": "prtimes"
+    }
+
+def test_insert_articles_end_to_end(fake_client):
+    client, db = fake_client
+    assert sorted(client.insert_articles([_article(1), _article(2)])) == ["http://example.com/1", "http://example.com/2"]
+    # 2回目は保存済みとして作成されない
+    assert client.insert_articles([_article(1), _article(3)]) == ["http://example.com/3"]
+
+    assert db.document_count("articles") == 3
+    assert client.get_total_articles_count() == 3
+    assert client.get_articles_count_by_company() == {"company1": 3}
+    assert client.count_articles(company_id="company1") == 3
+    assert db.stats.writes > 3
+    assert db.stats.ops["commit"] > 0
+
+def test_datetimes_are_returned_as_utc(fake_client):
+    client, db = fake_client
+    published_at = datetime(2024, 1, 2, 3, 4, 5)
+    client.update_watermark("company1", "prtimes", "http://example.com/1", published_at)
+
+    raw = db.collection("crawl_state").document("company1_prtimes").get().to_dict()
+    assert raw["published_at"] == published_at.replace(tzinfo=timezone.utc)
+    assert client.get_watermark("company1", "prtimes") == {"url": "http://example.com/1", "published_at": published_at}
+
+def test_query_pagination_and_projection(fake_client):
+    client, _ = fake_client
+    client.insert_articles([_article(i, company_id=f"company{i % 2}") for i in range(7)])
+
+    since = datetime.now() - timedelta(days=1)
+    articles = list(client.iter_recent_articles(since=since, page_size=3, fields=ARTICLE_LIST_FIELDS))
+    assert [article.url for article in articles] == [f"http://example.com/{i}" for i in range(7)]
+    assert client.count_recent_articles("company1", since) == 3
+    # 射影で読まなかった本文は参照時に読み込まれる
+    assert articles[0].content == "content"
+
+def test_feed_transactions_and_status_updates(fake_client):
+    client, _ = fake_client
+    client.insert_articles([_article(i) for i in range(3)])
+    client.rebuild_latest_feeds()
+
+    client.insert_articles([_article(10, published_at=datetime.now() + timedelta(hours=1))])
+    latest = client.get_latest_articles(limit=2, fields=["url"])
+    assert [item["url"] for item in latest] == ["http://example.com/10", "http://example.com/0"]
+
+    client.update_article_status(article_doc_id("http://example.com/10"), "archived")
+    feed = client.latest_feed().read(GLOBAL_FEED_ID, None, 5)
+    assert [item["url"] for item in feed] == [f"http://example.com/{i}" for i in range(3)]
+    assert client.stats_counters().get_counts("status") == {"active": 3, "archived": 1}
+
+def test_feed_rebuild_coverage_with_tied_timestamps(fake_client):
+    client, db = fake_client
+    tied = datetime(2024, 12, 1, 10, 0)
+    client.insert_articles([_article(0, published_at=datetime(2024, 12, 1, 11, 0))] +
+                           [_article(i, published_at=tied) for i in (1, 2)])
+    articles = db.collection("articles")
+
+    feed = LatestFeed(db, size=2)
+    assert feed.rebuild(GLOBAL_FEED_ID, articles) == 2
+    covers_from = db.collection("latest_feeds").document(GLOBAL_FEED_ID).get().to_dict()["covers_from"]
+    assert covers_from.replace(tzinfo=None) > tied
+    assert feed.read(GLOBAL_FEED_ID, tied, 3) is None
+
+    # 全件が収まれば、件数が size と同じでも全記事を網羅している
+    full = LatestFeed(db, collection="full_feeds", size=3)
+    full.rebuild(GLOBAL_FEED_ID, articles)
+    assert db.collection("full_feeds").document(GLOBAL_FEED_ID).get().to_dict()["covers_from"].replace(tzinfo=None) == EPOCH
+
+def test_counter_failure_flags_reconcile(fake_client, monkeypatch):
+    client, _ = fake_client
+    from src.data_access.stats_counters import StatsCounters
+
+    def unavailable(self, deltas):
+        raise exceptions.ServiceUnavailable("counters down")
+
+    assert client.stats_need_reconcile() is False
+    monkeypatch.setattr(StatsCounters, "increment", unavailable)
+    # カウンタの加算に失敗しても記事は保存され、数え直しが必要な状態として残る
+    assert client.insert_articles([_article(1)]) == ["http://example.com/1"]
+    assert client.stats_need_reconcile() is True
+
+def test_concurrent_status_updates_count_once(fake_client, monkeypatch):
+    client, _ = fake_client
+    from src.data_access import firestore_client
+
+    client.insert_articles([_article(1)])
+    article_id = article_doc_id("http://example.com/1")
+    original = firestore_client.status_change_deltas
+    raced = []
+
+    def deltas_with_race(old_status, status):
+        # 変更前のステータスを読んだ直後に、別のリクエストが同じ記事のステータスを変える
+        if not raced:
+            raced.append(old_status)
+            client.update_article_status(article_id, "deleted")
+        return original(old_status, status)
+
+    monkeypatch.setattr(firestore_client, "status_change_deltas", deltas_with_race)
+    client.update_article_status(article_id, "archived")
+
+    assert raced == ["active"]
+    assert client.stats_counters().get_total() == 1
+    assert {k: v for k, v in client.stats_counters().get_counts("status").items() if v} == {"archived": 1}
+
+def test_transaction_retries_when_document_changes(fake_client):
+    _, db = fake_client
+    from firebase_admin import firestore
+
+    ref = db.collection("counters").document("a")
+    ref.set({"count": 0})
+    attempts = []
+
+    @firestore.transactional
+    def increment(transaction):
+        snapshot = ref.get(transaction=transaction)
+        attempts.append(1)
+        if len(attempts) == 1:
+            # 読んだ後に他から書き込まれると commit が Aborted になり再実行される
+            ref.set({"count": 100})
+        transaction.update(ref, {"count": snapshot.to_dict()["count"] + 1})
+
+    increment(db.transaction())
+    assert len(attempts) == 2
+    assert ref.get().to_dict() == {"count": 101}
+    assert db.stats.aborted == 1
+
+def test_latency_is_injected_per_operation():
+    slept = []
+    db = FakeFirestore(latency={"get": Latency(5), "commit": Latency(200)}, sleep=slept.append)
+    ref = db.collection("companies").document("a")
+    batch = db.batch()
+    batch.set(ref, {"name": "A"})
+    batch.commit()
+    ref.get()
+
+    assert slept == [0.2, 0.005]
+    assert db.stats.latency_seconds["commit"] == pytest.approx(0.2)
+
+    # 中央値と99パーセンタイルを指定すると対数正規分布になる
+    db = FakeFirestore(latency=Latency(5, 200), seed=1, sleep=lambda seconds: None)
+    for _ in range(200):
+        ref = db.collection("companies").document("a")
+        ref.get()
+    assert 0.2 < db.stats.latency_seconds["get"] < 10
+
+def test_injected_errors_are_retried_by_bulk_writer(fake_client):
+    client, db = fake_client
+    db.errors = {"commit": 0.3}
+    failed = []
+
+    inserted = client.insert_articles([_article(i) for i in range(100)], lambda article, error: failed.append(article))
+
+    assert db.stats.errors > 0
+    assert len(inserted) + len(failed) == 100
+    assert db.document_count("articles") == len(inserted)
+
+def test_batch_is_atomic():
+    db = FakeFirestore()
+    db.collection("companies").document("a").set({"name": "A"})
+    batch = db.batch()
+    batch.set(db.collection("companies").document("b"), {"name": "B"})
+    batch.create(db.collection("companies").document("a"), {"name": "A2"})
+    with pytest.raises(exceptions.AlreadyExists):
+        batch.commit()
+    assert db.document_count("companies") == 1
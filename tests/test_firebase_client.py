@@ -1,11 +1,24 @@
 # tests/test_firebase_client.py
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch, MagicMock
-from src.data_access.firestore_client import FirestoreClient, ScrapingResult
+from src.data_access.bulk_writer import ALREADY_EXISTS
+from src.data_access.company_cache import clear_company_cache
+from src.data_access.firestore_client import FirestoreClient, ScrapingResult, clear_stats_cache
+from src.data_access.keys import article_doc_id
+from src.data_access.latest_feed import EPOCH, LatestFeed
+from src.data_access.models import ARTICLE_LIST_FIELDS, Article
+from src.data_access.url_filter import SeenUrlFilter
 
 @pytest.fixture
-def mock_firestore_client(monkeypatch):
+def url_filter(tmp_path):
+    seen = SeenUrlFilter(str(tmp_path / "seen.bloom"), capacity=1000, false_positive_rate=0.01)
+    seen.open()
+    yield seen
+    seen.close()
+
+@pytest.fixture
+def mock_firestore_client(monkeypatch, url_filter):
     """
     FirestoreClientのdbをモック化し、firestoreへの実アクセスを回避する
     """
@@ -14,11 +27,78 @@ def mock_firestore_client(monkeypatch):
     # dbオブジェクトをモックに差し替え
     mock_db = MagicMock()
     monkeypatch.setattr(client, "db", mock_db)
+    # 保存済みURLフィルタはテスト用の一時ファイルを使う
+    monkeypatch.setattr(client, "_url_filter", url_filter)
+    clear_stats_cache()
+    clear_company_cache()
 
     return client, mock_db
 
+class FakeBulkWriter:
+    """
+    BulkWriter の代わりに書き込みを記録し、結果・エラーのコールバックを同期的に呼ぶ
+    failures には {ドキュメントID: gRPCステータスコード} を指定する (成功するまで同じコードで失敗し続ける)
+    """
+
+    def __init__(self, failures=None):
+        self.failures = failures or {}
+        self.ops = []
+        self.closed = False
+
+    def on_write_result(self, callback):
+        self._on_result = callback
+
+    def on_write_error(self, callback):
+        self._on_error = callback
+
+    def _write(self, kind, reference, data=None):
+        self.ops.append((kind, reference.id, data))
+        code = self.failures.get(reference.id)
+        attempts = 0
+        while code is not None:
+            attempts += 1
+            failure = MagicMock(code=code, message="write failed", attempts=attempts)
+            failure.operation.reference = reference
+            if not self._on_error(failure, self):
+                return
+        self._on_result(reference, MagicMock(), self)
+
+    def create(self, reference, data):
+        self._write("create", reference, data)
+
+    def set(self, reference, data, merge=False):
+        self._write("set", reference, data)
+
+    def update(self, reference, data):
+        self._write("update", reference, data)
+
+    def delete(self, reference):
+        self._write("delete", reference)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+def use_bulk_writer(mock_db, failures=None):
+    """
+    ドキュメントID毎に別の参照を返し、bulk_writer() が FakeBulkWriter を返すようにする
+    """
+    def document(doc_id):
+        ref = MagicMock()
+        ref.id = doc_id
+        ref.path = f"articles/{doc_id}"
+        return ref
+
+    mock_db.collection.return_value.document.side_effect = document
+    writer = FakeBulkWriter(failures)
+    mock_db.bulk_writer.return_value = writer
+    return writer
+
 def test_save_articles(mock_firestore_client):
     client, mock_db = mock_firestore_client
+    writer = use_bulk_writer(mock_db)
 
     articles = [
         {
@@ -31,11 +111,156 @@ def test_save_articles(mock_firestore_client):
         }
     ]
 
-    # 重複チェックをモック
-    with patch.object(client, "_is_duplicate", return_value=False):
-        doc_ids = client.save_articles(articles, "B23000199")
-        assert len(doc_ids) == 1
-        assert mock_db.batch().set.call_count == 1
+    urls = client.save_articles(articles, "B23000199")
+    assert urls == ["http://example.com/test"]
+    # 読み取り無しで、URLから決まるIDに create する
+    assert [(kind, doc_id) for kind, doc_id, _ in writer.ops] == [("create", article_doc_id("http://example.com/test"))]
+    assert writer.ops[0][2]["company_id"] == "B23000199"
+    assert writer.closed
+    mock_db.collection().where.assert_not_called()
+
+def test_save_articles_returns_only_inserted_urls(mock_firestore_client):
+    client, mock_db = mock_firestore_client
+    # 既存記事の create は ALREADY_EXISTS (6) で失敗する
+    use_bulk_writer(mock_db, failures={article_doc_id("http://example.com/old"): ALREADY_EXISTS})
+    articles = [
+        {"title": t, "url": u, "published_at": datetime.now(), "source": "prtimes"}
+        for t, u in [("Old", "http://example.com/old"), ("New", "http://example.com/new"), ("New", "http://EXAMPLE.com/new#top")]
+    ]
+    assert client.save_articles(articles, "B23000199") == ["http://example.com/new"]
+
+def test_insert_articles_retries_transient_errors_and_reports_failures(mock_firestore_client, url_filter):
+    client, mock_db = mock_firestore_client
+    # UNAVAILABLE (14) は再試行上限まで、PERMISSION_DENIED (7) は再試行せずに失敗とする
+    writer = use_bulk_writer(mock_db, failures={
+        article_doc_id("http://example.com/flaky"): 14,
+        article_doc_id("http://example.com/denied"): 7
+    })
+    articles = [
+        {"title": t, "url": f"http://example.com/{t}", "published_at": datetime.now(), "source": "prtimes", "company_id": "B23000199"}
+        for t in ("ok", "flaky", "denied")
+    ]
+    failures = []
+
+    inserted = client.insert_articles(articles, on_failure=lambda article, error: failures.append((article["url"], error)))
+
+    assert inserted == ["http://example.com/ok"]
+    assert sorted(url for url, _ in failures) == ["http://example.com/denied", "http://example.com/flaky"]
+    errors = dict(failures)
+    assert errors["http://example.com/flaky"].attempts == client.config["batch"]["max_retry"]
+    assert errors["http://example.com/denied"].attempts == 1
+    assert len(writer.ops) == 3
+    # 失敗した記事は次回の実行で再度保存を試みられるよう、フィルタに追加しない
+    assert url_filter.might_contain("http://example.com/ok")
+    assert not url_filter.might_contain("http://example.com/denied")
+
+def test_update_articles_status(mock_firestore_client):
+    client, mock_db = mock_firestore_client
+    writer = use_bulk_writer(mock_db, failures={"missing": 5})
+
+    assert client.update_articles_status(["a", "missing", "b"], "archived") == ["a", "b"]
+    assert [(kind, doc_id) for kind, doc_id, _ in writer.ops] == [("update", "a"), ("update", "missing"), ("update", "b")]
+    assert writer.ops[0][2]["status"] == "archived"
+
+def test_insert_articles_increments_stats_for_inserted_only(mock_firestore_client):
+    client, mock_db = mock_firestore_client
+    use_bulk_writer(mock_db, failures={article_doc_id("http://example.com/old"): ALREADY_EXISTS})
+    articles = [
+        {"title": t, "url": f"http://example.com/{t}", "published_at": datetime(2024, 12, 1, 9),
+         "source": "prtimes", "company_id": "B23000199"}
+        for t in ("old", "new")
+    ]
+    client.insert_articles(articles)
+
+    batch = mock_db.batch.return_value
+    increments = {
+        (data["dimension"], data["value"]): data["count"].value
+        for (_, data), _ in batch.set.call_args_list
+    }
+    assert increments == {
+        ("total", "all"): 1, ("company", "B23000199"): 1, ("source", "prtimes"): 1,
+        ("day", "2024-12-01"): 1, ("status", "active"): 1
+    }
+    batch.commit.assert_called_once()
+
+def test_stats_fall_back_to_count_aggregation_and_are_cached(mock_firestore_client):
+    client, mock_db = mock_firestore_client
+    counts = {("company_id", "A"): 3, ("company_id", "B"): 5}
+
+    def where(field, op, value):
+        query = MagicMock()
+        # 分散カウンタは未作成
+        query.stream.return_value = []
+        query.count.return_value.get.return_value = [[MagicMock(value=counts.get((field, value), 0))]]
+        return query
+
+    mock_db.collection.return_value.where.side_effect = where
+    mock_db.collection.return_value.select.return_value.stream.return_value = [MagicMock(id="A"), MagicMock(id="B")]
+
+    assert client.get_articles_count_by_company() == {"A": 3, "B": 5}
+    count_calls = mock_db.collection.return_value.where.call_count
+
+    # 別のインスタンス (別リクエスト) からもキャッシュを共有する
+    other = FirestoreClient()
+    other.db = mock_db
+    assert other.get_articles_count_by_company() == {"A": 3, "B": 5}
+    assert mock_db.collection.return_value.where.call_count == count_calls
+
+def test_verify_stats_counters_reports_drift(mock_firestore_client, monkeypatch):
+    client, mock_db = mock_firestore_client
+    monkeypatch.setattr(client, "count_articles", lambda company_id=None, source=None: {None: 10, "A": 6, "B": 4}.get(company_id, 0) if not source else 10)
+    monkeypatch.setattr(client, "_company_ids", lambda: ["A", "B"])
+    counters = {"total": {"all": 10}, "company": {"A": 6, "B": 3}, "source": {"prtimes": 10}}
+    mock_db.collection.return_value.where.side_effect = lambda field, op, dimension: MagicMock(**{
+        "stream.return_value": [
+            MagicMock(**{"to_dict.return_value": {"value": value, "count": count}})
+            for value, count in counters[dimension].items()
+        ]
+    })
+    assert client.verify_stats_counters() == {("company", "B"): 1}
+
+def test_save_articles_reads_only_possible_matches(mock_firestore_client, url_filter):
+    client, mock_db = mock_firestore_client
+    writer = use_bulk_writer(mock_db)
+    url_filter.add("http://example.com/seen")
+    seen_doc = MagicMock()
+    seen_doc.to_dict.return_value = {"url": "http://example.com/seen"}
+    mock_db.collection().where().select().stream.return_value = [seen_doc]
+
+    articles = [
+        {"title": t, "url": u, "published_at": datetime.now(), "source": "prtimes"}
+        for t, u in [("Seen", "http://example.com/seen"), ("Fresh", "http://example.com/fresh")]
+    ]
+    assert client.save_articles(articles, "B23000199") == ["http://example.com/fresh"]
+    # フィルタに当たった1件のみを読み、確実に新規の記事は読まずに作成する
+    mock_db.collection().where.assert_called_with("url", "in", ["http://example.com/seen"])
+    assert [doc_id for _, doc_id, _ in writer.ops] == [article_doc_id("http://example.com/fresh")]
+    assert url_filter.might_contain("http://example.com/fresh")
+
+def test_find_existing_urls_chunks_in_queries(mock_firestore_client):
+    client, mock_db = mock_firestore_client
+    urls = [f"http://example.com/{n}" for n in range(65)] + ["http://example.com/0"]
+    chunks = []
+
+    def where(field, op, values):
+        chunks.append(values)
+        query = MagicMock()
+        docs = []
+        for url in values:
+            if url.endswith("0"):
+                doc = MagicMock()
+                doc.to_dict.return_value = {"url": url}
+                docs.append(doc)
+        query.select.return_value.stream.return_value = docs
+        return query
+
+    mock_db.collection.return_value.where.side_effect = where
+    existing = client.find_existing_urls(urls)
+
+    assert existing == {f"http://example.com/{n}" for n in range(0, 65, 10)}
+    # 重複を除いた65件を30件ずつ3回に分けて問い合わせる
+    assert sorted(len(chunk) for chunk in chunks) == [5, 30, 30]
+    assert client.find_existing_urls([]) == set()
 
 def test_save_scraping_result(mock_firestore_client):
     client, mock_db = mock_firestore_client
@@ -75,8 +300,137 @@ def test_get_recent_articles(mock_firestore_client):
         "updated_at": datetime.now(),
         "status": "active"
     }
-    mock_db.collection().where().where().where().order_by().limit().get.return_value = [mock_doc]
+    # company_id を省略した場合は status と published_at の2条件で絞り込む
+    mock_db.collection().where().where().order_by().limit().get.return_value = [mock_doc]
 
     articles = client.get_recent_articles(None, days=7)
     assert len(articles) == 1
     assert articles[0].title == "Recent Article"
+
+def test_iter_recent_articles_pages_with_cursor(mock_firestore_client):
+    client, mock_db = mock_firestore_client
+
+    def doc(n):
+        snapshot = MagicMock()
+        snapshot.id = str(n)
+        snapshot.to_dict.return_value = {
+            "company_id": "B23000199", "title": f"Article {n}", "url": f"http://example.com/{n}",
+            "published_at": datetime(2024, 12, 1) - timedelta(hours=n), "source": "prtimes"
+        }
+        return snapshot
+
+    pages = [[doc(n) for n in range(0, 3)], [doc(n) for n in range(3, 6)], [doc(6)]]
+    query = mock_db.collection().where().where().order_by().limit()
+    query.stream.return_value = pages[0]
+    cursors = []
+
+    def start_after(snapshot):
+        cursors.append(snapshot.id)
+        page = MagicMock()
+        page.stream.return_value = pages[len(cursors)]
+        return page
+
+    query.start_after.side_effect = start_after
+    articles = client.iter_recent_articles(since=datetime(2024, 11, 1), page_size=3)
+
+    assert next(articles).title == "Article 0"
+    # 最初のページを読み切るまで次のページは読まない
+    assert cursors == []
+    assert [a.id for a in articles] == [str(n) for n in range(1, 7)]
+    assert cursors == ["2", "5"]
+
+def test_article_from_projected_snapshot_loads_heavy_fields_lazily():
+    snapshot = MagicMock()
+    snapshot.id = "a1"
+    snapshot.to_dict.return_value = {
+        "company_id": "B23000199", "title": "Title", "url": "http://example.com/a1",
+        "published_at": datetime(2024, 12, 1), "source": "prtimes"
+    }
+    snapshot.reference.get.return_value.to_dict.return_value = {"content": "body", "image_url": None}
+
+    article = Article.from_snapshot(snapshot)
+    assert not hasattr(article, "__dict__")
+    # 一覧表示用の変換では本文を読まない
+    assert "content" not in article.to_dict()
+    snapshot.reference.get.assert_not_called()
+
+    assert article.content == "body"
+    assert article.image_url is None
+    snapshot.reference.get.assert_called_once_with(field_paths=["content", "image_url"])
+    assert article.to_dict()["content"] == "body"
+
+def test_iter_recent_articles_projects_list_fields(mock_firestore_client):
+    client, mock_db = mock_firestore_client
+    query = mock_db.collection().where().where()
+    query.select.return_value.order_by.return_value.limit.return_value.stream.return_value = []
+
+    assert list(client.iter_recent_articles(fields=ARTICLE_LIST_FIELDS)) == []
+    query.select.assert_called_once_with(ARTICLE_LIST_FIELDS)
+
+def _feed_item(n, company_id="A"):
+    return {"id": str(n), "company_id": company_id, "title": f"Article {n}", "url": f"http://example.com/{n}",
+            "published_at": datetime(2024, 12, 1) - timedelta(hours=n), "source": "prtimes"}
+
+def test_insert_articles_fans_out_to_latest_feeds(mock_firestore_client, monkeypatch):
+    client, mock_db = mock_firestore_client
+    use_bulk_writer(mock_db)
+    applied = []
+    monkeypatch.setattr(LatestFeed, "apply", lambda self, added=(), removed=(): applied.append((added, removed)))
+
+    client.insert_articles([{**_feed_item(0, "B23000199"), "company_id": "B23000199"}])
+    (added, removed), = applied
+    assert removed == ()
+    assert added == [{**_feed_item(0, "B23000199"), "id": article_doc_id("http://example.com/0")}]
+
+def test_list_reads_use_latest_feed_document(mock_firestore_client):
+    client, mock_db = mock_firestore_client
+    feed = MagicMock(exists=True)
+    feed.to_dict.return_value = {"items": [_feed_item(n) for n in range(3)], "covers_from": EPOCH}
+    mock_db.collection().document().get.return_value = feed
+
+    latest = client.get_latest_articles(limit=2, fields=ARTICLE_LIST_FIELDS)
+    assert [article["id"] for article in latest] == ["0", "1"]
+    recent = client.get_recent_articles("A", days=100000, limit=10, fields=ARTICLE_LIST_FIELDS)
+    assert [article.title for article in recent] == ["Article 0", "Article 1", "Article 2"]
+    mock_db.collection().order_by.assert_not_called()
+    mock_db.collection().select.assert_not_called()
+
+def test_company_info_reads_through_registry_and_invalidates_on_save(mock_firestore_client):
+    client, mock_db = mock_firestore_client
+    saved = MagicMock()
+    mock_db.collection.return_value.document.side_effect = lambda company_id: MagicMock(id=company_id) if company_id != "A" else saved
+    saved.id = "A"
+
+    def get_all(refs):
+        for ref in refs:
+            snapshot = MagicMock(id=ref.id, exists=ref.id != "missing")
+            snapshot.to_dict.return_value = {"company_id": ref.id, "name": f"Company {ref.id}"}
+            yield snapshot
+
+    mock_db.get_all.side_effect = get_all
+    assert client.get_company_names(["A", "B", "missing"]) == {"A": "Company A", "B": "Company B"}
+    # キャッシュに無い企業は1回の get_all で読む
+    assert mock_db.get_all.call_count == 1
+    assert [ref.id for ref in mock_db.get_all.call_args.args[0]] == ["A", "B", "missing"]
+
+    assert client.get_company_info("missing") is None
+    assert mock_db.get_all.call_count == 1
+
+    client.save_company_info({"company_id": "A", "name": "Renamed"})
+    saved.get.assert_not_called()
+    assert saved.set.call_args.kwargs == {"merge": True}
+    client.get_company_info("A")
+    assert mock_db.get_all.call_count == 2
+
+def test_get_watermark_returns_naive_datetime(mock_firestore_client):
+    client, mock_db = mock_firestore_client
+    mock_doc = MagicMock()
+    mock_doc.exists = True
+    mock_doc.to_dict.return_value = {
+        "url": "https://prtimes.jp/release/1",
+        "published_at": datetime(2024, 12, 1, 12, 34, tzinfo=timezone.utc)
+    }
+    mock_db.collection().document().get.return_value = mock_doc
+
+    watermark = client.get_watermark("B23000199", "prtimes")
+    assert watermark == {"url": "https://prtimes.jp/release/1", "published_at": datetime(2024, 12, 1, 12, 34)}
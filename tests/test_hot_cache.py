@@ -0,0 +1,85 @@
+# tests/test_hot_cache.py
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from src.data_access.hot_cache import RecentArticlesMirror
+
+def _feed_item(n, company_id="A"):
+    return {"id": str(n), "company_id": company_id, "title": f"Article {n}", "url": f"http://example.com/{n}",
+            "published_at": datetime(2024, 12, 1) - timedelta(hours=n), "source": "prtimes"}
+
+def _article_snapshot(n, company_id="A", hours_ago=None):
+    snapshot = MagicMock()
+    snapshot.id = str(n)
+    snapshot.to_dict.return_value = {**_feed_item(n, company_id), "content": "body",
+                                     "published_at": datetime(2024, 12, 1) - timedelta(hours=n if hours_ago is None else hours_ago)}
+    return snapshot
+
+def _change(kind, snapshot):
+    change = MagicMock()
+    change.type.name = kind
+    change.document = snapshot
+    return change
+
+def test_recent_articles_mirror_follows_snapshots_and_evicts_by_age():
+    clock = [0.0]
+    now = [datetime(2024, 12, 1)]
+    query = MagicMock()
+    mirror = RecentArticlesMirror(lambda since: query, days=2, mode="listen", poll_interval=3600,
+                                  max_staleness=60, clock=lambda: clock[0], now=lambda: now[0])
+    query.on_snapshot.side_effect = lambda callback: callback(
+        None, [_change("ADDED", _article_snapshot(n, "A" if n % 2 else "B")) for n in range(4)], None
+    ) or MagicMock()
+    assert mirror.start(timeout=1)
+    on_snapshot = query.on_snapshot.call_args.args[0]
+
+    assert [a.id for a in mirror.recent()] == ["0", "1", "2", "3"]
+    assert [a.id for a in mirror.recent("A", limit=1)] == ["1"]
+    # 一覧用のフィールドのみ保持し、本文は持たない
+    assert "content" not in mirror.recent()[0].to_dict()
+
+    on_snapshot(None, [_change("REMOVED", _article_snapshot(1)), _change("MODIFIED", _article_snapshot(0, "A", 30))], None)
+    assert [a.id for a in mirror.recent("A")] == ["3", "0"]
+
+    # 公開日時が期間外になった記事は捨てる
+    now[0] = datetime(2024, 12, 2, 20, 30)
+    on_snapshot(None, [], None)
+    assert [a.id for a in mirror.recent()] == ["2", "3"]
+    assert mirror.evicted_by_age == 1
+    # 期間より前からの一覧は答えない
+    assert mirror.recent(since=datetime(2024, 11, 29)) is None
+
+    clock[0] = 61
+    assert mirror.recent() is None
+    assert mirror.stats()["staleness_seconds"] == 61
+    mirror.stop()
+
+def test_recent_articles_mirror_polling_is_bounded():
+    query = MagicMock()
+    query.stream.return_value = [_article_snapshot(n) for n in range(5)]
+    mirror = RecentArticlesMirror(lambda since: query, days=7, max_articles=3, mode="poll", poll_interval=3600,
+                                  now=lambda: datetime(2024, 12, 1))
+    assert mirror.start(timeout=1)
+    assert [a.id for a in mirror.recent(since=datetime(2024, 11, 30, 21, 30))] == ["0", "1", "2"]
+    # 件数の上限で捨てた記事を含む期間には答えない
+    assert mirror.recent(since=datetime(2024, 11, 30, 20)) is None
+    assert mirror.stats()["evicted_by_size"] == 2
+    mirror.stop()
+
+def test_recent_articles_mirror_answers_its_own_window_after_time_passes():
+    ticks = [datetime(2024, 12, 1)]
+
+    def now():
+        # 呼び出す度に時刻が進む
+        ticks[0] += timedelta(milliseconds=1)
+        return ticks[0]
+
+    query = MagicMock()
+    query.stream.return_value = [_article_snapshot(n) for n in range(3)]
+    mirror = RecentArticlesMirror(lambda since: query, days=7, mode="poll", poll_interval=3600, now=now)
+    assert mirror.start(timeout=1)
+
+    # 呼び出し側が「7日前」を計算した後に時刻が進んでも、同じ日数の一覧に答える
+    since = now() - timedelta(days=7)
+    assert [a.id for a in mirror.recent(since=since)] == ["0", "1", "2"]
+    assert mirror.recent(since=datetime(2024, 11, 23, 23)) is None
+    mirror.stop()
@@ -0,0 +1,15 @@
+# tests/test_keys.py
+from src.data_access.keys import article_doc_id, normalize_article_url, normalize_url
+
+def test_article_doc_id_is_stable_across_url_variants():
+    base = "https://prtimes.jp/main/html/rd/p/000000001.000000002.html"
+    assert normalize_article_url("HTTPS://PRTimes.jp:443/main/html/rd/p/000000001.000000002.html?utm_source=x#a") == base
+    assert article_doc_id(base + "?utm_medium=slack") == article_doc_id(base)
+    assert article_doc_id(base + "?b=2&a=1") == article_doc_id(base + "?a=1&b=2")
+    assert article_doc_id(base) != article_doc_id(base.replace("000000001", "000000003"))
+    assert len(article_doc_id(base)) == 64
+
+def test_normalize_url_drops_tracking_params_only_when_asked():
+    url = "https://PRTimes.jp:8443/list?utm_source=x&page=2#top"
+    assert normalize_url(url) == "https://prtimes.jp:8443/list?page=2&utm_source=x"
+    assert normalize_url(url, drop_tracking=True) == "https://prtimes.jp:8443/list?page=2"
@@ -0,0 +1,30 @@
+# tests/test_latest_feed.py
+from datetime import datetime, timedelta
+from src.data_access.latest_feed import EPOCH, merge_feed, read_feed
+
+def _feed_item(n, company_id="A"):
+    return {"id": str(n), "company_id": company_id, "title": f"Article {n}", "url": f"http://example.com/{n}",
+            "published_at": datetime(2024, 12, 1) - timedelta(hours=n), "source": "prtimes"}
+
+def test_latest_feed_merge_keeps_newest_and_tracks_coverage():
+    items, covers_from = merge_feed([], EPOCH, [_feed_item(n) for n in range(5)], size=3)
+    assert [item["id"] for item in items] == ["0", "1", "2"]
+    # 切り詰めた後は、残した最古の記事以降のみを網羅している
+    assert covers_from == datetime(2024, 12, 1) - timedelta(hours=2)
+    # 網羅している範囲より古い記事は、間の記事が欠けるため追加しない
+    items, covers_from = merge_feed(items, covers_from, [_feed_item(10)], removed_ids=["1"], size=3)
+    assert [item["id"] for item in items] == ["0", "2"]
+
+    assert [i["id"] for i in read_feed(items, covers_from, None, 2)] == ["0", "2"]
+    assert read_feed(items, covers_from, datetime(2024, 11, 1), 3) is None
+    assert [i["id"] for i in read_feed(items, covers_from, datetime(2024, 11, 30, 22), 3)] == ["0", "2"]
+    assert read_feed([_feed_item(0)], EPOCH, None, 5) == [_feed_item(0)]
+
+def test_latest_feed_coverage_excludes_a_partly_dropped_timestamp():
+    tied = datetime(2024, 12, 1) - timedelta(hours=1)
+    added = [_feed_item(0), _feed_item(1), {**_feed_item(2), "published_at": tied}]
+    items, covers_from = merge_feed([], EPOCH, added, size=2)
+    assert len(items) == 2
+    # 同時刻の記事の一方を落としたため、その時刻はフィードだけでは答えない
+    assert covers_from > tied
+    assert read_feed(items, covers_from, tied, 3) is None
@@ -0,0 +1,115 @@
+# tests/test_ndjson_transfer.py
+import gzip
+import pytest
+from datetime import datetime, timezone
+from google.api_core import exceptions
+from src.data_access.fake_firestore import FakeFirestore
+from src.data_access.ndjson_transfer import (
+    Checkpoint, decode_document, encode_document, export_collection, import_collection
+)
+
+def _seed(db, count):
+    for i in range(count):
+        db.collection("articles").document(f"doc{i:03d}").set({
+            "title": f"記事 {i}",
+            "published_at": datetime(2024, 1, 1, i % 24),
+            "tags": ["a", {"nested": datetime(2024, 2, 1)}],
+            "raw": b"\x00\x01",
+            "count": i
+        })
+
+def _lines(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [line for line in f if line.strip()]
+
+def test_encode_roundtrip_keeps_types():
+    line = encode_document("a", {"at": datetime(2024, 1, 1), "raw": b"x", "items": [1, None], "ok": True})
+    assert decode_document(line) == ("a", {
+        "at": datetime(2024, 1, 1, tzinfo=timezone.utc), "raw": b"x", "items": [1, None], "ok": True
+    })
+    with pytest.raises(TypeError):
+        encode_document("a", {"value": object()})
+
+def test_export_and_import_roundtrip(tmp_path):
+    source = FakeFirestore()
+    _seed(source, 25)
+    path = str(tmp_path / "articles.ndjson.gz")
+
+    stats = export_collection(source, "articles", path, Checkpoint(str(tmp_path / "export.json")), page_size=10)
+    assert stats.documents == 25
+    assert stats.bytes > 0
+    assert len(_lines(path)) == 25
+    # 1ページ分ずつ読み進める (25件を10件ずつ)
+    assert source.stats.ops["query"] == 3
+
+    target = FakeFirestore()
+    stats = import_collection(target, "articles", path, Checkpoint(str(tmp_path / "import.json")), batch_size=7, workers=3)
+    assert stats.documents == 25
+    assert target.document_count("articles") == 25
+    assert target.collection("articles").document("doc003").get().to_dict() == \
+        source.collection("articles").document("doc003").get().to_dict()
+
+def test_export_resumes_from_checkpoint(tmp_path):
+    db = FakeFirestore()
+    _seed(db, 25)
+    path = str(tmp_path / "articles.ndjson.gz")
+    checkpoint_path = str(tmp_path / "export.json")
+
+    # 2ページ目を書き終えた時点で止まり、書きかけのデータが残った状態にする
+    checkpoint = Checkpoint(checkpoint_path)
+    original_update = checkpoint.update
+
+    def stop_after_second_page(collection, **state):
+        original_update(collection, **state)
+        if state.get("documents") == 20:
+            raise KeyboardInterrupt
+
+    checkpoint.update = stop_after_second_page
+    with pytest.raises(KeyboardInterrupt):
+        export_collection(db, "articles", path, checkpoint, page_size=10)
+    with open(path, "ab") as f:
+        f.write(b"partial garbage")
+
+    stats = export_collection(db, "articles", path, Checkpoint(checkpoint_path), page_size=10)
+    assert stats.resumed_from == 20
+    assert stats.documents == 25
+    ids = [decode_document(line)[0] for line in _lines(path)]
+    assert ids == [f"doc{i:03d}" for i in range(25)]
+
+    # 完了済みのコレクションは読み直さない
+    db.reset_stats()
+    export_collection(db, "articles", path, Checkpoint(checkpoint_path), page_size=10)
+    assert db.stats.ops["query"] == 0
+
+def test_import_resumes_after_failure(tmp_path):
+    source = FakeFirestore()
+    _seed(source, 30)
+    path = str(tmp_path / "articles.ndjson.gz")
+    export_collection(source, "articles", path, Checkpoint(str(tmp_path / "export.json")))
+
+    checkpoint_path = str(tmp_path / "import.json")
+    target = FakeFirestore(errors={"commit": 1.0})
+    with pytest.raises(exceptions.ServiceUnavailable):
+        import_collection(target, "articles", path, Checkpoint(checkpoint_path),
+                          batch_size=10, workers=1, max_attempts=2, sleep=lambda seconds: None)
+    assert Checkpoint(checkpoint_path).get("articles").get("documents", 0) == 0
+
+    target.errors = {}
+    stats = import_collection(target, "articles", path, Checkpoint(checkpoint_path), batch_size=10, workers=2)
+    assert stats.documents == 30
+    assert target.document_count("articles") == 30
+    assert Checkpoint(checkpoint_path).get("articles") == {"documents": 30, "done": True}
+
+def test_import_skips_committed_lines(tmp_path):
+    source = FakeFirestore()
+    _seed(source, 30)
+    path = str(tmp_path / "articles.ndjson.gz")
+    export_collection(source, "articles", path, Checkpoint(str(tmp_path / "export.json")))
+
+    checkpoint = Checkpoint(str(tmp_path / "import.json"))
+    checkpoint.update("articles", documents=20)
+    target = FakeFirestore()
+    stats = import_collection(target, "articles", path, checkpoint, batch_size=10)
+    assert stats.resumed_from == 20
+    assert target.document_count("articles") == 10
+    assert target.collection("articles").document("doc019").get().exists is False
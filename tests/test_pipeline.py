@@ -0,0 +1,102 @@
+# tests/test_pipeline.py
+import asyncio
+from src.pipeline import Pipeline, Stage
+
+def test_pipeline_batches_and_collects_outputs():
+    batch_sizes = []
+
+    async def double(batch):
+        return [n * 2 for n in batch]
+
+    async def collect(batch):
+        batch_sizes.append(len(batch))
+        return batch
+
+    pipeline = Pipeline([
+        Stage("double", double, workers=3),
+        Stage("collect", collect, batch_size=10, batch_timeout=0.05)
+    ])
+    outputs = asyncio.run(pipeline.run(range(25)))
+
+    assert sorted(outputs) == [n * 2 for n in range(25)]
+    assert max(batch_sizes) > 1
+    assert all(size <= 10 for size in batch_sizes)
+    stats = {s.name: s.to_dict() for s in pipeline.stats}
+    assert stats["double"]["items"] == stats["collect"]["items"] == 25
+    assert stats["collect"]["batches"] == len(batch_sizes)
+
+def test_pipeline_backpressure_bounds_in_flight_items():
+    in_flight = {"now": 0, "max": 0}
+
+    async def produce(batch):
+        in_flight["now"] += len(batch)
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        return batch
+
+    async def slow_consume(batch):
+        await asyncio.sleep(0.001)
+        in_flight["now"] -= len(batch)
+        return batch
+
+    pipeline = Pipeline([
+        Stage("produce", produce, queue_size=1),
+        Stage("consume", slow_consume, queue_size=2)
+    ])
+    outputs = asyncio.run(pipeline.run(range(50)))
+
+    assert len(outputs) == 50
+    # 下流のキュー (2) + 処理中 (1) + 上流で待機中 (1) を超えて溜まらない
+    assert in_flight["max"] <= 4
+    assert pipeline.stats[1].max_queue <= 2
+
+def test_pipeline_stage_error_drops_batch_and_continues():
+    async def flaky(batch):
+        if 3 in batch:
+            raise RuntimeError("boom")
+        return batch
+
+    pipeline = Pipeline([Stage("flaky", flaky)])
+    outputs = asyncio.run(pipeline.run(range(6)))
+
+    assert sorted(outputs) == [0, 1, 2, 4, 5]
+    assert pipeline.stats[0].errors == 1
+
+def test_pipeline_stage_error_handler_passes_failed_items_downstream():
+    async def persist(batch):
+        if 3 in batch:
+            raise RuntimeError("boom")
+        return [(n, "ok") for n in batch]
+
+    async def report(batch):
+        return batch
+
+    pipeline = Pipeline([
+        Stage("persist", persist, batch_size=2, on_error=lambda batch, e: [(n, str(e)) for n in batch]),
+        Stage("report", report)
+    ])
+    outputs = asyncio.run(pipeline.run(range(6)))
+
+    # 失敗したバッチの要素も、失敗として最後の段まで届く
+    assert sorted(n for n, _ in outputs) == list(range(6))
+    assert (3, "boom") in outputs
+    assert sum(1 for _, status in outputs if status == "boom") == pipeline.stats[0].errors
+    assert pipeline.stats[1].items == 6
+
+def test_pipeline_survives_failing_error_handler():
+    async def persist(batch):
+        if 3 in batch:
+            raise RuntimeError("boom")
+        return batch
+
+    def broken_on_error(batch, error):
+        raise ValueError("on_error failed")
+
+    async def report(batch):
+        return batch
+
+    pipeline = Pipeline([Stage("persist", persist, on_error=broken_on_error), Stage("report", report)])
+    # on_error が失敗したバッチは捨て、ワーカーは止まらずに最後まで流れる
+    outputs = asyncio.run(asyncio.wait_for(pipeline.run(range(6)), timeout=5))
+
+    assert sorted(outputs) == [0, 1, 2, 4, 5]
+    assert pipeline.stats[0].errors == 1
@@ -1,7 +1,10 @@
 # tests/test_run_script.py
+import asyncio
 import pytest
+from datetime import datetime
 from unittest.mock import patch, MagicMock
 from src.run_script import NewsCollector
+from src.scrapers.prtimes_scraper import IncrementalListing
 from src.data_access.models import ScrapingResult
 
 @pytest.fixture
@@ -23,18 +26,35 @@ def test_run_successful(mock_collector):
         ]
     }
 
-    with patch("src.scrapers.prtimes_scraper.PRTimesScraper.get_news", return_value=[
-        {"title": "Article1", "url": "http://example.com/1", "published_at": None, "source": "prtimes"}
-    ]):
-        mock_db.save_articles.return_value = ["fake_doc_id"]
+    with patch("src.scrapers.prtimes_scraper.PRTimesScraper.get_news_since_async", return_value=IncrementalListing([
+        {"title": "Article1", "url": "http://example.com/1", "published_at": datetime(2024, 12, 1, 12, 34), "source": "prtimes"}
+    ])):
+        mock_db.insert_articles.return_value = ["http://example.com/1"]
         
         collector.run()
+        # 企業IDを付けてまとめて保存されたか
+        saved = mock_db.insert_articles.call_args.args[0]
+        assert [a["company_id"] for a in saved] == ["B23000199"]
+        # 新規作成された記事のみが企業をまとめて通知されたか
+        groups = mock_notifier.notify_new_articles_digest.call_args.args[0]
+        assert [(name, [a["url"] for a in articles]) for name, articles in groups] == [
+            ("TestCompany", ["http://example.com/1"])
+        ]
+        mock_db._is_duplicate.assert_not_called()
         # スクレイピング結果通知が呼ばれたか
         assert mock_notifier.notify_scraping_result.call_count == 1
+        # 保存後に最高水位が更新されたか
+        mock_db.update_watermark.assert_called_once_with(
+            "B23000199", "prtimes", "http://example.com/1", datetime(2024, 12, 1, 12, 34)
+        )
 
-def test_process_company_disabled_scraping(mock_collector):
+def test_collect_all_skips_disabled_scraping(mock_collector):
     collector, mock_db, mock_notifier = mock_collector
-    company = {"id": "B99999999", "name": "DisabledCorp", "prtimes": {"enabled": False}}
-    # prtimes が disabled の場合、ScrapingResult 0件で success=True / articles_count=0のまま返す
-    results = collector._process_company(company)
-    assert len(results) == 0, "enabled=Falseの場合はスクレイピングを実行しない"
+    collector.config["companies"] = [{"id": "B99999999", "name": "DisabledCorp", "prtimes": {"enabled": False}}]
+
+    # prtimes が disabled の企業はパイプラインの取得段に流さない
+    with patch("src.scrapers.prtimes_scraper.PRTimesScraper.get_news_since_async") as get_news_since_async:
+        results = asyncio.run(collector._collect_all())
+    assert results == [], "enabled=Falseの場合はスクレイピングを実行しない"
+    get_news_since_async.assert_not_called()
+    mock_db.get_watermark.assert_not_called()
@@ -1,15 +1,42 @@
 # tests/test_scrapers.py
+import asyncio
+import json
+import threading
+import aiohttp
 import pytest
-from unittest.mock import patch, MagicMock
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch, MagicMock, AsyncMock
+from src.scrapers.base_scraper import FetchError
 from src.scrapers.prtimes_scraper import PRTimesScraper
+from src.scrapers.async_fetcher import AsyncFetcher, FetchResponse
+from src.scrapers.http_cache import Validator, ValidatorStore
+from src.scrapers.parsers import get_parser
+from src.scrapers.embedded_json import extract_listing_records
+from src.scrapers.rate_limiter import Backoff, HostRateLimiter, RetryBudget, TokenBucket, parse_retry_after
+from src.scrapers.session_pool import SessionRegistry, get_shared_session
+from src.scrapers.response_cache import ResponseCache, normalize_url
+from src.scrapers.parse_pool import ParsePool, _extract_in_worker
+from src.scrapers.prtimes_extractor import PRTimesExtractor
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+@pytest.fixture
+def validator_store(tmp_path):
+    return ValidatorStore(str(tmp_path / "validators.json"))
+
+@pytest.fixture
+def rate_limiter():
+    return HostRateLimiter(rate=1000, burst=1000)
 
 @pytest.fixture
-def mock_scraper():
-    return PRTimesScraper()
+def mock_scraper(validator_store, rate_limiter):
+    return PRTimesScraper(validator_store=validator_store, rate_limiter=rate_limiter)
 
 def test_prtimes_scraper_get_news_empty(mock_scraper):
-    # _fetch_page が None を返す場合
-    with patch.object(mock_scraper, "_fetch_page", return_value=None):
+    # _fetch_html が None を返す場合
+    with patch.object(mock_scraper, "_fetch_html", return_value=None):
         articles = mock_scraper.get_news("https://prtimes.jp/main/html/searchrlp/company_id/99999")
         assert articles == []
 
@@ -30,47 +57,496 @@ def test_prtimes_scraper_get_news_ok(mock_scraper):
     </html>
     """
 
-    with patch.object(mock_scraper, "_fetch_page", return_value=MagicMock()) as mock_page:
-        # BeautifulSoup の振る舞いを模擬
-        mock_page.return_value.find_all.return_value = [MagicMock()]
-        # find_all() が返す article の中身をさらにモック化
-        mock_article = MagicMock()
-        mock_page.return_value.find_all.return_value = [mock_article]
-
-        # 各 find の戻り値を細かく指定
-        title_elem = MagicMock()
-        title_elem.find.return_value = MagicMock()
-        title_elem.find.return_value.text = "サンプル記事タイトル"
-        title_elem.find.return_value.attrs = {'href': '/release/12345'}
-
-        # time要素
-        time_elem = MagicMock()
-        time_elem.text = "2024年12月01日 12:34"
-
-        # img要素
-        img_elem = MagicMock()
-        img_elem.attrs = {'src': 'https://prtimes.jp/img/sample.png'}
-
-        # p要素
-        content_elem = MagicMock()
-        content_elem.text = "これはサマリーです"
-
-        # mock_article.find() の返り値を属性に応じて返す設定
-        def mock_find(tag, class_=None):
-            if tag == 'h2' and class_ == 'list-article_title':
-                return title_elem
-            elif tag == 'time':
-                return time_elem
-            elif tag == 'img' and class_ == 'list-article_image':
-                return img_elem
-            elif tag == 'p' and class_ == 'list-article__summary':
-                return content_elem
-            return None
-
-        mock_article.find.side_effect = mock_find
-
+    with patch.object(mock_scraper, "_fetch_html", return_value=html_content):
         articles = mock_scraper.get_news("https://prtimes.jp/any_url")
         assert len(articles) == 1
         assert articles[0]['title'] == "サンプル記事タイトル"
+        assert articles[0]['url'] == "https://prtimes.jp/release/12345"
         assert "2024-12-01" in articles[0]['published_at'].isoformat()
+        assert articles[0]['image_url'] == "https://prtimes.jp/img/sample.png"
         assert articles[0]['content'] == "これはサマリーです"
+
+@pytest.mark.parametrize("backend", ["html.parser", "bs4-lxml", "lxml"])
+def test_parser_backends_agree_on_fixture(backend):
+    html = (FIXTURES_DIR / "prtimes_listing.html").read_text(encoding="utf-8")
+    records = get_parser(backend).parse(html)
+    assert len(records) == 40
+    assert records == get_parser("html.parser").parse(html)
+    assert records[0]['href'] == "/main/html/rd/p/0000000100.000057826.html"
+
+def test_parser_backend_fallback():
+    # 未インストールの任意依存はデフォルトにフォールバックする
+    with patch.dict("src.scrapers.parsers.PARSER_BACKENDS", {"selectolax": MagicMock(side_effect=ImportError)}):
+        assert get_parser("selectolax").name == "lxml"
+    with pytest.raises(ValueError):
+        get_parser("unknown")
+
+LISTING_HTML = """
+<html>
+  <body>
+    <article class="list-article">
+      <h2 class="list-article_title">
+        <a href="/release/12345">サンプル記事タイトル</a>
+      </h2>
+      <time>2024年12月01日 12:34</time>
+      <p class="list-article__summary">これはサマリーです</p>
+    </article>
+  </body>
+</html>
+"""
+
+@pytest.mark.asyncio
+async def test_prtimes_scraper_get_news_async(mock_scraper):
+    fetcher = MagicMock()
+    fetcher.fetch = AsyncMock(return_value=FetchResponse(
+        status=200, content=LISTING_HTML.encode(), text=LISTING_HTML
+    ))
+
+    articles = await mock_scraper.get_news_async("https://prtimes.jp/any_url", fetcher)
+    fetcher.fetch.assert_awaited_once_with("https://prtimes.jp/any_url", headers={})
+    assert len(articles) == 1
+    assert articles[0]['url'] == "https://prtimes.jp/release/12345"
+    assert articles[0]['content'] == "これはサマリーです"
+
+@pytest.mark.asyncio
+async def test_prtimes_scraper_get_news_async_fetch_failed(mock_scraper):
+    fetcher = MagicMock()
+    fetcher.fetch = AsyncMock(side_effect=aiohttp.ClientConnectionError("refused"))
+    mock_scraper.backoff = Backoff(base=0)
+
+    articles = await mock_scraper.get_news_async("https://prtimes.jp/any_url", fetcher)
+    assert articles == []
+
+@pytest.mark.asyncio
+async def test_async_fetcher_replaces_undecodable_bytes():
+    from aiohttp import web
+
+    async def broken_page(request):
+        return web.Response(body="記事".encode("utf-8") + b"\xff", content_type="text/html", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/", broken_page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with AsyncFetcher() as fetcher:
+            response = await fetcher.fetch(f"http://127.0.0.1:{port}/")
+    finally:
+        await runner.cleanup()
+    # 不正なバイト列が混ざっていても例外にせず、置換文字にして本文を返す
+    assert response.text == "記事\ufffd"
+
+def test_async_fetcher_host_semaphore():
+    fetcher = AsyncFetcher(max_concurrency=8, per_host_limit=2)
+    a = fetcher._host_semaphore("https://prtimes.jp/a")
+    b = fetcher._host_semaphore("https://PRTIMES.jp/b")
+    c = fetcher._host_semaphore("https://example.com/")
+    assert a is b
+    assert a is not c
+    assert a._value == 2
+
+def _response(status, body=b"", headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.content = body
+    response.text = body.decode()
+    response.headers = headers or {}
+    return response
+
+def test_conditional_get_not_modified(mock_scraper, validator_store):
+    url = "https://prtimes.jp/main/html/searchrlp/company_id/57826"
+    body = LISTING_HTML.encode()
+    first = _response(200, body, {"ETag": '"abc"', "Last-Modified": "Sun, 01 Dec 2024 03:34:00 GMT"})
+
+    with patch.object(mock_scraper.session, "get", return_value=first):
+        assert len(mock_scraper.get_news(url)) == 1
+    validator_store.flush()
+
+    # 別インスタンスでもファイル経由で検証子が共有される
+    reloaded = PRTimesScraper(validator_store=ValidatorStore(validator_store.path), rate_limiter=mock_scraper.rate_limiter)
+    with patch.object(reloaded.session, "get", return_value=_response(304)) as mock_get:
+        with patch.object(reloaded, "_parse_html") as mock_parse:
+            assert reloaded.get_news(url) == []
+            mock_parse.assert_not_called()
+    sent_headers = mock_get.call_args.kwargs["headers"]
+    assert sent_headers["If-None-Match"] == '"abc"'
+    assert sent_headers["If-Modified-Since"] == "Sun, 01 Dec 2024 03:34:00 GMT"
+    assert reloaded.cache_stats.hits == 1
+    assert reloaded.cache_stats.bytes_saved == len(body)
+
+def test_validator_store_buffers_writes_and_merges_on_flush(validator_store):
+    validator_store.put("https://prtimes.jp/a", Validator(etag='"a"'))
+    validator_store.put("https://prtimes.jp/b", Validator(etag='"b"'))
+    # flush するまでファイルには書かない
+    assert not Path(validator_store.path).exists()
+    validator_store.flush()
+
+    # 別プロセスが同じファイルに書いた検証子は、flush で上書きされず残る
+    other = ValidatorStore(validator_store.path)
+    other.put("https://prtimes.jp/c", Validator(etag='"c"'))
+    other.flush()
+    validator_store.discard("https://prtimes.jp/a")
+    validator_store.flush()
+
+    reloaded = ValidatorStore(validator_store.path)
+    assert reloaded.get("https://prtimes.jp/a") is None
+    assert reloaded.get("https://prtimes.jp/b").etag == '"b"'
+    assert reloaded.get("https://prtimes.jp/c").etag == '"c"'
+
+def test_conditional_get_same_body_hash(mock_scraper):
+    url = "https://prtimes.jp/main/html/searchrlp/company_id/57826"
+    body = LISTING_HTML.encode()
+
+    with patch.object(mock_scraper.session, "get", return_value=_response(200, body)):
+        assert len(mock_scraper.get_news(url)) == 1
+        with patch.object(mock_scraper, "_parse_html") as mock_parse:
+            assert mock_scraper.get_news(url) == []
+            mock_parse.assert_not_called()
+
+    assert mock_scraper.cache_stats.misses == 1
+    assert mock_scraper.cache_stats.hits == 1
+    assert mock_scraper.cache_stats.bytes_saved == 0
+
+def test_embedded_json_preferred_over_dom(mock_scraper):
+    html = (FIXTURES_DIR / "prtimes_listing_next_data.html").read_text(encoding="utf-8")
+
+    with patch.object(mock_scraper, "_fetch_html", return_value=html):
+        with patch.object(mock_scraper.parser, "parse") as mock_parse:
+            articles = mock_scraper.get_news("https://prtimes.jp/main/html/searchrlp/company_id/57826")
+            mock_parse.assert_not_called()
+
+    assert len(articles) == 40
+    assert articles[0]['url'] == "https://prtimes.jp/main/html/rd/p/000000100.000057826.html"
+    assert articles[0]['published_at'] == datetime(2024, 11, 30, 9, 0)
+    assert articles[0]['image_url'].endswith("d57826-100-sample.png")
+    assert articles[0]['content'] == "サンプル0は企業向けのサービスです。"
+
+def test_embedded_json_unknown_list_key_and_id_urls():
+    payload = {"props": {"pageProps": {"data": {"items": [
+        {"release_id": 7, "company_id": 57826, "title": "タイトル", "releasedAt": "2024-12-01T03:34:00Z"}
+    ]}}}}
+    html = f'<html><script id="__NEXT_DATA__" type="application/json">{json.dumps(payload)}</script></html>'
+
+    records = extract_listing_records(html)
+    assert records == [{
+        'title': "タイトル",
+        'href': "/main/html/rd/p/000000007.000057826.html",
+        'published': "2024-12-01T03:34:00Z",
+        'image_url': None,
+        'summary': None
+    }]
+    # UTCはJSTのnaiveなdatetimeに変換される
+    assert PRTimesScraper()._parse_prtimes_date(records[0]['published']) == datetime(2024, 12, 1, 12, 34)
+
+def test_embedded_json_with_non_numeric_ids_falls_back_to_dom(mock_scraper):
+    dom = _listing_page(30, 2)
+    for releases in (
+        [{"release_id": "abc", "company_id": 57826, "title": "タイトル", "releasedAt": "2024-12-01T03:34:00Z"}],
+        [{"release_url": f"/release/{n}", "title": "タイトル", "releasedAt": "2024-12-01T03:34:00Z"} for n in range(3)]
+        + [{"release_id": "abc", "company_id": 57826, "title": "タイトル", "releasedAt": "2024-12-01T03:34:00Z"}],
+    ):
+        payload = {"props": {"pageProps": {"pressReleases": releases}}}
+        html = dom.replace("<body>", f'<body><script id="__NEXT_DATA__" type="application/json">{json.dumps(payload)}</script>')
+        assert extract_listing_records(html) is None
+        with patch.object(mock_scraper, "_fetch_html", return_value=html):
+            assert [a['url'] for a in mock_scraper.get_news("https://prtimes.jp/list")] == [
+                "https://prtimes.jp/release/30", "https://prtimes.jp/release/29"
+            ]
+
+def test_embedded_json_absent_falls_back_to_dom():
+    html = (FIXTURES_DIR / "prtimes_listing.html").read_text(encoding="utf-8")
+    assert extract_listing_records(html) is None
+
+def _listing_page(start, count):
+    items = "".join(
+        f'<article class="list-article"><h2 class="list-article_title">'
+        f'<a href="/release/{n}">記事{n}</a></h2><time>2024年12月{n:02d}日 10:00</time></article>'
+        for n in range(start, start - count, -1)
+    )
+    return f"<html><body>{items}</body></html>"
+
+def test_get_news_since_stops_at_watermark(mock_scraper):
+    pages = {
+        "https://prtimes.jp/list": _listing_page(30, 5),
+        "https://prtimes.jp/list?page=2": _listing_page(25, 5),
+        "https://prtimes.jp/list?page=3": _listing_page(20, 5),
+    }
+    watermark = {"url": "https://prtimes.jp/release/23", "published_at": datetime(2024, 12, 23, 10, 0)}
+
+    with patch.object(mock_scraper, "_fetch_html", side_effect=lambda url, **kwargs: pages[url]) as mock_fetch:
+        listing = mock_scraper.get_news_since("https://prtimes.jp/list", watermark, max_pages=10)
+
+    assert [a['url'].rsplit('/', 1)[1] for a in listing.articles] == ["30", "29", "28", "27", "26", "25", "24"]
+    assert listing.complete
+    assert mock_fetch.call_count == 2
+    # 2ページ目以降は条件付きGETを行わない
+    assert mock_fetch.call_args_list[1].kwargs == {"conditional": False}
+
+def test_get_news_since_keeps_releases_published_in_the_watermark_minute(mock_scraper):
+    releases = [("24", "24日 10:00"), ("a", "22日 10:00"), ("22", "22日 10:00"), ("b", "22日 10:00"), ("21", "21日 10:00")]
+    page = "<html><body>" + "".join(
+        f'<article class="list-article"><h2 class="list-article_title">'
+        f'<a href="/release/{name}">記事{name}</a></h2><time>2024年12月{published}</time></article>'
+        for name, published in releases
+    ) + "</body></html>"
+    watermark = {"url": "https://prtimes.jp/release/22", "published_at": datetime(2024, 12, 22, 10, 0)}
+
+    with patch.object(mock_scraper, "_fetch_html", return_value=page):
+        listing = mock_scraper.get_news_since("https://prtimes.jp/list", watermark, max_pages=10)
+
+    # 同じ分に公開された別の記事は、一覧上で watermark の前後どちらにあっても取りこぼさない
+    assert [a['url'].rsplit('/', 1)[1] for a in listing.articles] == ["24", "a", "b"]
+    assert listing.complete
+
+def test_get_news_since_without_watermark_reads_first_page(mock_scraper):
+    with patch.object(mock_scraper, "_fetch_html", return_value=_listing_page(30, 5)) as mock_fetch:
+        listing = mock_scraper.get_news_since("https://prtimes.jp/list", None, max_pages=10)
+    assert len(listing.articles) == 5
+    assert listing.complete
+    mock_fetch.assert_called_once_with("https://prtimes.jp/list")
+
+def test_get_news_since_stops_on_repeated_page(mock_scraper):
+    watermark = {"url": "https://prtimes.jp/release/1", "published_at": datetime(2024, 12, 1, 10, 0)}
+    with patch.object(mock_scraper, "_fetch_html", return_value=_listing_page(30, 5)) as mock_fetch:
+        listing = mock_scraper.get_news_since("https://prtimes.jp/list", watermark, max_pages=10)
+    assert len(listing.articles) == 5
+    assert listing.complete
+    assert mock_fetch.call_count == 2
+
+def test_get_news_since_raises_when_a_page_fails(mock_scraper):
+    url = "https://prtimes.jp/list"
+    watermark = {"url": "https://prtimes.jp/release/13", "published_at": datetime(2024, 12, 13, 10, 0)}
+    responses = {
+        url: _response(200, _listing_page(30, 5).encode()),
+        f"{url}?page=2": _response(500),
+        f"{url}?page=3": _response(200, _listing_page(20, 10).encode()),
+    }
+    mock_scraper.retry_budget = RetryBudget(max_retries=0)
+
+    with patch.object(mock_scraper.session, "get", side_effect=lambda u, **kwargs: responses[u]):
+        # 途中のページが取れない場合は1ページ目の記事だけで終わらせず、失敗として扱う
+        with pytest.raises(FetchError):
+            mock_scraper.get_news_since(url, watermark, max_pages=10)
+
+def test_get_news_since_incomplete_when_page_limit_reached(mock_scraper, validator_store):
+    url = "https://prtimes.jp/list"
+    pages = {url: _listing_page(30, 5), f"{url}?page=2": _listing_page(25, 5)}
+    watermark = {"url": "https://prtimes.jp/release/3", "published_at": datetime(2024, 12, 3, 10, 0)}
+    validator_store.put(url, Validator(etag='"abc"'))
+
+    with patch.object(mock_scraper, "_fetch_html", side_effect=lambda u, **kwargs: pages[u]):
+        listing = mock_scraper.get_news_since(url, watermark, max_pages=2)
+
+    assert len(listing.articles) == 10
+    assert not listing.complete
+    # 次回1ページ目を「変更なし」と判定せず、残りを取りに行く
+    assert validator_store.get(url) is None
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_token_bucket_burst_then_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    # バーストを使い切ると 1/rate 秒ずつ後ろに予約される
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now = 10.0
+    assert bucket.reserve() == 0
+
+def test_rate_limiter_penalize_blocks_host_only():
+    clock = FakeClock()
+    limiter = HostRateLimiter(rate=100, burst=100, clock=clock)
+    limiter.penalize("https://prtimes.jp/a", 30)
+    assert limiter._bucket("https://prtimes.jp/b").reserve() == pytest.approx(30)
+    assert limiter._bucket("https://example.com/").reserve() == 0
+
+def test_requests_after_block_stay_spaced():
+    clock = FakeClock()
+    limiter = HostRateLimiter(rate=2, burst=4, clock=clock, decrease=1.0)
+    limiter.penalize("https://prtimes.jp/a", 10)
+    clock.now = 5.0
+    bucket = limiter._bucket("https://prtimes.jp/b")
+    # 停止中にトークンは貯まらず、停止明けから 1/rate 秒間隔で送る
+    assert [bucket.reserve() for _ in range(3)] == [pytest.approx(5.0), pytest.approx(5.5), pytest.approx(6.0)]
+
+def test_token_bucket_slows_down_on_repeated_blocks_and_recovers():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=4.0, burst=1, clock=clock, decrease=0.5, recovery=60.0)
+    bucket.block_for(1)
+    bucket.block_for(1)  # 同じ停止期間中の429は1回として数える
+    assert bucket.rate == 2.0
+    clock.now = 1.0
+    bucket.block_for(1)
+    assert bucket.rate == 1.0
+    clock.now = 2.0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(1.0)
+    # 429が止めば recovery 秒かけて元の速度に戻る
+    clock.now = 32.0
+    bucket.reserve()
+    assert bucket.rate == pytest.approx(3.0)
+    clock.now = 200.0
+    bucket.reserve()
+    assert bucket.rate == 4.0
+
+def test_parse_retry_after_and_backoff():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("garbage") is None
+    backoff = Backoff(base=1.0, cap=4.0, max_retry_after=60)
+    assert backoff.delay(0, "10") == 10
+    assert backoff.delay(0, "3600") == 60
+    assert all(0 <= backoff.delay(5) <= 4.0 for _ in range(50))
+
+def test_fetch_retries_retryable_status_with_retry_after(mock_scraper):
+    url = "https://prtimes.jp/main/html/searchrlp/company_id/57826"
+    responses = [
+        _response(429, headers={"Retry-After": "7"}),
+        _response(503),
+        _response(200, LISTING_HTML.encode()),
+    ]
+    mock_scraper.backoff = Backoff(base=0.25, cap=0.25)
+
+    with patch.object(mock_scraper.session, "get", side_effect=responses):
+        with patch("src.scrapers.base_scraper.time.sleep") as mock_sleep:
+            with patch.object(mock_scraper.rate_limiter, "penalize") as mock_penalize:
+                assert len(mock_scraper.get_news(url)) == 1
+
+    assert mock_sleep.call_args_list[0].args == (7.0,)
+    mock_penalize.assert_called_once_with(url, 7.0)
+    assert mock_scraper.fetch_stats.retries == 2
+
+def test_fetch_does_not_retry_client_errors_or_beyond_budget(mock_scraper):
+    with patch.object(mock_scraper.session, "get", return_value=_response(404)) as mock_get:
+        assert mock_scraper.get_news("https://prtimes.jp/missing") == []
+    assert mock_get.call_count == 1
+
+    mock_scraper.retry_budget = RetryBudget(max_retries=1)
+    with patch.object(mock_scraper.session, "get", return_value=_response(503)) as mock_get:
+        with patch("src.scrapers.base_scraper.time.sleep"):
+            assert mock_scraper.get_news("https://prtimes.jp/down") == []
+    assert mock_get.call_count == 2
+
+def test_scrapers_share_session(validator_store, rate_limiter):
+    first = PRTimesScraper(validator_store=validator_store, rate_limiter=rate_limiter)
+    second = PRTimesScraper(validator_store=validator_store, rate_limiter=rate_limiter)
+    assert first.session is second.session is get_shared_session()
+    assert "User-Agent" in first.session.headers
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_session_registry_counts_connection_reuse():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        registry = SessionRegistry(pool_size=2)
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+        for _ in range(5):
+            assert registry.get_session().get(url).text == "ok"
+        # プール拡張後もセッションと集計は引き継がれる
+        registry.configure(8)
+        registry.get_session().get(url)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert registry.pool_size == 8
+    assert registry.stats.requests == 6
+    # リサイズでアダプターが新しくなるため、接続は最大2回
+    assert registry.stats.new_connections <= 2
+    assert registry.stats.reuse_ratio >= 4 / 6
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://PRTimes.jp:443/list?page=2&b=1#top") == "https://prtimes.jp/list?b=1&page=2"
+    assert normalize_url("http://localhost:8080") == "http://localhost:8080/"
+    # キャッシュキーでは計測用パラメータも区別する (記事IDの正規化とは異なる)
+    assert normalize_url("https://prtimes.jp/list?utm_source=x") == "https://prtimes.jp/list?utm_source=x"
+
+def test_response_cache_record_then_replay(tmp_path, validator_store, rate_limiter):
+    clock = FakeClock()
+    recorder = ResponseCache(str(tmp_path / "responses"), mode="record", clock=clock)
+    scraper = PRTimesScraper(validator_store=validator_store, rate_limiter=rate_limiter, response_cache=recorder)
+    validator_store.put("https://prtimes.jp/list", Validator(etag='"v1"'))
+    page = LISTING_HTML.encode("utf-8")
+    headers = {"Content-Type": "text/html; charset=utf-8"}
+    with patch.object(scraper.session, "get", return_value=_response(200, page, headers)) as mock_get:
+        assert scraper.get_news("https://prtimes.jp/list")
+    # 記録中は本文を必ず取得するため条件付きGETにしない
+    assert mock_get.call_args.kwargs["headers"] == {}
+
+    replayer = ResponseCache(str(tmp_path / "responses"), mode="replay", clock=clock)
+    replay_scraper = PRTimesScraper(validator_store=validator_store, rate_limiter=rate_limiter, response_cache=replayer)
+    with patch.object(replay_scraper.session, "get") as mock_get:
+        first = replay_scraper.get_news("https://PRTIMES.jp/list#x")
+        second = replay_scraper.get_news("https://prtimes.jp/list")
+        missing = replay_scraper.get_news("https://prtimes.jp/other")
+    mock_get.assert_not_called()
+    assert first == second == scraper._extract_articles(LISTING_HTML)
+    assert missing == []
+
+def test_response_cache_as_of_and_eviction(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path), mode="record", clock=clock)
+    cache.record("https://prtimes.jp/a", 200, b"old" * 100, {})
+    clock.now += 100
+    cache.record("https://prtimes.jp/a", 200, b"new" * 100, {})
+    cache.record("https://prtimes.jp/b", 200, b"new" * 100, {})
+
+    assert cache.lookup("https://prtimes.jp/a").content == b"new" * 100
+    assert cache.lookup("https://prtimes.jp/a", as_of=clock.now - 50).content == b"old" * 100
+
+    # 同一内容は1ファイルにまとまり、期限切れのものだけが消える
+    assert cache.evict(max_age=50) == 1
+    assert cache.lookup("https://prtimes.jp/a", as_of=clock.now - 50) is None
+    assert cache.lookup("https://prtimes.jp/b") is not None
+
+    clock.now += 1
+    cache.record("https://prtimes.jp/c", 200, b"newest", {})
+    assert cache.evict(max_bytes=40) == 1
+    reloaded = ResponseCache(str(tmp_path), mode="replay")
+    assert reloaded.lookup("https://prtimes.jp/a") is None
+    assert reloaded.lookup("https://prtimes.jp/c").content == b"newest"
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_parse_pool_matches_inline_parse(mock_scraper, workers):
+    pages = [p.read_text(encoding="utf-8") for p in sorted(FIXTURES_DIR.glob("prtimes_listing*.html"))] * 2
+    expected = [mock_scraper._extract_articles(page) for page in pages]
+
+    async def run():
+        async with ParsePool(workers=workers, queue_depth=2) as pool:
+            results = await asyncio.gather(*(mock_scraper._extract_articles_async(page, pool) for page in pages))
+        return results, pool.stats
+
+    results, stats = asyncio.run(run())
+    assert results == expected
+    assert stats.pages == len(pages)
+
+def test_parse_worker_builds_only_the_extractor(mock_scraper):
+    expected = mock_scraper._extract_articles(LISTING_HTML)
+    # ワーカーではセッションやキャッシュを抱えたスクレイパーを生成しない
+    with patch.object(PRTimesScraper, "__init__", side_effect=AssertionError("scraper built in worker")):
+        articles, elapsed = _extract_in_worker(PRTimesExtractor, mock_scraper.parser.name, LISTING_HTML)
+    assert articles == expected
+    assert elapsed >= 0
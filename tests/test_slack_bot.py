@@ -1,6 +1,8 @@
 # tests/test_slack_bot.py
 import pytest
+from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
+from src.data_access.models import Article
 from src.slack_bot.client import SlackClient
 from src.slack_bot.handlers import SlackEventHandler
 
@@ -39,10 +41,51 @@ def test_handle_mention_recent():
         "channel": "C12345"
     }
 
-    with patch.object(handler.db, "get_recent_articles", return_value=[]):
+    with patch.object(handler.db, "count_recent_articles", return_value=0) as count_recent_articles:
         handler.handle_mention(event)
-    # get_recent_articles が呼ばれているか確認
-    handler.db.get_recent_articles.assert_called_with(None, 10)
+    # 10日前以降の記事数を数えているか確認
+    company_id, since = count_recent_articles.call_args.args
+    assert company_id is None
+    assert timedelta(days=10) <= datetime.now() - since < timedelta(days=10, minutes=1)
+
+def test_show_recent_articles_streams_in_block_chunks():
+    web_client = MagicMock()
+    handler = SlackEventHandler(web_client)
+    articles = [
+        Article(str(n), "B23000199", f"Article {n}", f"http://example.com/{n}", datetime(2024, 12, 1) - timedelta(hours=n),
+                None, None, "prtimes", None, None)
+        for n in range(60)
+    ]
+    with patch.object(handler.db, "count_recent_articles", return_value=60), \
+            patch.object(handler.db, "iter_recent_articles", return_value=iter(articles)), \
+            patch.object(handler.db, "get_company_names", return_value={"B23000199": "Example Inc."}) as get_company_names:
+        handler._show_recent_articles("C12345", 365)
+
+    sent = [call.kwargs["blocks"] for call in web_client.chat_postMessage.call_args_list]
+    # ヘッダー2ブロック + 記事1件あたり2ブロックを、50ブロックずつ送信する
+    assert [len(blocks) for blocks in sent] == [50, 50, 22]
+    assert "全60件" in sent[0][0]["text"]["text"]
+    assert "Example Inc." in sent[0][2]["text"]["text"]
+    # 企業名は1メッセージ分 (25件) ごとにまとめて引く
+    assert get_company_names.call_count == 3
+
+def test_show_recent_articles_caps_the_listing():
+    web_client = MagicMock()
+    handler = SlackEventHandler(web_client)
+    articles = [
+        Article(str(n), "B23000199", f"Article {n}", f"http://example.com/{n}", datetime(2024, 12, 1) - timedelta(hours=n),
+                None, None, "prtimes", None, None)
+        for n in range(150)
+    ]
+    with patch.object(handler.db, "count_recent_articles", return_value=150), \
+            patch.object(handler.db, "iter_recent_articles", return_value=iter(articles)), \
+            patch.object(handler.db, "get_company_names", return_value={"B23000199": "Example Inc."}):
+        handler._show_recent_articles("C12345", 365)
+
+    sent = [block for call in web_client.chat_postMessage.call_args_list for block in call.kwargs["blocks"]]
+    # 新しい100件のみ表示し、最後に表示件数を添える
+    assert sum(1 for block in sent if block["type"] == "section") == 100
+    assert sent[-1]["elements"][0]["text"] == "全150件中、新しい100件を表示しています"
 
 def test_handle_mention_invalid():
     web_client = MagicMock()
@@ -0,0 +1,147 @@
+# tests/test_sqlite_backend.py
+import pytest
+from datetime import datetime, timedelta
+from src.data_access.keys import article_doc_id
+from src.data_access.models import ScrapingResult
+from src.data_access.sqlite_backend import SQLiteBackend
+from src.data_access.storage import StorageBackend, create_storage_backend
+
+@pytest.fixture
+def backend(tmp_path):
+    """
+    一時ファイルのSQLiteを使う (WALモードを有効にするため :memory: ではなくファイル)
+    """
+    db = SQLiteBackend(str(tmp_path / "news.sqlite3"))
+    yield db
+    db.close()
+
+def _article(url, company_id="company1", published_at=None, source="prtimes"):
+    return {
+        "company_id": company_id,
+        "title": f"Title {url}",
+        "url": url,
+        "published_at": published_at or datetime.now(),
+        "content": "content",
+        "source": source
+    }
+
+def test_implements_storage_backend(backend):
+    assert isinstance(backend, StorageBackend)
+    assert backend._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_create_storage_backend_sqlite(monkeypatch, tmp_path):
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "env.sqlite3"))
+    db = create_storage_backend()
+    assert isinstance(db, SQLiteBackend)
+    db.close()
+    with pytest.raises(ValueError):
+        create_storage_backend("unknown")
+
+def test_insert_articles_skips_existing_and_duplicates(backend):
+    assert backend.insert_articles([_article("http://example.com/1")]) == ["http://example.com/1"]
+
+    failures = []
+    inserted = backend.insert_articles([
+        _article("http://example.com/1"),
+        _article("http://example.com/2"),
+        _article("http://example.com/2")
+    ], on_failure=lambda article, error: failures.append(article))
+
+    assert inserted == ["http://example.com/2"]
+    assert failures == []
+    assert backend.get_total_articles_count() == 2
+    assert backend.find_existing_urls(["http://example.com/2", "http://example.com/3"]) == {"http://example.com/2"}
+
+def test_insert_articles_failure_rolls_back(backend):
+    failures = []
+    inserted = backend.insert_articles(
+        [_article("http://example.com/1"), {"url": "http://example.com/2", "title": "missing fields"}],
+        on_failure=lambda article, error: failures.append(article["url"])
+    )
+    assert inserted == []
+    assert sorted(failures) == ["http://example.com/1", "http://example.com/2"]
+    assert backend.get_total_articles_count() == 0
+
+def test_insert_articles_dedups_by_url(backend):
+    # 決定的IDへ移行する前のIDで保存された記事も、URLが同じなら重複として扱う (Firestoreと同じ)
+    backend._conn.execute(
+        "INSERT INTO articles (id, company_id, title, url, published_at, source, created_at, updated_at) "
+        "VALUES ('legacy-id', 'company1', 'Old', 'http://example.com/1', '2024-01-01 00:00:00.000000', 'prtimes', '', '')"
+    )
+    assert backend.insert_articles([_article("http://example.com/1"), _article("http://example.com/2")]) == [
+        "http://example.com/2"
+    ]
+    assert backend.get_total_articles_count() == 2
+
+def test_insert_articles_reports_begin_failure(backend):
+    # 別の接続が書き込み中で BEGIN IMMEDIATE 自体が失敗した場合も、元のエラーを通知する
+    other = SQLiteBackend(backend.path)
+    other._conn.execute("BEGIN IMMEDIATE")
+    backend._conn.execute("PRAGMA busy_timeout=0")
+    errors = []
+    try:
+        assert backend.insert_articles(
+            [_article("http://example.com/1")], on_failure=lambda article, error: errors.append(str(error))
+        ) == []
+    finally:
+        other._conn.execute("ROLLBACK")
+        other.close()
+    assert errors == ["database is locked"]
+    assert backend.insert_articles([_article("http://example.com/1")]) == ["http://example.com/1"]
+
+def test_iter_recent_articles_pages_in_order(backend):
+    now = datetime.now()
+    backend.insert_articles([
+        _article(f"http://example.com/{i}", company_id=f"company{i % 2}", published_at=now - timedelta(hours=i))
+        for i in range(7)
+    ] + [_article("http://example.com/old", published_at=now - timedelta(days=30))])
+
+    articles = list(backend.iter_recent_articles(since=now - timedelta(days=1), page_size=3))
+    assert [article.url for article in articles] == [f"http://example.com/{i}" for i in range(7)]
+    assert backend.count_recent_articles(since=now - timedelta(days=1)) == 7
+    assert backend.count_recent_articles("company1", since=now - timedelta(days=1)) == 3
+
+    recent = backend.get_recent_articles("company0", days=7, limit=2)
+    assert [article.url for article in recent] == ["http://example.com/0", "http://example.com/2"]
+    assert recent[0].content == "content"
+
+def test_update_articles_status_hides_articles(backend):
+    backend.insert_articles([_article("http://example.com/1"), _article("http://example.com/2")])
+    doc_id = article_doc_id("http://example.com/1")
+
+    assert backend.update_articles_status([doc_id, "missing"], "archived") == [doc_id]
+    assert [article.url for article in backend.get_recent_articles()] == ["http://example.com/2"]
+    latest = backend.get_latest_articles(limit=5, fields=["url"])
+    assert {item["id"]: item["url"] for item in latest}[doc_id] == "http://example.com/1"
+
+def test_stats_group_by(backend):
+    backend.insert_articles([
+        _article("http://example.com/1", company_id="a"),
+        _article("http://example.com/2", company_id="a", source="rss"),
+        _article("http://example.com/3", company_id="b")
+    ])
+    assert backend.get_articles_count_by_company() == {"a": 2, "b": 1}
+    assert backend.get_articles_count_by_source() == {"prtimes": 2, "rss": 1}
+
+def test_company_info_is_merged(backend):
+    backend.save_company_info({"company_id": "a", "name": "Company A", "tags": ["x"]})
+    backend.save_company_info({"company_id": "a", "prtimes_url": "https://prtimes.jp/a"})
+
+    assert backend.get_company_info("a") == {
+        "company_id": "a", "name": "Company A", "tags": ["x"], "prtimes_url": "https://prtimes.jp/a"
+    }
+    assert backend.get_company_info("missing") is None
+    assert backend.get_company_names(["a", "missing"]) == {"a": "Company A"}
+
+def test_watermark_and_scraping_result(backend):
+    published_at = datetime(2024, 1, 2, 3, 4, 5)
+    assert backend.get_watermark("a", "prtimes") is None
+    backend.update_watermark("a", "prtimes", "http://example.com/1", published_at)
+    backend.update_watermark("a", "prtimes", "http://example.com/2", published_at + timedelta(hours=1))
+    assert backend.get_watermark("a", "prtimes") == {
+        "url": "http://example.com/2", "published_at": published_at + timedelta(hours=1)
+    }
+
+    backend.save_scraping_result(ScrapingResult(company_id="a", source="prtimes", success=True, articles_count=1))
+    assert backend._conn.execute("SELECT COUNT(*) FROM scraping_results").fetchone()[0] == 1
@@ -0,0 +1,37 @@
+# tests/test_stats_counters.py
+from unittest.mock import MagicMock
+from src.data_access.stats_counters import StatsCounters, count_articles, status_change_deltas
+
+def test_stats_counters_sum_shards_and_rebuild():
+    db = MagicMock()
+    shard_docs = []
+    for doc_id, dimension, value, count in [
+        ("company:A:0", "company", "A", 2), ("company:A:3", "company", "A", 1), ("company:B:1", "company", "B", 4)
+    ]:
+        doc = MagicMock()
+        doc.to_dict.return_value = {"dimension": dimension, "value": value, "count": count}
+        doc.reference.path = f"article_stats/{doc_id}"
+        shard_docs.append(doc)
+    db.collection().where().stream.return_value = shard_docs
+    db.collection().stream.return_value = shard_docs
+    db.collection().document.side_effect = lambda doc_id: MagicMock(path=f"article_stats/{doc_id}")
+    counters = StatsCounters(db, shards=4)
+
+    assert counters.get_counts("company") == {"A": 3, "B": 4}
+
+    articles = [{"company_id": "A", "source": "prtimes"}] * 3 + [{"company_id": "B", "source": "prtimes", "status": "deleted"}]
+    drift = counters.rebuild(articles, dry_run=True)
+    assert drift[("company", "B")] == -3
+    assert ("company", "A") not in drift
+    db.batch.assert_not_called()
+
+    counters.rebuild(articles)
+    batch = db.batch.return_value
+    written = {(data["dimension"], data["value"]): data["count"] for (_, data), _ in batch.set.call_args_list}
+    assert written == dict(count_articles(articles))
+    # シャード0以外の古いシャードは削除する
+    assert [call.args[0].path for call in batch.delete.call_args_list] == ["article_stats/company:A:3", "article_stats/company:B:1"]
+
+def test_status_change_deltas():
+    assert status_change_deltas(None, "deleted") == {("status", "active"): -1, ("status", "deleted"): 1}
+    assert status_change_deltas("deleted", "deleted") == {}
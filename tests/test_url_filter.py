@@ -0,0 +1,43 @@
+# tests/test_url_filter.py
+import os
+from src.data_access.url_filter import SeenUrlFilter
+
+def test_seen_url_filter_false_positive_rate(tmp_path):
+    seen = SeenUrlFilter(str(tmp_path / "seen.bloom"), capacity=5000, false_positive_rate=0.01)
+    assert seen.open(populate=lambda: (f"https://prtimes.jp/p/{n}" for n in range(5000)))
+    assert seen.count == 5000
+    assert all(seen.might_contain(f"https://prtimes.jp/p/{n}") for n in range(5000))
+    false_positives = sum(seen.might_contain(f"https://prtimes.jp/q/{n}") for n in range(5000))
+    assert false_positives / 5000 < 0.03
+    seen.close()
+
+def test_seen_url_filter_shared_between_instances_and_rebuilt_on_param_change(tmp_path):
+    path = str(tmp_path / "seen.bloom")
+    first = SeenUrlFilter(path, capacity=1000, false_positive_rate=0.01)
+    second = SeenUrlFilter(path, capacity=1000, false_positive_rate=0.01)
+    assert first.open() is True
+    # 既存ファイルは作り直さずに共有する
+    assert second.open(populate=lambda: ["https://never.used/"]) is False
+    first.add("https://prtimes.jp/shared")
+    assert second.might_contain("https://prtimes.jp/shared")
+    assert second.count == 1
+
+    resized = SeenUrlFilter(path, capacity=2000, false_positive_rate=0.01)
+    assert resized.open(populate=lambda: ["https://prtimes.jp/rebuilt"]) is True
+    assert resized.might_contain("https://prtimes.jp/rebuilt")
+    for f in (first, second, resized):
+        f.close()
+
+def test_seen_url_filter_add_follows_a_rebuilt_file(tmp_path):
+    path = str(tmp_path / "seen.bloom")
+    first = SeenUrlFilter(path, capacity=1000, false_positive_rate=0.01)
+    first.open()
+    # 他のワーカーがファイルを作り直した後の追加も、作り直したファイルに書き込む
+    os.remove(path)
+    second = SeenUrlFilter(path, capacity=1000, false_positive_rate=0.01)
+    assert second.open(populate=lambda: ["https://prtimes.jp/old"]) is True
+    first.add("https://prtimes.jp/new")
+    assert second.might_contain("https://prtimes.jp/new")
+    assert first.might_contain("https://prtimes.jp/old")
+    for f in (first, second):
+        f.close()